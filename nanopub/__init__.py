@@ -4,6 +4,10 @@ from .nanopub_conf import NanopubConf
 from .client import NanopubClient
 from .profile import Profile, load_profile, generate_keyfiles
 from .nanopub import Nanopub
+from .verify import VerifyResult, verify_many
+from .sign import SignResult, sign_many
+from .view import NanopubView
+from .dump import DumpRecord, NanopubDumpWriter, iter_dump, read_dump_index, read_dump_record
 
 from .templates.nanopub_index import NanopubIndex, create_nanopub_index
 from .templates.nanopub_introduction import NanopubIntroduction
@@ -7,6 +7,7 @@ TESTS_FILEPATH = ROOT_FILEPATH / "tests"
 TEST_RESOURCES_FILEPATH = TESTS_FILEPATH / "resources"
 USER_CONFIG_DIR = Path.home() / ".nanopub"
 DEFAULT_PROFILE_PATH = USER_CONFIG_DIR / "profile.yml"
+DEFAULT_VERIFICATION_CACHE_PATH = USER_CONFIG_DIR / "verification_cache.sqlite"
 
 TEST_NANOPUB_REGISTRY_URL = 'https://test.registry.knowledgepixels.com/np/'
 # List of servers: https://monitor.petapico.org/.csv
@@ -34,6 +35,14 @@ MAX_TRIPLES_PER_NANOPUB = 1200
 
 RSA_KEY_SIZE = 2048
 
+# Most trusty nanopubs remembered as verified by the verification cache
+DEFAULT_VERIFICATION_CACHE_SIZE = 100_000
+
+# Bytes of a dump buffered before they are written out (and compressed), or read at once
+DEFAULT_DUMP_CHUNK_SIZE = 1 << 20
+# Most bytes of incomplete nanopubs held by the dump reader before giving up on splitting the dump
+MAX_DUMP_RECORD_SIZE = 1 << 26
+
 NANOPUB_QUERY_URLS = [
     'https://query.knowledgepixels.com/api/',
     'https://query.petapico.org/api/',
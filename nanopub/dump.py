@@ -0,0 +1,630 @@
+"""Read and write dumps of many nanopublications in a single TriG or N-Quads file.
+
+A dump is the concatenation of the serializations of its nanopubs, optionally gzipped,
+with a sidecar index giving where each nanopub is in the file, so that one of them can
+be read back without going through the whole dump. ``iter_dump`` goes through a whole
+dump, written this way or not, one nanopub at a time.
+
+Blank node labels are scoped to the whole file: sign the nanopubs (which names their
+blank nodes) before exporting them, or two nanopubs could end up sharing a blank node.
+"""
+import gzip
+import io
+import mmap
+import re
+from contextlib import contextmanager
+from pathlib import Path, PurePath
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+from rdflib import Dataset, URIRef
+
+from nanopub.definitions import DEFAULT_DUMP_CHUNK_SIZE, MAX_DUMP_RECORD_SIZE
+from nanopub.namespaces import NP
+from nanopub.nanopub import Nanopub
+from nanopub.nanopub_conf import NanopubConf
+from nanopub.parallel import imap_bounded
+from nanopub.serialize import NANOPUB_WRITER_FORMATS
+from nanopub.trustyuri.rdf import NQuadsHasher
+from nanopub.trustyuri.rdf.NQuadsHasher import DEFAULT_GRAPH
+from nanopub.trustyuri.rdf.RdfUtils import TRUSTY_CODE_RE
+from nanopub.utils import MalformedNanopubError
+
+DUMP_INDEX_SUFFIX = ".idx"
+
+
+class DumpIndexEntry(NamedTuple):
+    """Where one nanopub is in a dump
+
+    Args:
+        key: The trusty artefact code of the nanopub, or its URI if it is not trusty
+        offset: Position of the nanopub in the file, or in the decompressed gzip member for a gzipped dump
+        length: Number of bytes of the nanopub
+        member_offset: Position in the file of the gzip member holding the nanopub, None if not gzipped
+        member_length: Number of compressed bytes of this gzip member, None if not gzipped
+    """
+    key: str
+    offset: int
+    length: int
+    member_offset: Optional[int] = None
+    member_length: Optional[int] = None
+
+
+def dump_format(path: Union[Path, str]) -> Tuple[str, bool]:
+    """The format of a dump guessed from its file name, as a (format, gzipped) tuple"""
+    name = PurePath(path)
+    compressed = name.suffix == ".gz"
+    if compressed:
+        name = name.with_suffix("")
+    return ("nquads" if name.suffix in (".nq", ".nquads") else "trig"), compressed
+
+
+def _dump_key(uri: str) -> str:
+    m = TRUSTY_CODE_RE.search(uri)
+    return m.group(0) if m else uri
+
+
+class NanopubDumpWriter:
+    """Append many nanopubs to a single TriG or N-Quads file, optionally gzipped.
+
+    The serialized nanopubs are buffered up to ``chunk_size`` bytes, then written out
+    (as one gzip member when compressed), so memory use stays bounded however many
+    nanopubs are written. Each nanopub gets a line in the sidecar index, see
+    ``read_dump_index`` and ``read_dump_record`` to read them back.
+
+    Args:
+        destination: Path of the dump, or a binary stream to write it to
+        format: "trig" or "nquads", by default guessed from the file name (trig if unknown)
+        compress: Gzip the dump, by default when the file name ends in ``.gz``
+        index: Path of the sidecar index, by default the dump path with ``.idx`` appended
+            (no index when writing to a stream), False to not write one
+        chunk_size: Bytes of nanopubs buffered before they are written out
+
+    Use it as a context manager, or call ``close()`` once done::
+
+        with NanopubDumpWriter("nanopubs.trig.gz") as writer:
+            for np in nanopubs:
+                writer.write(np)
+    """
+
+    def __init__(
+            self,
+            destination: Union[Path, str, BinaryIO],
+            format: Optional[str] = None,
+            compress: Optional[bool] = None,
+            index: Union[Path, str, bool, None] = None,
+            chunk_size: int = DEFAULT_DUMP_CHUNK_SIZE,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size of a dump must be at least 1 byte, got {chunk_size}")
+        path: Optional[Path] = None
+        stream: Optional[BinaryIO] = None
+        if isinstance(destination, (str, PurePath)):
+            path = Path(destination)
+            guessed_format, guessed_compress = dump_format(destination)
+        else:
+            stream = destination
+            guessed_format, guessed_compress = "trig", False
+        self.format = format or guessed_format
+        if self.format not in NANOPUB_WRITER_FORMATS:
+            raise ValueError(f"Dumps of nanopubs can only be written as trig or nquads, not {self.format}")
+        self.compress = guessed_compress if compress is None else compress
+        self.chunk_size = chunk_size
+        if index is None or index is True:
+            if path is None and index is True:
+                raise ValueError("The path of the index must be given when writing a dump to a stream")
+            index = None if path is None else path.with_name(path.name + DUMP_INDEX_SUFFIX)
+        self.path = path
+        self.index_path = Path(index) if index else None
+        self.count = 0
+
+        self._stream: Optional[BinaryIO] = stream if path is None else open(path, "wb")
+        self._index = None if self.index_path is None else open(self.index_path, "w", encoding="utf-8")
+        self._offset = 0
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._pending: List[Tuple[str, int, int]] = []
+
+    def write(self, np: Nanopub) -> None:
+        """Append a nanopub, indexed by its trusty artefact code (or its URI if it is not trusty)"""
+        key = np.metadata.trusty or str(np.source_uri or np.metadata.np_uri)
+        self.write_bytes(np.serialize(format=self.format, encoding="utf-8"), key)
+
+    def write_bytes(self, data: bytes, key: str) -> None:
+        """Append a nanopub already serialized in the format of the dump, like the ``data`` of a ``SignResult``
+
+        Args:
+            data: The serialized nanopub
+            key: The trusty artefact code or the URI of the nanopub (then indexed by its trusty code)
+        """
+        if self._stream is None:
+            raise ValueError("The dump has been closed")
+        key = _dump_key(str(key))
+        if not key or any(c in key for c in "\t\r\n"):
+            raise ValueError(f"Cannot index a nanopub under {key!r}")
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        self._pending.append((key, self._buffered, len(data)))
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self.count += 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out the buffered nanopubs and their index lines"""
+        if self._stream is None:
+            return
+        if self._buffer:
+            chunk = b"".join(self._buffer)
+            if self.compress:
+                chunk = gzip.compress(chunk, mtime=0)
+                lines = [
+                    f"{key}\t{offset}\t{length}\t{self._offset}\t{len(chunk)}\n"
+                    for key, offset, length in self._pending
+                ]
+            else:
+                lines = [f"{key}\t{self._offset + offset}\t{length}\n" for key, offset, length in self._pending]
+            self._stream.write(chunk)
+            self._offset += len(chunk)
+            if self._index is not None:
+                self._index.write("".join(lines))
+            self._buffer, self._buffered, self._pending = [], 0, []
+        self._stream.flush()
+        if self._index is not None:
+            self._index.flush()
+
+    def close(self) -> None:
+        """Write out the buffered nanopubs and close the files opened by the writer"""
+        if self._stream is None:
+            return
+        self.flush()
+        if self.path is not None:
+            self._stream.close()
+        if self._index is not None:
+            self._index.close()
+        self._stream = self._index = None
+
+    def __enter__(self) -> "NanopubDumpWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_dump_index(path: Union[Path, str]) -> Iterator[DumpIndexEntry]:
+    """Read the sidecar index of a dump, one entry per nanopub in the order they were written"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            key, *positions = line.rstrip("\n").split("\t")
+            if len(positions) not in (2, 4):
+                raise ValueError(f"Malformed line in the dump index {path}: {line!r}")
+            yield DumpIndexEntry(key, *map(int, positions))
+
+
+def read_dump_record(path: Union[Path, str], entry: DumpIndexEntry) -> bytes:
+    """Read the serialized nanopub at this entry of the index of a dump"""
+    with open(path, "rb") as f:
+        if entry.member_offset is None:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+        f.seek(entry.member_offset)
+        member = gzip.GzipFile(fileobj=io.BytesIO(f.read(entry.member_length)))
+        member.seek(entry.offset)
+        return member.read(entry.length)
+
+
+_HEAD_LINKS = (str(NP.hasAssertion), str(NP.hasProvenance), str(NP.hasPublicationInfo))
+
+# Tokens that matter to find where a TriG statement ends, and how each of them ends
+_TRIG_TOKEN_RE = re.compile(rb'"""|\'\'\'|[<"\'#{}.]')
+_TRIG_TOKEN_END_RE = {
+    b'<': re.compile(rb'[^>]*>'),
+    b'"': re.compile(rb'(?:[^"\\\n\r]|\\.)*"'),
+    b"'": re.compile(rb"(?:[^'\\\n\r]|\\.)*'"),
+    b'"""': re.compile(rb'(?:(?:"|"")?(?:[^"\\]|\\.))*"""', re.S),
+    b"'''": re.compile(rb"(?:(?:'|'')?(?:[^'\\]|\\.))*'''", re.S),
+    b'#': re.compile(rb'[^\n\r]*[\n\r]'),
+}
+# A dot followed by one of these is part of a name or a number, not the end of a statement
+_TRIG_NAME_CHAR_RE = re.compile(rb'[\w\-:%\\.\x80-\xff]')
+_TRIG_SPACE_RE = re.compile(rb'(?:\s+|#[^\n\r]*)*')
+_TRIG_SPARQL_DIRECTIVE_RE = re.compile(rb'(?i:prefix|base)\s')
+_TRIG_DIRECTIVE_RE = re.compile(
+    rb'(?:@prefix\s+([^\s:]*):\s*<([^>]*)>\s*\.|(?i:prefix)\s+([^\s:]*):\s*<([^>]*)>'
+    rb'|@base\s+<([^>]*)>\s*\.|(?i:base)\s+<([^>]*)>)\s*$'
+)
+_TRIG_GRAPH_KEYWORD_RE = re.compile(rb'(?i:graph)\s+')
+_TRIG_HEAD_LINK_RE = re.compile(rb'has(?:Assertion|Provenance|PublicationInfo)')
+_TRIG_NAME = rb'[^\s<>"{}()\[\];,#]*:(?:[^\s<>"{}()\[\];,#]*[^\s<>"{}()\[\];,#.])?'
+# A head link written the usual way: an IRI or prefixed name predicate, then an IRI or prefixed name object
+_TRIG_HEAD_LINK_TRIPLE_RE = re.compile(
+    rb'(<[^>]*has(?:Assertion|Provenance|PublicationInfo)>|[^\s<>"{}()\[\];,#]*:has(?:Assertion|Provenance|PublicationInfo))'
+    rb'\s+(<[^>]*>|' + _TRIG_NAME + rb')'
+)
+
+# A unit of a dump: the graph it belongs to, its bytes, the graphs it links to if it is
+# (part of) a Head graph, and the directives (prefixes...) it must be read with
+_Unit = Tuple[Optional[str], bytes, Tuple[str, ...], bytes]
+# A dump being read: memory-mapped, decompressed, or as given
+_DumpStream = Union[mmap.mmap, gzip.GzipFile, BinaryIO]
+
+
+def _scan_trig_statement(buf, pos: int, eof: bool) -> Optional[Tuple[int, int]]:
+    """Where the top-level TriG statement starting at ``pos`` ends, and where its graph opens (-1 if it is not a graph).
+
+    Returns None if the statement does not end within ``buf`` and more data is to come.
+    """
+    if _TRIG_SPARQL_DIRECTIVE_RE.match(buf, pos):
+        # SPARQL style directives do not end with a dot
+        end = buf.find(b'>', pos)
+        if end >= 0:
+            return end + 1, -1
+    else:
+        depth, brace = 0, -1
+        while True:
+            m = _TRIG_TOKEN_RE.search(buf, pos)
+            if m is None:
+                break
+            token, pos = m.group(), m.end()
+            if token == b'{':
+                if depth == 0 and brace < 0:
+                    brace = m.start()
+                depth += 1
+            elif token == b'}':
+                depth -= 1
+                if depth == 0:
+                    return pos, brace
+                if depth < 0:
+                    raise MalformedNanopubError(f"Unbalanced '}}' in TriG at byte {m.start()} of the buffer")
+            elif token == b'.':
+                if depth > 0:
+                    continue
+                if pos < len(buf):
+                    if not _TRIG_NAME_CHAR_RE.match(buf, pos):
+                        return pos, -1
+                elif eof:
+                    return pos, -1
+                else:
+                    return None
+            else:
+                if not eof and token in (b'"', b"'") and pos + 2 > len(buf):
+                    # Could be the start of a long string cut by the end of the buffer
+                    return None
+                m = _TRIG_TOKEN_END_RE[token].match(buf, pos)
+                if m is None:
+                    if token == b'#' and eof:
+                        pos = len(buf)
+                        continue
+                    break
+                pos = m.end()
+    if eof:
+        raise MalformedNanopubError("The TriG dump ends in the middle of a statement")
+    return None
+
+
+def _trig_statements(source: _DumpStream, chunk_size: int) -> Iterator[Tuple[bytes, int]]:
+    """The top-level statements of TriG read from a memory map or a binary stream, with the position of their '{'"""
+    buf: Union[mmap.mmap, bytes] = b""
+    eof = False
+    if isinstance(source, mmap.mmap):
+        buf, eof = source, True
+    pos = 0
+    while True:
+        space = _TRIG_SPACE_RE.match(buf, pos)
+        # Always matches, possibly nothing
+        start = space.end() if space else pos
+        scanned = None
+        if start < len(buf):
+            scanned = _scan_trig_statement(buf, start, eof)
+        elif eof:
+            return
+        if scanned is None:
+            # Read more of the stream, keeping the statement being scanned
+            chunk = source.read(chunk_size)
+            buf = buf[pos:] + chunk
+            pos, eof = 0, not chunk
+            continue
+        end, brace = scanned
+        yield buf[start:end], brace - start if brace >= 0 else -1
+        pos = end
+
+
+class _TrigDirectives:
+    """The prefixes and base declared so far in a TriG dump, to resolve graph names and read each nanopub alone"""
+
+    def __init__(self) -> None:
+        self.prefixes: Dict[str, str] = {}
+        self.base: Optional[str] = None
+        self._statements: Dict[str, bytes] = {}
+        self._header: Optional[bytes] = b""
+
+    def add(self, statement: bytes) -> bool:
+        m = _TRIG_DIRECTIVE_RE.match(statement)
+        if m is None:
+            return False
+        prefix, iri = m[1] if m[1] is not None else m[3], m[2] if m[2] is not None else m[4]
+        if prefix is not None:
+            prefix = prefix.decode("utf-8")
+            self.prefixes[prefix] = self.resolve_iri(iri)
+            key = "prefix " + prefix
+        else:
+            key = "base"
+            self.base = self.resolve_iri(m[5] if m[5] is not None else m[6])
+        # Declared again at the end, after the base it may depend on
+        self._statements.pop(key, None)
+        self._statements[key] = statement
+        self._header = None
+        return True
+
+    @property
+    def header(self) -> bytes:
+        """The directives in effect, as TriG"""
+        if self._header is None:
+            self._header = b"".join(statement + b"\n" for statement in self._statements.values())
+        return self._header
+
+    def resolve_iri(self, iri: bytes) -> str:
+        value = NQuadsHasher.unescape(iri.decode("utf-8"))
+        return urljoin(self.base, value) if self.base else value
+
+    def resolve(self, name: bytes) -> Optional[str]:
+        """The IRI of a graph name (or another term), None for blank nodes, the default graph if there is no name"""
+        if not name:
+            return DEFAULT_GRAPH
+        if name.startswith(b"<") and name.endswith(b">"):
+            return self.resolve_iri(name[1:-1])
+        if name.startswith((b"_:", b"[")):
+            return None
+        prefix, _, local = name.decode("utf-8").partition(":")
+        try:
+            return self.prefixes[prefix] + local.replace("\\", "")
+        except KeyError:
+            raise MalformedNanopubError(f"Undeclared prefix in {name.decode('utf-8')}")
+
+
+def _trig_head_links(directives: _TrigDirectives, statement: bytes) -> Tuple[str, ...]:
+    """The graphs a TriG graph links to from a Head graph, if it is one"""
+    mentions = len(_TRIG_HEAD_LINK_RE.findall(statement))
+    if not mentions:
+        return ()
+    links = [
+        directives.resolve(m[2]) for m in _TRIG_HEAD_LINK_TRIPLE_RE.finditer(statement)
+        if directives.resolve(m[1]) in _HEAD_LINKS
+    ]
+    resolved = tuple(link for link in links if link is not None)
+    if len(resolved) == len(links) == mentions:
+        return resolved
+    # Written some other way: let rdflib read it
+    ds = Dataset()
+    ds.parse(data=directives.header + statement, format="trig")
+    return tuple(
+        str(o) for _, p, o, _ in ds.quads((None, None, None, None))
+        if str(p) in _HEAD_LINKS and isinstance(o, URIRef)
+    )
+
+
+def _trig_units(source: _DumpStream, chunk_size: int) -> Iterator[_Unit]:
+    directives = _TrigDirectives()
+    for statement, brace in _trig_statements(source, chunk_size):
+        if brace < 0 and directives.add(statement):
+            continue
+        if brace < 0:
+            # Triples outside of any graph, in the default graph
+            graph: Optional[str] = DEFAULT_GRAPH
+        else:
+            name = statement[:brace].strip()
+            m = _TRIG_GRAPH_KEYWORD_RE.match(name)
+            graph = directives.resolve(name[m.end():] if m else name)
+        yield graph, statement + b"\n", _trig_head_links(directives, statement), directives.header
+
+
+def _nquads_units(source: _DumpStream) -> Iterator[_Unit]:
+    for n, line in enumerate(iter(source.readline, b""), start=1):
+        try:
+            quad = NQuadsHasher.parse_line(line.decode("utf-8"))
+        except ValueError as e:
+            raise MalformedNanopubError(f"Line {n} of the N-Quads dump: {e}") from None
+        if quad is None:
+            continue
+        c, _, p, o = quad
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        yield c, line, ((o,) if p in _HEAD_LINKS and type(o) is str else ()), b""
+
+
+class _PendingGraph:
+    __slots__ = ("parts", "size")
+
+    def __init__(self) -> None:
+        self.parts: List[Tuple[bytes, bytes]] = []
+        self.size = 0
+
+
+def _group_units(units: Iterable[_Unit], max_record_size: int) -> Iterator[bytes]:
+    """Group the units of a dump in nanopubs, using the graphs their Head graphs link to.
+
+    The units of a graph must follow each other. A nanopub is complete once its Head
+    graph and the 3 graphs it links to have been read, and another graph has started.
+    """
+    pending: Dict[Optional[str], _PendingGraph] = {}
+    size = 0
+    # The graphs of each Head graph, and the Head graph of each graph
+    members: Dict[Optional[str], set] = {}
+    heads: Dict[Optional[str], Optional[str]] = {}
+    current: Optional[_PendingGraph] = None
+    current_graph: Optional[str] = None
+
+    def complete(graph: Optional[str]) -> Optional[bytes]:
+        head = heads.get(graph)
+        if head is None or len(members[head]) < 4 or \
+                not all(g in pending and g != current_graph for g in members[head]):
+            return None
+        nonlocal size
+        record, header = [], None
+        # In the order the graphs came in the dump
+        for g in [g for g in pending if g in members[head]]:
+            graph_pending = pending.pop(g)
+            size -= graph_pending.size
+            heads.pop(g)
+            for unit_header, data in graph_pending.parts:
+                if unit_header is not header:
+                    # Directives declared before the nanopub, or in the middle of it
+                    record.append(unit_header)
+                    header = unit_header
+                record.append(data)
+        del members[head]
+        return b"".join(record)
+
+    for graph, data, links, header in units:
+        if current is None or graph != current_graph:
+            previous, current_graph = current_graph, graph
+            record = None if current is None else complete(previous)
+            if record is not None:
+                yield record
+            if graph not in pending:
+                pending[graph] = _PendingGraph()
+            current = pending[graph]
+        if links:
+            graph_members = members.setdefault(graph, {graph})
+            graph_members.update(links)
+            for g in graph_members:
+                heads[g] = graph
+        current.parts.append((header, data))
+        current.size += len(data)
+        size += len(data)
+        if size > max_record_size:
+            raise MalformedNanopubError(
+                f"Read {size} bytes of the dump without completing a nanopub: the quads of each graph "
+                f"must follow each other, and each Head graph must link to 3 other graphs")
+    if current is not None:
+        last, current_graph = current_graph, None
+        record = complete(last)
+        if record is not None:
+            yield record
+    if pending:
+        raise MalformedNanopubError(
+            f"The dump ends with {len(pending)} graphs that are not part of a complete nanopub: "
+            f"{', '.join(map(str, list(pending)[:4]))}")
+
+
+class DumpRecord(NamedTuple):
+    """A nanopub read from a dump by ``iter_dump`` with ``report_errors=True``
+
+    Args:
+        position: Position of the nanopub in the dump
+        data: The nanopub as bytes in the format of the dump
+        nanopub: The parsed ``Nanopub``, None if it could not be read
+        error: Why the nanopub could not be read, None if it was
+    """
+    position: int
+    data: bytes
+    nanopub: Optional[Nanopub]
+    error: Optional[str]
+
+
+def _parse_dump_record(data: bytes, format: str, conf: Optional[NanopubConf]) -> Nanopub:
+    if format == "nquads":
+        ds = NQuadsHasher.get_dataset(NQuadsHasher.parse(data))
+    else:
+        ds = Dataset()
+        ds.parse(data=data, format=format)
+    return Nanopub(rdf=ds, conf=conf, adopt=True)
+
+
+def _read_dump_record(position: int, data: bytes, format: str, conf: Optional[NanopubConf]) -> DumpRecord:
+    try:
+        return DumpRecord(position, data, _parse_dump_record(data, format, conf), None)
+    except Exception as e:
+        return DumpRecord(position, data, None, f"{type(e).__name__}: {e}")
+
+
+def iter_dump(
+        source: Union[Path, str, BinaryIO],
+        format: Optional[str] = None,
+        raw: bool = False,
+        conf: Optional[NanopubConf] = None,
+        workers: Optional[int] = 1,
+        max_in_flight: Optional[int] = None,
+        chunk_size: int = DEFAULT_DUMP_CHUNK_SIZE,
+        max_record_size: int = MAX_DUMP_RECORD_SIZE,
+        report_errors: bool = False,
+) -> Iterator[Union[Nanopub, bytes, DumpRecord]]:
+    """Read the nanopubs of a TriG or N-Quads dump one at a time, without loading the whole dump.
+
+    The statements of the dump are grouped in nanopubs using the graphs their Head graphs
+    link to, so the quads of each graph must follow each other in the dump. Dumps written
+    by ``NanopubDumpWriter`` or a nanopub registry hold one nanopub after the other, and
+    only one of them (a few with ``workers``) is then held in memory at once. Dumps with
+    the graphs of the nanopubs mixed up, like rdflib writes them, are read too, keeping
+    the graphs in memory until their nanopub is complete.
+
+    Plain TriG files are memory-mapped, gzipped files (recognised by their content) and
+    streams are read ``chunk_size`` bytes at a time.
+
+    Args:
+        source: Path of the dump, or a binary stream to read it from (not gzipped)
+        format: "trig" or "nquads", by default guessed from the file name (trig if unknown)
+        raw: Yield each nanopub as bytes in the format of the dump, without parsing it.
+            A TriG nanopub starts with the prefixes declared before it in the dump, to be read alone.
+        conf: Config of the yielded ``Nanopub`` objects
+        workers: Number of processes parsing the nanopubs (not used with ``raw``), ``None`` for one per CPU
+        max_in_flight: Most nanopubs being parsed by the workers at once (4 per worker by default)
+        chunk_size: Bytes read at once from gzipped files and streams
+        max_record_size: Most bytes of incomplete nanopubs held in memory before giving up
+        report_errors: Yield a ``DumpRecord`` for each nanopub (not used with ``raw``), so that
+            one that cannot be read is reported in its record rather than ending the iteration
+
+    Raises:
+        MalformedNanopubError: The dump cannot be split in nanopubs, or a nanopub is not valid
+            (unless ``report_errors``)
+    """
+    path = Path(source) if isinstance(source, (str, PurePath)) else None
+    if format is None:
+        format = "trig" if path is None else dump_format(path)[0]
+    if format not in NANOPUB_WRITER_FORMATS:
+        raise ValueError(f"Dumps of nanopubs can only be read from trig or nquads, not {format}")
+
+    with _open_dump(source, format) as stream:
+        if format == "trig":
+            units = _trig_units(stream, chunk_size)
+        else:
+            units = _nquads_units(stream)
+        records = _group_units(units, max_record_size)
+        if raw:
+            yield from records
+        elif report_errors:
+            yield from imap_bounded(
+                _read_dump_record,
+                ((i, data, format, conf) for i, data in enumerate(records)),
+                workers=workers,
+                max_in_flight=max_in_flight,
+                ordered=True,
+            )
+        else:
+            yield from imap_bounded(
+                _parse_dump_record,
+                ((data, format, conf) for data in records),
+                workers=workers,
+                max_in_flight=max_in_flight,
+                ordered=True,
+            )
+
+
+@contextmanager
+def _open_dump(source: Union[Path, str, BinaryIO], format: str) -> Iterator[_DumpStream]:
+    """Open a dump for reading: memory-map plain TriG files, decompress gzipped ones"""
+    if not isinstance(source, (str, PurePath)):
+        yield source
+        return
+    with open(source, "rb") as f:
+        if f.read(2) == b"\x1f\x8b":
+            f.seek(0)
+            with gzip.GzipFile(fileobj=f) as stream:
+                yield stream
+        elif format == "trig" and f.seek(0, io.SEEK_END) > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as stream:
+                yield stream
+        else:
+            f.seek(0)
+            yield f
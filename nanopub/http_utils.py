@@ -5,6 +5,10 @@ handle system) intermittently answer with transient errors that succeed on an
 immediate retry. This module provides a requests Session that retries those
 automatically, so callers do not have to.
 """
+import os
+import threading
+from typing import Dict, Tuple
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -23,6 +27,9 @@ DEFAULT_MAX_RETRIES = 3
 # with 3 retries this waits 0s, 1s and 2s: enough to ride out a blip without
 # stalling a caller for long when the service is genuinely down.
 DEFAULT_BACKOFF_FACTOR = 0.5
+# Connections kept open to each host, the requests default. Only raise it when
+# many threads share a session: a single thread never uses more than one.
+DEFAULT_POOL_MAXSIZE = 10
 
 
 class _TimeoutHTTPAdapter(HTTPAdapter):
@@ -47,6 +54,7 @@ def retrying_session(
         max_retries: int = DEFAULT_MAX_RETRIES,
         backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
         timeout=DEFAULT_HTTP_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
 ) -> requests.Session:
     """Build a Session that retries transient failures on idempotent requests.
 
@@ -55,7 +63,8 @@ def retrying_session(
     a POST - publishing a nanopub, for instance - is never sent twice.
 
     Once the retries are exhausted the final response is returned as-is rather
-    than raised, leaving the caller's own error handling in charge.
+    than raised, leaving the caller's own error handling in charge. Connections
+    are kept alive between requests, up to ``pool_maxsize`` per host.
     """
     retry = Retry(
         total=max_retries,
@@ -67,19 +76,39 @@ def retrying_session(
         allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
         raise_on_status=False,
     )
-    adapter = _TimeoutHTTPAdapter(max_retries=retry, timeout=timeout)
+    adapter = _TimeoutHTTPAdapter(max_retries=retry, timeout=timeout, pool_maxsize=pool_maxsize)
     session = requests.Session()
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
 
-_session: requests.Session = None
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
 
 
-def get_session() -> requests.Session:
-    """The shared retrying session, created on first use."""
-    global _session
-    if _session is None:
-        _session = retrying_session()
-    return _session
+def get_session(
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        timeout=DEFAULT_HTTP_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+) -> requests.Session:
+    """The shared retrying session with these settings, created on first use.
+
+    Sharing it is what saves the TCP and TLS handshakes: its connections stay open
+    for the next request to the same host. A process forked from one that used
+    the session gets a session of its own, rather than sharing its connections.
+    """
+    global _sessions_pid
+    if isinstance(timeout, list):
+        timeout = tuple(timeout)
+    key: Tuple = (max_retries, backoff_factor, timeout, pool_maxsize)
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            # Left open: closing them here would also close the connections of the parent
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        if key not in _sessions:
+            _sessions[key] = retrying_session(*key)
+        return _sessions[key]
@@ -2,6 +2,7 @@
 This module holds handy namespaces that are often used in nanopublications.
 """
 from rdflib import Namespace
+from rdflib.namespace import DC, DCTERMS, FOAF, PROV
 
 NP = Namespace("http://www.nanopub.org/nschema#")
 """Nanopub namespace"""
@@ -32,3 +33,17 @@ FDOF = Namespace("https://w3id.org/fdof/ontology#")
 
 FDOC = Namespace("https://w3id.org/fdoc/o/terms/")
 """FDO Connect namespace"""
+
+DEFAULT_PREFIXES = (
+    ("np", NP),
+    ("npx", NPX),
+    ("prov", PROV),
+    ("pav", PAV),
+    ("hycl", HYCL),
+    ("dc", DC),
+    ("dcterms", DCTERMS),
+    ("orcid", ORCID),
+    ("ntemplate", NTEMPLATE),
+    ("foaf", FOAF),
+)
+"""Prefixes bound in the RDF of every nanopub"""
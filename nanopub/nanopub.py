@@ -2,34 +2,68 @@
 This module holds code for representing the RDF of nanopublications, as well as helper functions to
 sign, publish, and make handling RDF easier.
 """
+import codecs
 import logging
 import re
-from copy import deepcopy
+from copy import copy, deepcopy
+from dataclasses import astuple, replace
+from functools import lru_cache
 from datetime import datetime
-from pathlib import Path
-from typing import Any, List, Optional, Union, Tuple
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Union, Tuple
 
 import rdflib
-import requests
-from rdflib import BNode, Dataset, Graph, URIRef
+from rdflib import BNode, Dataset, Graph, IdentifiedNode, URIRef
 from rdflib import RDF, Literal
-from rdflib.namespace import DC, DCTERMS, FOAF, PROV, XSD
+from rdflib.namespace import PROV, XSD
 
 from nanopub.definitions import (
-    DEFAULT_HTTP_TIMEOUT,
     MAX_TRIPLES_PER_NANOPUB,
     NANOPUB_FETCH_FORMAT,
     TEST_NANOPUB_REGISTRY_URL,
 )
-from nanopub.namespaces import HYCL, NP, NPX, NTEMPLATE, ORCID, PAV
+from nanopub.http_utils import get_session
+from nanopub.namespaces import DEFAULT_PREFIXES, NP, NPX
 from nanopub.nanopub_conf import NanopubConf
-from nanopub.profile import ProfileError
-from nanopub.serialize import serialize_nanopub_trig
-from nanopub.sign_utils import add_signature, publish_graph, verify_signature, verify_trusty
-from nanopub.utils import MalformedNanopubError, NanopubMetadata, extract_np_metadata
+from nanopub.profile import Profile, ProfileError
+from nanopub.serialize import NANOPUB_WRITER_FORMATS, serialize_nanopub, serialize_nanopub_trig
+from nanopub.sign_utils import add_signature, canonicalize_graph, publish_graph, verify_signature, verify_trusty
+from nanopub.trustyuri.rdf import NQuadsHasher
+from nanopub.utils import (
+    DatasetChangeTracker,
+    MalformedNanopubError,
+    NanopubMetadata,
+    ValidationReport,
+    extract_np_metadata,
+    scan_nanopub,
+)
+from nanopub.verification_cache import VERIFICATION_CACHE_POLICIES, digest_bytes, get_verification_cache
 
 logger = logging.getLogger(__name__)
 
+# Name rdflib gives to a BNode created without one
+UNNAMED_BNODE_RE = re.compile(r'^[Na-zA-Z0-9]{33}$')
+
+# Attributes of a lazy Nanopub that are only set once its RDF is loaded
+_LAZY_ATTRIBUTES = frozenset(("_rdf", "_metadata", "_head", "_assertion", "_provenance", "_pubinfo"))
+
+
+@lru_cache(maxsize=1)
+def _default_namespaces() -> frozenset:
+    """The (prefix, namespace) pairs bound in a new Dataset with the DEFAULT_PREFIXES"""
+    ds = Dataset()
+    for prefix, namespace in DEFAULT_PREFIXES:
+        ds.bind(prefix, namespace)
+    return frozenset((prefix, str(namespace)) for prefix, namespace in ds.namespaces())
+
+
+def _without_private_key(profile: Optional[Profile]) -> Optional[Profile]:
+    if profile is None or profile.private_key is None:
+        return profile
+    profile = copy(profile)
+    profile.private_key = None
+    return profile
+
 
 class Nanopub:
 
@@ -42,6 +76,8 @@ class Nanopub:
             rdf: Union[Dataset, Path] = None,
             introduces_concept: BNode = None,
             conf: Optional[NanopubConf] = None,
+            lazy: bool = False,
+            adopt: bool = False,
     ) -> None:
         """A Nanopub object, containing: the RDF that defines the nanopublication;
             configuration for formatting and publishing the nanopub; functions for validating, signing, publishing
@@ -54,6 +90,12 @@ class Nanopub:
                 rdf (rdflib.Dataset): The full RDF graph of this nanopublication (quads)
                 introduces_concept (rdflib.BNode): The concept that is introduced by this Publication (if applicable)
                 conf (NanopubConfig): Config for the nanopub
+                lazy (bool): Only fetch or parse the nanopub given by ``source_uri`` or ``rdf`` when its RDF
+                    or metadata are first used, and only verify it when ``is_valid`` is checked (or when it is
+                    signed or published). A Dataset given as ``rdf`` must not be modified until then.
+                adopt (bool): Use the Dataset given as ``rdf`` as the RDF of the nanopub, instead of a copy of it.
+                    Saves the copy when the Dataset is only built to be handed over, but the nanopub then owns it:
+                    it is modified by the nanopub (e.g. when signing) and must not be modified by the caller.
             """
 
         if assertion is None:
@@ -69,7 +111,6 @@ class Nanopub:
         self._introduces_concept = introduces_concept
         self._concept_uri: Optional[str] = None
         self._conf = deepcopy(conf)
-        self._metadata = NanopubMetadata()
         self._published = False
         if self._conf.use_test_server:
             self._conf.use_server = TEST_NANOPUB_REGISTRY_URL
@@ -77,33 +118,134 @@ class Nanopub:
             self._conf.use_test_server = True
 
         self._bnode_count = 0
+        self._rdf_tracker: Optional[DatasetChangeTracker] = None
+        self._canonical: Optional[Tuple[Any, list]] = None
+        self._validation: Optional[Tuple[tuple, ValidationReport, bool]] = None
+        self._serialized: Dict[str, Tuple[tuple, bytes]] = {}
+
+        if lazy and (source_uri or isinstance(rdf, (Dataset, Path))):
+            # Loaded by __getattr__ when one of the _LAZY_ATTRIBUTES is first used
+            self._pending_load = dict(
+                source_uri=source_uri, assertion=assertion, provenance=provenance, pubinfo=pubinfo, rdf=rdf,
+                introduces_concept=introduces_concept, adopt=adopt,
+            )
+            return
+        self._load(source_uri, assertion, provenance, pubinfo, rdf, introduces_concept, adopt)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes that are not set: those of a lazy nanopub that is not loaded yet
+        if name in _LAZY_ATTRIBUTES and "_pending_load" in self.__dict__:
+            pending = self.__dict__.pop("_pending_load")
+            try:
+                self._load(**pending, verify=False)
+            except BaseException:
+                # Leave the nanopub as it was, to be loaded again on next use
+                for lazy_name in _LAZY_ATTRIBUTES:
+                    self.__dict__.pop(lazy_name, None)
+                self._pending_load = pending
+                raise
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getstate__(self) -> dict:
+        """Pickle the RDF as N-Quads, and the profile without its private key unless ``conf.pickle_private_key``"""
+        rdf = self._rdf
+        state = {
+            name: value for name, value in self.__dict__.items()
+            if name not in _LAZY_ATTRIBUTES and name not in ("_rdf_tracker", "_canonical", "_validation", "_serialized")
+        }
+        state["_metadata"] = self._metadata
+        state["_rdf"] = serialize_nanopub(rdf, format="nquads", encoding="utf-8")
+        # Only the namespaces that are not bound in every Dataset of a nanopub
+        state["_namespaces"] = [
+            (prefix, str(namespace)) for prefix, namespace in rdf.namespaces()
+            if (prefix, str(namespace)) not in _default_namespaces()
+        ]
+        if not self._conf.pickle_private_key:
+            state["_profile"] = _without_private_key(self._profile)
+            state["_conf"] = replace(self._conf, profile=_without_private_key(self._conf.profile))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuild a pickled nanopub, as it was: it is not verified again"""
+        state = state.copy()
+        nquads = state.pop("_rdf")
+        namespaces = state.pop("_namespaces")
+        self.__dict__.update(state)
+        self._rdf_tracker = None
+        self._canonical = None
+        self._validation = None
+        self._serialized = {}
+        self._rdf = Dataset()
+        for prefix, namespace in DEFAULT_PREFIXES:
+            self._rdf.bind(prefix, namespace)
+        for prefix, namespace in namespaces:
+            self._rdf.bind(prefix, namespace, replace=True)
+        NQuadsHasher.get_dataset(NQuadsHasher.parse(nquads), self._rdf)
+        self._head = Graph(self._rdf.store, self._metadata.head)
+        self._assertion = Graph(self._rdf.store, self._metadata.assertion)
+        self._provenance = Graph(self._rdf.store, self._metadata.provenance)
+        self._pubinfo = Graph(self._rdf.store, self._metadata.pubinfo)
+
+    def __deepcopy__(self, memo: dict) -> "Nanopub":
+        # A copy keeps everything, the private key included, unlike a pickle
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        clone.__dict__.update(deepcopy(self.__dict__, memo))
+        return clone
+
+    def _load(
+            self,
+            source_uri: Optional[str],
+            assertion: Graph,
+            provenance: Graph,
+            pubinfo: Graph,
+            rdf: Union[Dataset, Path, None],
+            introduces_concept: Optional[BNode],
+            adopt: bool = False,
+            verify: bool = True,
+    ) -> None:
+        """Get the RDF of the nanopub and its metadata, and verify it if it is trusty and ``verify`` is set"""
+        self._metadata = NanopubMetadata()
+        # The bytes the nanopub is loaded from, to look it up in the verification cache
+        source_bytes: Optional[bytes] = None
 
         # Get the nanopub RDF depending on how it is provided:
         # source URI, rdflib graph, or file
         if source_uri:
-            # If source URI provided we retrieve the nanopub from the servers
-            r = requests.get(
-                source_uri + "." + NANOPUB_FETCH_FORMAT, timeout=DEFAULT_HTTP_TIMEOUT
+            # If source URI provided we retrieve the nanopub from the servers,
+            # reusing the open connections of the session configured for it
+            session = get_session(
+                max_retries=self._conf.http_max_retries,
+                timeout=self._conf.http_timeout,
+                pool_maxsize=self._conf.http_pool_size,
             )
+            r = session.get(source_uri + "." + NANOPUB_FETCH_FORMAT)
             if not r.ok and self._conf.use_test_server:
                 nanopub_id = source_uri.rsplit("/", 1)[-1]
                 uri_test = TEST_NANOPUB_REGISTRY_URL + nanopub_id
-                r = requests.get(
-                    uri_test + "." + NANOPUB_FETCH_FORMAT, timeout=DEFAULT_HTTP_TIMEOUT
-                )
+                r = session.get(uri_test + "." + NANOPUB_FETCH_FORMAT)
             r.raise_for_status()
+            if self._conf.verification_cache != "off":
+                source_bytes = r.text.encode()
             self._rdf = self._preformat_graph(Dataset())
             self._rdf.parse(data=r.text, format=NANOPUB_FETCH_FORMAT)
 
             self._metadata = extract_np_metadata(self._rdf)
         else:
             # if provided as rdflib graph, or file
-            if isinstance(rdf, Dataset):
+            if isinstance(rdf, Dataset) and adopt:
+                logger.debug("Dataset provided by caller with adopt=True; using it in place")
+                self._rdf = self._preformat_graph(rdf)
+                self._metadata = extract_np_metadata(self._rdf)
+            elif isinstance(rdf, Dataset):
                 logger.debug("Dataset provided by caller; making deepcopy to avoid mutating caller's store")
                 self._rdf = self._preformat_graph(deepcopy(rdf))
                 logger.debug("Deepcopied dataset quads: %d", sum(1 for _ in self._rdf.quads((None, None, None, None))))
                 self._metadata = extract_np_metadata(self._rdf)
             elif isinstance(rdf, Path):
+                if self._conf.verification_cache != "off":
+                    source_bytes = rdf.read_bytes()
                 self._rdf = self._preformat_graph(Dataset())
                 self._rdf.parse(rdf)
                 self._metadata = extract_np_metadata(self._rdf)
@@ -138,7 +280,8 @@ class Nanopub:
         if self._metadata.trusty:
             self._source_uri = str(self._metadata.np_uri)
             # if the newly created nanopub is trusty it means was fetched or read from a file therefore we need to ensure is a valid one and not taking that for granted
-            _ = self.is_valid
+            if verify:
+                self._check_loaded_trusty(source_bytes)
 
         # Add Head graph if the nanopub was not provided as trig/nquads
         if not rdf and not source_uri:
@@ -185,19 +328,33 @@ class Nanopub:
             )
             self._handle_derived_from(derived_from=self._conf.derived_from)
 
+    def _check_loaded_trusty(self, source_bytes: Optional[bytes]) -> None:
+        """Verify a trusty nanopub that has just been loaded, unless the verification cache has these bytes.
+
+        Nanopubs given as a Dataset have no bytes to look up, and are always verified.
+        """
+        policy = self._conf.verification_cache
+        if policy not in VERIFICATION_CACHE_POLICIES:
+            raise ValueError(
+                f"Unknown verification_cache policy '{policy}', it should be one of {', '.join(VERIFICATION_CACHE_POLICIES)}")
+        trusty = self._metadata.trusty
+        if policy == "off" or source_bytes is None or trusty is None:
+            _ = self.is_valid
+            return
+        cache = get_verification_cache(self._conf.verification_cache_path, self._conf.verification_cache_size)
+        digest = digest_bytes(source_bytes)
+        if policy in ("read", "read-write") and cache.contains(trusty, digest):
+            logger.debug("Nanopub %s found in the verification cache, skipping its verification", self._source_uri)
+            return
+        _ = self.is_valid
+        if policy in ("write", "read-write"):
+            cache.add(trusty, digest)
+
     def _preformat_graph(self, g: Dataset) -> Dataset:
         """Add a few default namespaces"""
         logger.debug("Preformat graph: incoming quads=%d", sum(1 for _ in g.quads((None, None, None, None))))
-        g.bind("np", NP)
-        g.bind("npx", NPX)
-        g.bind("prov", PROV)
-        g.bind("pav", PAV)
-        g.bind("hycl", HYCL)
-        g.bind("dc", DC)
-        g.bind("dcterms", DCTERMS)
-        g.bind("orcid", ORCID)
-        g.bind("ntemplate", NTEMPLATE)
-        g.bind("foaf", FOAF)
+        for prefix, namespace in DEFAULT_PREFIXES:
+            g.bind(prefix, namespace)
         g = self._replace_blank_nodes(g)
         logger.debug("Preformat graph: after replace_blank_nodes quads=%d",
                      sum(1 for _ in g.quads((None, None, None, None))))
@@ -239,6 +396,8 @@ class Nanopub:
             signed_g = add_signature(self.rdf, self._conf.profile, self._metadata.namespace, self._pubinfo)
             self.update_from_signed(signed_g)
             logger.info("Nanopub signed; new source_uri=%s", self.source_uri)
+            # Serialized once here, then reused to publish, store or print the signed nanopub
+            self.to_bytes('trig')
         else:
             raise MalformedNanopubError("The nanopub is not valid, cannot sign it")
 
@@ -252,7 +411,7 @@ class Nanopub:
                 raise MalformedNanopubError("The nanopub is not valid, cannot publish it")
             self._check_ill_typed_literals()
 
-        publish_graph(self.rdf, use_server=self._conf.use_server)
+        publish_graph(self.rdf, use_server=self._conf.use_server, data=self.to_bytes('trig'))
         logger.info(f'Published {self.source_uri} to {self._conf.use_server}')
         self.published = True
 
@@ -288,64 +447,121 @@ class Nanopub:
         """Serialize the Nanopub, returning it as a string if no destination is given.
 
         TriG output lists the graphs in the conventional Head, assertion, provenance,
-        pubinfo order; other formats are serialized by rdflib as-is.
+        pubinfo order. TriG and N-Quads are written by the nanopub writer of
+        ``nanopub.serialize`` and reused until the RDF is modified (see ``to_bytes``),
+        other formats (or other rdflib options) by rdflib as-is.
         """
+        if format in NANOPUB_WRITER_FORMATS and set(kwargs) <= {"encoding"}:
+            encoding = kwargs.get("encoding")
+            if encoding is not None and codecs.lookup(encoding).name != "utf-8":
+                return serialize_nanopub(self._rdf, destination, format=format, metadata=self._metadata, **kwargs)
+            data = self.to_bytes(format)
+            if destination is None:
+                return data if encoding is not None else data.decode("utf-8")
+            if isinstance(destination, (str, PurePath)):
+                Path(destination).write_bytes(data)
+            else:
+                destination.write(data)
+            return self._rdf
         if format == 'trig':
             return serialize_nanopub_trig(self._rdf, destination, metadata=self._metadata, **kwargs)
         return self._rdf.serialize(destination, format=format, **kwargs)
 
+    def to_bytes(self, format: str = 'trig') -> bytes:
+        """The nanopub serialized in ``trig`` or ``nquads``, as UTF-8 bytes.
+
+        The serialization in each format is kept and reused until the RDF is modified,
+        so a signed nanopub is only serialized once to be published, stored and printed.
+        """
+        key = self._validation_key()
+        cached = self._serialized.get(format)
+        if cached is None or cached[0] != key:
+            cached = (key, serialize_nanopub(self._rdf, format=format, metadata=self._metadata, encoding="utf-8"))
+            self._serialized[format] = cached
+        return cached[1]
+
     def store(self, filepath: Path, format: str = 'trig') -> None:
         """Store the Nanopub object at the given path"""
         self.serialize(filepath, format=format)
 
+    def _rdf_state(self) -> tuple:
+        """An opaque value that changes whenever the RDF is modified, to know what to compute again."""
+        if self._rdf_tracker is None or self._rdf_tracker.dataset is not self._rdf:
+            self._rdf_tracker = DatasetChangeTracker(self._rdf)
+            self._canonical = None
+            self._validation = None
+            self._serialized = {}
+        return self._rdf_tracker.state
+
+    def _canonical_quads(self) -> list:
+        """The canonical form of the RDF, shared by the signature and trusty checks.
+
+        It is computed once and reused until the RDF is modified.
+        """
+        key = (self._rdf_state(), str(self._metadata.namespace))
+        if self._canonical is None or self._canonical[0] != key:
+            self._canonical = (key, canonicalize_graph(self._rdf, self._metadata.namespace))
+        return self._canonical[1]
+
     @property
     def has_valid_signature(self) -> bool:
-        verify_signature(self._rdf, self.source_uri, self._metadata.namespace)
+        verify_signature(self._rdf, self.source_uri, self._metadata.namespace, self._canonical_quads())
         return True
 
     @property
     def has_valid_trusty(self) -> bool:
-        verify_trusty(self._rdf, self.source_uri, self._metadata.namespace)
+        verify_trusty(self._rdf, self.source_uri, self._metadata.namespace, self._canonical_quads())
         return True
 
+    def _validation_key(self) -> tuple:
+        return self._rdf_state(), astuple(self._metadata), self._source_uri
+
+    @property
+    def validation_report(self) -> ValidationReport:
+        """The structural facts checked by ``is_valid``, gathered in one pass over the quads.
+
+        It is computed once and reused until the RDF, metadata or source URI change.
+        """
+        return self._validation_state()[1]
+
+    def _validation_state(self) -> Tuple[tuple, ValidationReport, bool]:
+        """The key the validation was made for, its report, and whether the nanopub was found valid"""
+        key = self._validation_key()
+        if self._validation is None or self._validation[0] != key:
+            self._validation = (key, scan_nanopub(self._rdf, self._metadata, self._source_uri), False)
+        return self._validation
+
     @property
     def is_valid(self) -> bool:
-        """Check if a nanopublication is valid"""
+        """Check if a nanopublication is valid
+
+        Once it is, checking again does nothing until the RDF is modified.
+        """
+        key, report, valid = self._validation_state()
+        if valid:
+            return True
+
         # Check if any of the graph is empty
-        if len(self._head) < 1:
+        if report.head_size < 1:
             raise MalformedNanopubError("The Head graph is empty")
-        if len(self._assertion) < 1:
+        if report.assertion_size < 1:
             raise MalformedNanopubError("The assertion graph is empty")
-        if len(self._provenance) < 1:
+        if report.provenance_size < 1:
             raise MalformedNanopubError("The provenance graph is empty")
-        if len(self._pubinfo) < 1:
+        if report.pubinfo_size < 1:
             raise MalformedNanopubError("The pubinfo graph is empty")
 
         # Check exactly 4 graphs
-        graph_count = 0
-        for c in self._rdf.contexts():
-            if len(list(self._rdf.quads((None, None, None, c)))) > 0:
-                graph_count += 1
+        graph_count = len(report.graph_sizes)
         if graph_count != 4:
             raise MalformedNanopubError(
                 f"\033[1mToo many graphs found\033[0m in the provided RDF: {graph_count}. A Nanopub should have only 4 graphs (Head, assertion, provenance, pubinfo)")
 
-        found_prov = False
-        for s, p, o in self._provenance:
-            if str(s) == str(self._assertion.identifier):
-                found_prov = True
-                break
-        if not found_prov:
+        if not report.has_assertion_provenance:
             raise MalformedNanopubError(
                 f"The provenance graph should contain at least one triple with the assertion graph URI as subject: \033[1m{self._assertion}\033[0m")
 
-        found_pubinfo = False
-        np_uri_str = str(self._metadata.np_uri)
-        for s, p, o in self._pubinfo:
-            if str(s) in (str(self._source_uri), str(self._metadata.namespace), np_uri_str):
-                found_pubinfo = True
-                break
-        if not found_pubinfo:
+        if not report.has_pubinfo_about_nanopub:
             raise MalformedNanopubError(
                 f"The pubinfo graph should contain at least one triple that has the nanopub URI as subject: \033[1m{self._source_uri}\033[0m")
 
@@ -370,21 +586,18 @@ class Nanopub:
         if self._metadata.trusty:
             if not self.has_valid_trusty:
                 raise MalformedNanopubError("The trusty nanopub is not valid")
+        self._validation = (key, report, True)
         return True
 
     @property
-    def ill_typed_literals(self) -> List[Tuple[Literal, URIRef]]:
+    def ill_typed_literals(self) -> List[Tuple[Literal, Optional[IdentifiedNode]]]:
         """The literals whose lexical form is not valid for their declared datatype.
 
         Returns a list of ``(literal, graph)`` pairs, empty when the nanopub is fine.
         Literals without a datatype, with a language tag, or with a datatype rdflib does
         not recognize cannot be checked and are never reported.
         """
-        return [
-            (o, c)
-            for s, p, o, c in self._rdf.quads((None, None, None, None))
-            if isinstance(o, Literal) and o.ill_typed
-        ]
+        return list(self.validation_report.ill_typed_literals)
 
     @property
     def rdf(self) -> Dataset:
@@ -659,36 +872,66 @@ class Nanopub:
         nanopublication's URI), but it should still lie within the space of the nanopub.
         Furthermore, the URI the nanopub is published to is not known ahead of time.
         """
+        # Collect the quads with blank nodes in one scan, and leave a graph without any untouched
+        bnode_quads = [q for q in g.quads((None, None, None, None)) if isinstance(q[0], BNode) or isinstance(q[2], BNode)]
+        if not bnode_quads:
+            return g
+        new_quads, self._bnode_count = self._named_blank_node_quads(bnode_quads, self._bnode_count)
+        for s, p, o, c in bnode_quads:
+            g.remove((s, p, o, Graph(store=g.store, identifier=c)))
+        g.addN((s, p, o, Graph(store=g.store, identifier=c)) for s, p, o, c in new_quads)
+        return g
+
+    def _named_blank_node_quads(self, bnode_quads: list, bnode_count: int) -> Tuple[list, int]:
+        """The quads with their blank nodes replaced by URIs in the nanopub namespace, and the new blank node count"""
+        # Blank nodes are numbered in the order they are met, subject before object, as
+        # the numbers end up in the URIs that are signed
         bnode_map: dict = {}
-        for s, p, o, c in g.quads(None):
-            if isinstance(s, BNode):
-                g.remove((s, p, o, c))
-                if str(s) not in bnode_map:
-                    if re.match(r'^[Na-zA-Z0-9]{33}$', str(s)):
-                        # Unnamed BNode looks like N2c21867a547345d9b8a203a7c1cd7e0c
-                        self._bnode_count += 1
-                        bnode_map[str(s)] = self._bnode_count
-                    else:
-                        bnode_map[str(s)] = str(s)
-                s = self._metadata.namespace[f"_{bnode_map[str(s)]}"]
-                g.add((s, p, o, c))
-
-            if isinstance(o, BNode):
-                g.remove((s, p, o, c))
-                if str(o) not in bnode_map:
-                    # if str(o).startswith("N") and len(str(o)) == 33:
-                    if re.match(r'^[Na-zA-Z0-9]{33}$', str(o)):
-                        self._bnode_count += 1
-                        bnode_map[str(o)] = self._bnode_count
-                    else:
-                        bnode_map[str(o)] = str(o)
-                old_o = o
-                o = self._metadata.namespace[f"_{bnode_map[str(o)]}"]
-
-                g.add((s, p, o, c))
-                logger.debug("Replaced object BNode %s -> %s (graph=%s, subj=%s, pred=%s)", old_o, o, c, s, p)
+
+        def replace(node):
+            nonlocal bnode_count
+            name = str(node)
+            if name not in bnode_map:
+                if UNNAMED_BNODE_RE.match(name):
+                    # Unnamed BNode looks like N2c21867a547345d9b8a203a7c1cd7e0c
+                    bnode_count += 1
+                    bnode_map[name] = bnode_count
+                else:
+                    bnode_map[name] = name
+            return self._metadata.namespace[f"_{bnode_map[name]}"]
+
+        new_quads = [
+            (
+                replace(s) if isinstance(s, BNode) else s,
+                p,
+                replace(o) if isinstance(o, BNode) else o,
+                c,
+            )
+            for s, p, o, c in bnode_quads
+        ]
         logger.debug("Blank node mapping: %s", bnode_map)
-        return g
+        return new_quads, bnode_count
+
+    def to_nquads_for_signing(self) -> bytes:
+        """The RDF as N-Quads UTF-8 bytes, with the blank nodes named as ``sign()`` would name them.
+
+        Blank node labels do not survive parsing N-Quads, so this is how an unsigned nanopub
+        is sent to be signed elsewhere. The nanopub itself is left untouched.
+        """
+        bnode_quads = [
+            q for q in self._rdf.quads((None, None, None, None)) if isinstance(q[0], BNode) or isinstance(q[2], BNode)
+        ]
+        if not bnode_quads:
+            return self.to_bytes('nquads')
+        new_quads, _ = self._named_blank_node_quads(bnode_quads, self._bnode_count)
+        ds = Dataset()
+        ds.addN(
+            (s, p, o, Graph(store=ds.store, identifier=c))
+            for s, p, o, c in self._rdf.quads((None, None, None, None))
+            if not (isinstance(s, BNode) or isinstance(o, BNode))
+        )
+        ds.addN((s, p, o, Graph(store=ds.store, identifier=c)) for s, p, o, c in new_quads)
+        return serialize_nanopub(ds, format="nquads", metadata=self._metadata, encoding="utf-8")
 
     def _check_ill_typed_literals(self) -> None:
         """Refuses an ill-typed literal in a nanopub that is not signed yet.
@@ -1,7 +1,8 @@
 from dataclasses import asdict, dataclass
-from typing import Optional
+from typing import Optional, Tuple, Union
 
-from nanopub.definitions import NANOPUB_REGISTRY_URLS
+from nanopub.definitions import DEFAULT_HTTP_TIMEOUT, DEFAULT_VERIFICATION_CACHE_SIZE, NANOPUB_REGISTRY_URLS
+from nanopub.http_utils import DEFAULT_MAX_RETRIES, DEFAULT_POOL_MAXSIZE
 from nanopub.profile import Profile
 
 
@@ -20,6 +21,16 @@ class NanopubConf:
         assertion_attributed_to: Optional str
         publication_attributed_to: Optional str
         derived_from: Optional str
+        verification_cache: Use of the cache of verified trusty nanopubs when loading them:
+            "off" (verify every time), "read" (skip the verification of cached nanopubs),
+            "write" (verify every time and cache the valid ones), or "read-write"
+        verification_cache_path: SQLite file of the cache, ~/.nanopub/verification_cache.sqlite by default
+        verification_cache_size: Most nanopubs kept in the cache, the least recently used are evicted
+        pickle_private_key: Keep the private key of the profile when the nanopub is pickled (e.g. to sign it
+            in another process), by default it is left out
+        http_timeout: Timeout of the requests fetching nanopubs, as a (connect, read) tuple in seconds
+        http_max_retries: Retries of a fetch failing with a connection error or a transient server error
+        http_pool_size: Most connections kept open to each server, raise it to fetch from many threads
     """
 
     profile: Optional[Profile] = None
@@ -38,4 +49,14 @@ class NanopubConf:
 
     derived_from: Optional[str] = None
 
+    verification_cache: str = "off"
+    verification_cache_path: Optional[str] = None
+    verification_cache_size: int = DEFAULT_VERIFICATION_CACHE_SIZE
+
+    pickle_private_key: bool = False
+
+    http_timeout: Union[float, Tuple[float, float]] = DEFAULT_HTTP_TIMEOUT
+    http_max_retries: int = DEFAULT_MAX_RETRIES
+    http_pool_size: int = DEFAULT_POOL_MAXSIZE
+
     dict = asdict
@@ -0,0 +1,62 @@
+"""Helpers to spread work on many nanopublications over several processes."""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Set
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def imap_bounded(
+        fn: Callable[..., Any],
+        args_iter: Iterable[tuple],
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        ordered: bool = False,
+) -> Iterator[Any]:
+    """Call ``fn(*args)`` for each tuple of ``args_iter`` in a process pool, and yield the results.
+
+    At most ``max_in_flight`` calls (4 per worker by default) are pending at any time, and
+    ``args_iter`` is only consumed as results come back, so memory use does not grow with
+    the number of items. Results are yielded as they complete, or in input order if
+    ``ordered`` is set. With ``workers=1`` everything runs in the current process.
+
+    ``fn`` and its arguments are sent to the workers with pickle: use a module-level
+    function and plain arguments (e.g. bytes rather than rdflib graphs).
+    """
+    if workers is None:
+        workers = default_workers()
+    if workers <= 1:
+        for args in args_iter:
+            yield fn(*args)
+        return
+    if max_in_flight is None:
+        max_in_flight = workers * 4
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            queue: Deque[Future] = deque()
+            for args in args_iter:
+                queue.append(executor.submit(fn, *args))
+                if len(queue) >= max_in_flight:
+                    yield queue.popleft().result()
+            while queue:
+                yield queue.popleft().result()
+        else:
+            pending: Set[Future] = set()
+            for args in args_iter:
+                pending.add(executor.submit(fn, *args))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        # Also reached when the caller stops iterating early: drop the queued work
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -5,11 +5,13 @@ import logging
 import os
 import warnings
 from base64 import b64encode, decodebytes
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
 import yatiml
 from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
 
 from nanopub.definitions import DEFAULT_PROFILE_PATH, RSA_KEY_SIZE, USER_CONFIG_DIR
 from nanopub.orcid_id import OrcidID, looks_like_orcid
@@ -86,6 +88,7 @@ class Profile:
         self.agent_id = agent_id
         self._name = name
         self._introduction_nanopub_uri = introduction_nanopub_uri
+        self._signer: Any = None
 
         if not private_key:
             self.generate_keys()
@@ -128,6 +131,7 @@ class Profile:
 
         self._private_key = _encode_private_key(key)
         self._public_key = _encode_public_key(key)
+        self._signer = None
         logger.info(f"Public/private RSA key pair has been generated for {self.agent_id} ({self.name})")
         return public_key_str
 
@@ -208,6 +212,14 @@ introduction_nanopub_uri:{intro_uri}
     @private_key.setter
     def private_key(self, value):
         self._private_key = value
+        self._signer = None
+
+    @property
+    def signer(self):
+        """The PKCS#1 v1.5 signature scheme with the private key, parsed on first use"""
+        if self._signer is None:
+            self._signer = get_signer(self._private_key)
+        return self._signer
 
     @property
     def public_key(self):
@@ -225,6 +237,12 @@ introduction_nanopub_uri:{intro_uri}
     def introduction_nanopub_uri(self, value):
         self._introduction_nanopub_uri = value
 
+    def __getstate__(self):
+        # Parsed keys cannot be copied or pickled, copies get the signer from the cache again
+        state = self.__dict__.copy()
+        state["_signer"] = None
+        return state
+
     def __repr__(self):
         return f"""\033[1mAgent ID\033[0m: {self._agent_id}
 \033[1mName\033[0m: {self._name}
@@ -375,6 +393,27 @@ def _load_rsa_key(key_data: str) -> RSA.RsaKey:
         ) from None
 
 
+@lru_cache(maxsize=16)
+def get_signer(private_key: str) -> Any:
+    """Get the PKCS#1 v1.5 signature scheme for a private key in nanopub's base64 form.
+
+    Parsing a private key takes a while, so the last ones used are kept; the cache
+    statistics are in ``get_signer.cache_info()``.
+    """
+    return pkcs1_15.new(RSA.import_key(decodebytes(private_key.encode())))
+
+
+@lru_cache(maxsize=1024)
+def get_verifier(public_key: str) -> Any:
+    """Get the PKCS#1 v1.5 signature scheme to verify signatures with a public key in base64.
+
+    A bounded LRU cache keyed by the key string keeps the verifiers of recent signers,
+    since a corpus of nanopubs is usually signed by few of them. The hit and miss counts
+    are in ``get_verifier.cache_info()``.
+    """
+    return pkcs1_15.new(RSA.import_key(decodebytes(public_key.encode())))
+
+
 def normalize_private_key(key_data: str) -> str:
     """Normalize any RSA private key to nanopub's canonical single-line base64.
 
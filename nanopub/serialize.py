@@ -14,15 +14,25 @@ The serializer is registered with rdflib under the ``nanopub-trig`` format, so i
 also works on a bare Dataset::
 
     dataset.serialize(format="nanopub-trig")
+
+rdflib's serializers are generic, and slow for the small and fixed structure of a
+nanopub. ``write_nanopub_trig`` and ``write_nanopub_nquads`` write nanopubs straight
+to a binary stream, with the prefixes known in advance and without pretty-printing
+analysis; ``serialize_nanopub`` wraps them like ``Dataset.serialize``.
 """
+import io
 import logging
-from typing import Any, IO, List, Optional, Sequence
+import re
+from pathlib import PurePath
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence
 
-from rdflib import Dataset, URIRef, plugin
-from rdflib.graph import Graph
+from rdflib import BNode, Dataset, Literal, URIRef, plugin
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID, Graph
+from rdflib.namespace import RDF
 from rdflib.plugins.serializers.trig import TrigSerializer
 from rdflib.serializer import Serializer
 
+from nanopub.namespaces import DEFAULT_PREFIXES
 from nanopub.utils import MalformedNanopubError, NanopubMetadata, extract_np_metadata
 
 logger = logging.getLogger(__name__)
@@ -115,4 +125,169 @@ def serialize_nanopub_trig(
     return rdf.serialize(destination, format=NANOPUB_TRIG_FORMAT, **kwargs)
 
 
+#: Formats written by ``serialize_nanopub``.
+NANOPUB_WRITER_FORMATS = ("trig", "nquads")
+
+# Characters that cannot appear as they are in an IRI, and must be written as \u escapes
+_IRI_ESCAPE_RE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+# Local names and blank node labels that can be written as they are (a subset of what TriG allows)
+_LOCAL_NAME_RE = re.compile(r'(?:[A-Za-z0-9_](?:[A-Za-z0-9_.\-]*[A-Za-z0-9_\-])?)?')
+_BNODE_LABEL_RE = re.compile(r'[A-Za-z0-9_](?:[A-Za-z0-9_.\-]*[A-Za-z0-9_\-])?')
+
+
+def _iri(value: str) -> str:
+    if _IRI_ESCAPE_RE.search(value) is None:
+        return "<" + value + ">"
+    return "<" + _IRI_ESCAPE_RE.sub(lambda m: f"\\u{ord(m.group(0)):04X}", value) + ">"
+
+
+def _write_term(term: Any, iri: Callable[[str], str], bnodes: Dict[str, str]) -> str:
+    """Write one term, with ``iri`` writing IRIs and ``bnodes`` naming blank nodes that have no valid label"""
+    if type(term) is URIRef:
+        return iri(str(term))
+    if isinstance(term, Literal):
+        lexical = str(term)
+        text = '"' + lexical.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r") + '"'
+        if term.language:
+            return text + "@" + term.language
+        if term.datatype is not None:
+            return text + "^^" + iri(str(term.datatype))
+        return text
+    if isinstance(term, BNode):
+        label = str(term)
+        if _BNODE_LABEL_RE.fullmatch(label) is None:
+            # The same made up label for all its occurrences
+            label = bnodes.setdefault(label, f"b{len(bnodes)}")
+        return "_:" + label
+    return iri(str(term))
+
+
+def write_nanopub_nquads(rdf: Dataset, stream: IO[bytes], encoding: str = "utf-8") -> None:
+    """Write the quads of ``rdf`` as N-Quads to a binary stream"""
+    bnodes: Dict[str, str] = {}
+    store = rdf.store
+    lines = []
+    for graph in store.contexts():
+        c = getattr(graph, "identifier", graph)
+        end = " .\n" if c == DATASET_DEFAULT_GRAPH_ID else f" {_write_term(c, _iri, bnodes)} .\n"
+        for (s, p, o), _ in store.triples((None, None, None), graph):
+            lines.append(
+                f"{_write_term(s, _iri, bnodes)} {_write_term(p, _iri, bnodes)} {_write_term(o, _iri, bnodes)}{end}")
+    stream.write("".join(lines).encode(encoding))
+
+
+def write_nanopub_trig(
+    rdf: Dataset,
+    stream: IO[bytes],
+    metadata: Optional[NanopubMetadata] = None,
+    encoding: str = "utf-8",
+) -> None:
+    """Write a nanopub as TriG to a binary stream.
+
+    The graphs come in conventional order (see ``nanopub_graph_order``), followed by any
+    other graph. IRIs are abbreviated with the prefixes bound in ``rdf``, or else with the
+    default prefixes of nanopubs, and only the prefixes used are declared. Empty graphs
+    are left out, like rdflib does.
+    """
+    prefixes = {str(namespace): prefix for prefix, namespace in DEFAULT_PREFIXES}
+    taken = set(prefixes.values())
+    for prefix, namespace in rdf.namespaces():
+        if prefix in taken:
+            # The prefix is bound to another namespace in the dataset
+            prefixes = {ns: p for ns, p in prefixes.items() if p != prefix}
+        prefixes[str(namespace)] = prefix
+        taken.add(prefix)
+    used: Dict[str, str] = {}
+
+    def iri(value: str) -> str:
+        if value in prefixes:
+            namespace, local = value, ""
+        else:
+            split = max(value.rfind("/"), value.rfind("#")) + 1
+            namespace, local = value[:split], value[split:]
+            if namespace not in prefixes or _LOCAL_NAME_RE.fullmatch(local) is None:
+                return _iri(value)
+        prefix = used[namespace] = prefixes[namespace]
+        return f"{prefix}:{local}"
+
+    # The same terms come back in many triples, write each of them once
+    terms: Dict[Any, str] = {}
+    bnodes: Dict[str, str] = {}
+
+    def term(t: Any) -> str:
+        try:
+            return terms[t]
+        except KeyError:
+            text = terms[t] = _write_term(t, iri, bnodes)
+            return text
+
+    graphs: Dict[Any, Dict[str, Dict[str, List[str]]]] = {}
+    store = rdf.store
+    for graph in store.contexts():
+        subjects: Dict[str, Dict[str, List[str]]] = {}
+        for (s, p, o), _ in store.triples((None, None, None), graph):
+            predicate = "a" if p == RDF.type else term(p)
+            subjects.setdefault(term(s), {}).setdefault(predicate, []).append(term(o))
+        if subjects:
+            graphs[getattr(graph, "identifier", graph)] = subjects
+
+    order = nanopub_graph_order(metadata) if metadata is not None else _resolve_graph_order(rdf)
+    names = sorted(graphs, key=lambda c: order.index(c) if c in order else len(order))
+    blocks = []
+    for c in names:
+        statements = []
+        for subject in sorted(graphs[c]):
+            predicates = graphs[c][subject]
+            # rdf:type first, like rdflib does
+            properties = [
+                f"{p} {', '.join(sorted(predicates[p]))}"
+                for p in sorted(predicates, key=lambda p: (p != "a", p))
+            ]
+            statements.append(f"{subject} " + " ;\n        ".join(properties) + " .\n")
+        if c == DATASET_DEFAULT_GRAPH_ID:
+            blocks.append("\n".join(statements))
+        else:
+            blocks.append(term(c) + " {\n    " + "\n    ".join(statements) + "}\n")
+
+    header = "".join(f"@prefix {prefix}: {_iri(namespace)} .\n" for namespace, prefix in sorted(
+        used.items(), key=lambda item: item[1]))
+    if header:
+        header += "\n"
+    stream.write((header + "\n".join(blocks)).encode(encoding))
+
+
+def serialize_nanopub(
+    rdf: Dataset,
+    destination: Any = None,
+    format: str = "trig",
+    metadata: Optional[NanopubMetadata] = None,
+    encoding: Optional[str] = None,
+) -> Any:
+    """Serialize a nanopub with ``write_nanopub_trig`` or ``write_nanopub_nquads``, like ``Dataset.serialize``.
+
+    Returns the serialization as a string (as bytes if an ``encoding`` is given) when no
+    ``destination`` is given, else writes it to the destination path or binary stream.
+    """
+    if format not in NANOPUB_WRITER_FORMATS:
+        raise ValueError(f"Nanopubs can only be written as {' or '.join(NANOPUB_WRITER_FORMATS)}, not {format}")
+
+    def write(stream: IO[bytes]) -> None:
+        if format == "trig":
+            write_nanopub_trig(rdf, stream, metadata=metadata, encoding=encoding or "utf-8")
+        else:
+            write_nanopub_nquads(rdf, stream, encoding=encoding or "utf-8")
+
+    if destination is None:
+        stream = io.BytesIO()
+        write(stream)
+        data = stream.getvalue()
+        return data if encoding is not None else data.decode("utf-8")
+    if isinstance(destination, (str, PurePath)):
+        with open(destination, "wb") as f:
+            write(f)
+    else:
+        write(destination)
+    return rdf
+
+
 plugin.register(NANOPUB_TRIG_FORMAT, Serializer, "nanopub.serialize", "NanopubTrigSerializer")
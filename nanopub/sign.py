@@ -0,0 +1,119 @@
+"""Sign many nanopublications at once, using several processes."""
+import dataclasses
+from functools import partial
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from rdflib import Dataset
+
+from nanopub.nanopub import Nanopub
+from nanopub.nanopub_conf import NanopubConf
+from nanopub.parallel import imap_bounded
+from nanopub.profile import Profile
+from nanopub.serialize import NANOPUB_WRITER_FORMATS
+
+SignInput = Union[Nanopub, bytes]
+
+
+class SignResult(NamedTuple):
+    """Result of the signature of one nanopub by ``sign_many``
+
+    Args:
+        position: Position of the nanopub in the input
+        source_uri: The trusty URI of the signed nanopub, None if it could not be signed
+        data: The signed nanopub serialized in the requested format
+        error: Why the nanopub could not be signed, None if it was
+        nanopub: The signed ``Nanopub``, only when ``sign_many`` is called with ``rebuild=True``
+    """
+    position: int
+    source_uri: Optional[str]
+    data: Optional[bytes]
+    error: Optional[str]
+    nanopub: Optional[Nanopub] = None
+
+
+def sign_one(
+        position: int,
+        data: Union[bytes, Exception],
+        conf: Optional[NanopubConf],
+        format: str = "trig",
+        rebuild: bool = False,
+) -> SignResult:
+    """Sign one unsigned nanopub given as N-Quads bytes.
+
+    Errors are reported in the result rather than raised, those met while preparing
+    the input (given in place of the data) included.
+    """
+    try:
+        if isinstance(data, Exception):
+            raise data
+        ds = Dataset()
+        ds.parse(data=data, format="nquads")
+        np = Nanopub(rdf=ds, conf=conf, adopt=True)
+        np.sign()
+        if format in NANOPUB_WRITER_FORMATS:
+            signed = np.to_bytes(format)
+        else:
+            signed = np.serialize(format=format, encoding="utf-8")
+        return SignResult(position, np.source_uri, signed, None, np if rebuild else None)
+    except Exception as e:
+        return SignResult(position, None, None, f"{type(e).__name__}: {e}")
+
+
+def _sign_args(
+        nanopubs: Iterable[SignInput],
+        profile: Optional[Profile],
+) -> Iterator[Tuple[int, Union[bytes, Exception], Optional[NanopubConf]]]:
+    for i, item in enumerate(nanopubs):
+        try:
+            if isinstance(item, Nanopub):
+                conf = item.conf if profile is None else dataclasses.replace(item.conf, profile=profile)
+                yield i, item.to_nquads_for_signing(), conf
+            elif isinstance(item, bytes):
+                yield i, item, NanopubConf(profile=profile)
+            else:
+                raise TypeError(
+                    f"Nanopubs to sign must be given as Nanopub objects or N-Quads bytes, "
+                    f"but got {type(item).__name__}")
+        except Exception as e:
+            # Reported in the result of this nanopub, by sign_one()
+            yield i, e, None
+
+
+def sign_many(
+        nanopubs: Iterable[SignInput],
+        profile: Optional[Profile] = None,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        ordered: bool = True,
+        format: str = "trig",
+        rebuild: bool = False,
+) -> Iterator[SignResult]:
+    """Sign many nanopubs in parallel, yielding a ``SignResult`` for each.
+
+    The nanopubs are sent to the worker processes (``os.cpu_count()`` by default,
+    ``workers=1`` signs in the current process) as N-Quads, and signed there like
+    ``Nanopub.sign()`` does. The given nanopubs are left untouched: use the returned
+    ``data``, or ``rebuild=True`` to get the signed ``Nanopub`` objects.
+
+    Args:
+        nanopubs: Unsigned ``Nanopub`` objects, or unsigned nanopubs as N-Quads bytes.
+            Consumed lazily, it can be a generator over millions of nanopubs.
+        profile: Profile to sign with, by default the profile of the config of each nanopub
+            (required for N-Quads bytes)
+        workers: Number of worker processes
+        max_in_flight: Most nanopubs sent to the workers and not yet yielded back
+            (4 per worker by default), this keeps memory use flat
+        ordered: Yield the results in input order, otherwise as soon as they are signed
+        format: RDF format of the returned ``data``
+        rebuild: Also return the signed ``Nanopub`` objects. They are built in the workers,
+            and sent back pickled: without their private key unless ``conf.pickle_private_key``
+
+    A nanopub that cannot be signed does not stop the others, its result has an ``error``.
+    """
+    return imap_bounded(
+        partial(sign_one, format=format, rebuild=rebuild),
+        _sign_args(nanopubs, profile),
+        workers=workers,
+        max_in_flight=max_in_flight,
+        ordered=ordered,
+    )
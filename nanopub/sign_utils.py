@@ -1,12 +1,11 @@
 import logging
 import re
 from base64 import decodebytes, encodebytes
+from typing import Optional, Union
 
 import requests
 from Crypto.Hash import SHA256
-from Crypto.PublicKey import RSA
-from Crypto.Signature import PKCS1_v1_5
-from rdflib import BNode, Dataset, Graph, Literal, Namespace, URIRef
+from rdflib import RDF, BNode, Dataset, Graph, Literal, Namespace, URIRef
 
 from nanopub.definitions import (
     DEFAULT_HTTP_TIMEOUT,
@@ -14,11 +13,12 @@ from nanopub.definitions import (
     NP_PREFIX,
     NP_TEMP_PREFIX,
 )
-from nanopub.namespaces import NPX
-from nanopub.profile import Profile
-from nanopub.trustyuri.rdf import RdfHasher, RdfUtils
-from nanopub.trustyuri.rdf.RdfPreprocessor import transform
-from nanopub.utils import MalformedNanopubError
+from nanopub.namespaces import NP, NPX
+from nanopub.profile import Profile, get_verifier
+from nanopub.serialize import serialize_nanopub
+from nanopub.trustyuri.rdf import NQuadsHasher, RdfHasher, RdfUtils
+from nanopub.trustyuri.rdf.RdfUtils import TrustyRewriter
+from nanopub.utils import MalformedNanopubError, nanopub_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -49,38 +49,39 @@ def add_signature(g: Dataset, profile: Profile, dummy_namespace: Namespace, pubi
         URIRef(profile.agent_id),
         pubinfo_g,
     ))
-    # Normalize RDF
-    quads = RdfUtils.get_quads(g)
-    normed_rdf = RdfHasher.normalize_quads(
-        quads,
+    # Normalize RDF once: the signature quad is inserted in this canonical sequence
+    # afterwards, instead of normalizing the whole graph again for the trusty hash
+    canonical_quads = RdfHasher.canonicalize_quads(
+        RdfUtils.get_quads(g),
         baseuri=str(dummy_namespace),
         hashstr=" "
     )
-    # Note: normed_rdf needs to end with a newline
-    # print(f"NORMED RDF STARTS\n{normed_rdf}\nNORMED RDF ENDS")
+    hash_value = RdfHasher.update_hash_canonical(SHA256.new(), canonical_quads)
 
     # Sign the normalized RDF with the private RSA key
-    private_key = RSA.import_key(decodebytes(profile.private_key.encode()))
-    signer = PKCS1_v1_5.new(private_key)
-    signature_b = signer.sign(SHA256.new(normed_rdf.encode()))
+    signature_b = profile.signer.sign(hash_value)
     signature = encodebytes(signature_b).decode().replace("\n", "")
     logger.debug(f"Nanopub signature: {signature}")
 
     # Add the signature to the graph
-    g.add((
+    signature_quad = (
         dummy_namespace["sig"],
         NPX["hasSignature"],
         Literal(signature),
         pubinfo_g,
-    ))
+    )
+    g.add(signature_quad)
 
     # Generate the trusty URI
-    quads = RdfUtils.get_quads(g)
-    trusty_artefact = RdfHasher.make_hash(
-        quads,
+    # (as in RdfUtils.get_quads, a graph that is not named by a URI counts as the default graph)
+    signature_context = pubinfo_g.identifier if isinstance(pubinfo_g.identifier, URIRef) else None
+    RdfHasher.insert_canonical_quad(
+        canonical_quads,
+        (signature_context, *signature_quad[:3]),
         baseuri=str(dummy_namespace),
         hashstr=" "
     )
+    trusty_artefact = RdfHasher.make_hash_canonical(canonical_quads)
     logger.debug(f"Trusty artefact: {trusty_artefact}")
 
     g = replace_trusty_in_graph(trusty_artefact, str(dummy_namespace), g)
@@ -100,58 +101,82 @@ def replace_trusty_in_graph(trusty_artefact: str, dummy_ns: str, graph: Dataset)
     graph.bind("sub", Namespace(np_uri + "/"))
     graph.bind("", None, replace=True)
 
-    # Iterate quads in the graph, and replace by the transformed value
+    # Translate each distinct term a single time, in the order the quads are visited so
+    # that blank nodes are numbered as they are encountered
+    rewriter = TrustyRewriter(dummy_ns, trusty_artefact)
     bnodemap: dict = {}
+    translations: dict = {}
+
+    def translate(term):
+        if term not in translations:
+            translations[term] = URIRef(rewriter.rewrite(term, bnodemap))
+        return translations[term]
+
+    new_quads = []
     for s, p, o, c in graph.quads(None):
-        if c:
-            g = c
-        else:
+        if not c:
             raise Exception(
                 "Found a nquads without graph when replacing dummy URIs with trusty URIs. Something went wrong.")
-        # new_g = Graph(identifier=str(transform(g, trusty_artefact, dummy_ns, bnodemap)))
-        # Fails and make the nanopub empty
-        new_g = URIRef(transform(g, trusty_artefact, dummy_ns, bnodemap))
-        new_s = URIRef(transform(s, trusty_artefact, dummy_ns, bnodemap))
-        new_p = URIRef(transform(p, trusty_artefact, dummy_ns, bnodemap))
+        new_g = translate(c)
+        new_s = translate(s)
+        new_p = translate(p)
         new_o = o
         if isinstance(o, URIRef) or isinstance(o, BNode):
-            new_o = URIRef(transform(o, trusty_artefact, dummy_ns, bnodemap))
-
-        graph.remove((s, p, o, c))
-        graph.add((new_s, new_p, new_o, new_g))  # type: ignore
+            new_o = translate(o)
+        new_quads.append((new_s, new_p, new_o, Graph(store=graph.store, identifier=new_g)))
 
+    # Swap the content of the store in bulk, rather than one remove and add per quad
+    graph.remove((None, None, None, None))  # type: ignore
+    graph.addN(new_quads)
     return graph
 
 
-def publish_graph(g: Dataset, use_server: str = NANOPUB_REGISTRY_URLS[0]) -> bool:
+def publish_graph(g: Dataset, use_server: str = NANOPUB_REGISTRY_URLS[0], data: Optional[bytes] = None) -> bool:
     """Publish a signed nanopub to the given nanopub server.
+
+    Pass ``data`` to post the nanopub already serialized as TriG UTF-8 bytes.
     """
     logger.info(f"Publishing to the nanopub server {use_server}")
     headers = {'Content-Type': 'application/trig'}
     # NOTE: nanopub-java uses {'Content-Type': 'application/x-www-form-urlencoded'}
-    data = g.serialize(format="trig")
+    if data is None:
+        data = serialize_nanopub(g, format="trig", encoding="utf-8")
     r = requests.post(
         use_server,
         headers=headers,
-        data=data.encode('utf-8'),
+        data=data,
         timeout=DEFAULT_HTTP_TIMEOUT,
     )
     r.raise_for_status()
     return True
 
 
-def verify_trusty(g: Dataset, source_uri: str, source_namespace: Namespace) -> bool:
-    """Verify Trusty URI in a nanopub Graph"""
+def canonicalize_graph(g: Dataset, source_namespace: Namespace) -> list:
+    """The canonical quads of a nanopub Graph, as used to check its signature and trusty URI"""
+    return RdfHasher.canonicalize_quads(
+        RdfUtils.get_quads(g),
+        baseuri=str(source_namespace),
+        hashstr=" "
+    )
+
+
+def verify_trusty(
+        g: Dataset,
+        source_uri: str,
+        source_namespace: Namespace,
+        canonical_quads: Optional[list] = None,
+) -> bool:
+    """Verify Trusty URI in a nanopub Graph
+
+    Pass ``canonical_quads`` (from ``canonicalize_graph``) to reuse an already computed canonical form.
+    """
     if not source_uri:
         raise ValueError("source_uri must not be None")
     _m = re.search(r'RA[A-Za-z0-9_\-]{40,}', source_uri)
     source_trusty = _m.group(0) if _m else source_uri.split('/')[-1]
-    quads = RdfUtils.get_quads(g)
-    expected_trusty = RdfHasher.make_hash(
-        quads,
-        baseuri=str(source_namespace),
-        hashstr=" "
-    )
+    if canonical_quads is None:
+        canonical_quads = canonicalize_graph(g, source_namespace)
+    expected_trusty = RdfHasher.make_hash_canonical(canonical_quads)
     if expected_trusty != source_trusty:
         raise MalformedNanopubError(
             f"The Trusty artefact of the nanopub {source_trusty} is not valid. It should be {expected_trusty}")
@@ -159,8 +184,65 @@ def verify_trusty(g: Dataset, source_uri: str, source_namespace: Namespace) -> b
         return True
 
 
-def verify_signature(g: Dataset, source_uri: str, source_namespace: Namespace) -> bool:
-    """Verify RSA signature in a nanopub Graph"""
+def verify_trusty_nquads(data: Union[str, bytes]) -> bool:
+    """Verify the Trusty URI of a nanopub given as N-Quads, without loading it in an rdflib Dataset
+
+    Gives the same result as ``verify_trusty`` on the parsed nanopub, for bulk verification.
+    """
+    quads = NQuadsHasher.parse(data)
+    np_uri, head = _find_nanopub_in_quads(quads)
+    _, source_namespace = nanopub_namespace(np_uri, head)
+    return verify_trusty_quads(quads, np_uri, source_namespace)
+
+
+def verify_trusty_quads(quads: list, np_uri: str, source_namespace: Union[Namespace, str]) -> bool:
+    """Verify the Trusty URI of a nanopub given as quads parsed by ``NQuadsHasher``"""
+    _m = RdfUtils.TRUSTY_CODE_RE.search(np_uri)
+    source_trusty = _m.group(0) if _m else np_uri.split('/')[-1]
+    expected_trusty = NQuadsHasher.make_hash(quads, " ", str(source_namespace))
+    if expected_trusty != source_trusty:
+        raise MalformedNanopubError(
+            f"The Trusty artefact of the nanopub {source_trusty} is not valid. It should be {expected_trusty}")
+    return True
+
+
+def _find_nanopub_in_quads(quads: list) -> tuple:
+    """Get the nanopub URI and head graph of quads returned by ``NQuadsHasher.parse()``"""
+    links = {str(NP.hasAssertion), str(NP.hasProvenance), str(NP.hasPublicationInfo)}
+    found_links: dict = {}
+    candidates = []
+    for c, s, p, o in quads:
+        if c is None:
+            continue
+        if p == str(RDF.type) and o == str(NP.Nanopublication):
+            candidates.append((s, c))
+        elif p in links and not isinstance(o, NQuadsHasher.NQuadsLiteral):
+            found_links.setdefault((s, c), set()).add(p)
+    nanopubs = sorted(set(np for np in candidates if found_links.get(np) == links))
+    if len(nanopubs) < 1:
+        raise MalformedNanopubError(
+            "\033[1mNo nanopublication\033[0m has been found in the provided RDF. "
+            "It should contain a np:Nanopublication object in a Head graph, "
+            "pointing to 3 graphs: assertion, provenance and pubinfo"
+        )
+    if len(nanopubs) > 1:
+        raise MalformedNanopubError(
+            f"\033[1mMultiple nanopublications\033[0m are defined in this graph: {', '.join(np for np, _ in nanopubs)}. "
+            "The Nanopub object can only handles 1 nanopublication at a time"
+        )
+    return nanopubs[0]
+
+
+def verify_signature(
+        g: Dataset,
+        source_uri: str,
+        source_namespace: Namespace,
+        canonical_quads: Optional[list] = None,
+) -> bool:
+    """Verify RSA signature in a nanopub Graph
+
+    Pass ``canonical_quads`` (from ``canonicalize_graph``) to reuse an already computed canonical form.
+    """
     # Get signature and public key from the triples
     np_signature_target = [s for s, _, _, _ in g.quads((None, NPX.hasSignatureTarget, URIRef(source_uri), None))]
     if not np_signature_target:
@@ -185,19 +267,18 @@ def verify_signature(g: Dataset, source_uri: str, source_namespace: Namespace) -
                 f"Signature algorithm '{np_algo}' is not supported, only RSA is supported"
             )
 
-    # Normalize RDF
-    quads = RdfUtils.get_quads(g)
-    normed_rdf = RdfHasher.normalize_quads(
-        quads,
-        baseuri=str(source_namespace),
-        hashstr=" "
-    )
+    # Normalize RDF, streaming it straight into the message hash
+    if canonical_quads is None:
+        canonical_quads = canonicalize_graph(g, source_namespace)
+    # The signature was made before its hasSignature triple was added: leave it out
+    rewriter = TrustyRewriter(str(source_namespace), " ")
+    signature_triple = (rewriter.rewrite(np_signature_target, {}), rewriter.rewrite(NPX.hasSignature, {}))
+    hash_value = RdfHasher.update_hash_canonical(
+        SHA256.new(), [q for q in canonical_quads if (q[1], q[2]) != signature_triple])
     np_pubkey = [o for _, _, o, _ in g.quads((np_signature_target, NPX.hasPublicKey, None, None))][0]
     # Verify signature using the normalized RDF
-    key = RSA.import_key(decodebytes(str(np_pubkey).encode()))
-    hash_value = SHA256.new(normed_rdf.encode())
-    verifier = PKCS1_v1_5.new(key)
     try:
+        verifier = get_verifier(str(np_pubkey))
         verifier.verify(hash_value, decodebytes(str(np_sign).encode()))
     except Exception as e:
         raise MalformedNanopubError(e)
@@ -211,3 +292,42 @@ def verify_signature(g: Dataset, source_uri: str, source_namespace: Namespace) -
     #     raise MalformedNanopubError(
     #         f"Invalid signedBy value '{np_signedBy}' in the nanopublication RDF, it should be an ORCID iD starting with 'https://orcid.org/'")
     return True
+
+
+def verify_signature_quads(quads: list, np_uri: str, source_namespace: Union[Namespace, str]) -> bool:
+    """Verify the RSA signature of a nanopub given as quads parsed by ``NQuadsHasher``, like ``verify_signature``"""
+    np_signature_target = [s for _, s, p, o in quads if p == str(NPX.hasSignatureTarget) and o == np_uri]
+    if not np_signature_target:
+        raise MalformedNanopubError(f"No Signature targeting the '{np_uri}' nanopublication")
+    np_signature_target = np_signature_target[0]
+
+    def signature_values(predicate) -> list:
+        return [o.lexical if isinstance(o, NQuadsHasher.NQuadsLiteral) else o
+                for _, s, p, o in quads if s == np_signature_target and p == str(predicate)]
+
+    np_sign = signature_values(NPX.hasSignature)
+    if not np_sign:
+        raise MalformedNanopubError("No Signature found in the nanopublication RDF")
+    np_algo = signature_values(NPX.hasAlgorithm)
+    if np_algo and np_algo[0].upper() != "RSA":
+        if np_algo[0].upper() == "DSA":
+            logger.info("DSA signature algorithm is not supported yet, skipping signature verification")
+            return True
+        raise MalformedNanopubError(
+            f"Signature algorithm '{np_algo[0]}' is not supported, only RSA is supported"
+        )
+
+    canonical_quads = NQuadsHasher.canonicalize_quads(quads, " ", str(source_namespace))
+    # The signature was made before its hasSignature triple was added: leave it out
+    rewriter = TrustyRewriter(str(source_namespace), " ")
+    signature_triple = (rewriter.rewrite_uri(np_signature_target), rewriter.rewrite_uri(str(NPX.hasSignature)))
+    hash_value = SHA256.new()
+    for chunk in NQuadsHasher.iter_canonical_quads(q for q in canonical_quads if (q[1], q[2]) != signature_triple):
+        hash_value.update(chunk)
+    np_pubkey = signature_values(NPX.hasPublicKey)
+    try:
+        verifier = get_verifier(np_pubkey[0])
+        verifier.verify(hash_value, decodebytes(np_sign[0].encode()))
+    except Exception as e:
+        raise MalformedNanopubError(e)
+    return True
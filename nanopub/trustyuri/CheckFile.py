@@ -1,7 +1,12 @@
-import codecs
+import argparse
+import glob
+import json
 import logging
+import os
 import sys
+import time
 
+from nanopub.parallel import imap_bounded
 from nanopub.trustyuri import ModuleDirectory, TrustyUriUtils
 from nanopub.trustyuri.TrustyUriResource import TrustyUriResource
 
@@ -14,20 +19,109 @@ except Exception:
 def check(args):
     filename = args[0]
 
+    if filename.startswith("-") or os.path.isdir(filename) or ("://" not in filename and glob.has_magic(filename)):
+        check_batch(args)
+        return
+
     tail = TrustyUriUtils.get_trustyuri_tail(filename)
     module_id = tail[:2]
     module = ModuleDirectory.get_module(module_id)
-    try:
-        content = codecs.open(filename, 'r', 'utf-8').read()
-    except Exception:
-        content = urlopen(filename).read()
-    resource = TrustyUriResource(filename, content, tail)
+    if os.path.isfile(filename):
+        # Read by the module, in binary and only as far as it needs
+        resource = TrustyUriResource(filename, None, tail)
+    else:
+        # Downloaded as the module reads it, rather than all at once
+        resource = TrustyUriResource(filename, None, tail, opener=lambda: urlopen(filename))
     if module.has_correct_hash(resource):
         print("Correct hash: " + tail)
     else:
         print("*** INCORRECT HASH ***")
 
 
+def check_file(filename):
+    """Check the hash of a local trusty file, returning a summary record rather than printing it"""
+    start = time.perf_counter()
+    tail = TrustyUriUtils.get_trustyuri_tail(filename)
+    record = {
+        "file": filename,
+        "module": tail[:2] or None,
+        "expected": tail or None,
+        "computed": None,
+        "ok": False,
+        "seconds": 0.0,
+        "bytes": 0,
+        "error": None,
+    }
+    try:
+        record["bytes"] = os.path.getsize(filename)
+        try:
+            module = ModuleDirectory.get_module(tail[:2])
+        except KeyError:
+            raise ValueError(f"No trusty URI module for artifact code '{tail}'")
+        record["computed"] = module.make_hash(TrustyUriResource(filename, None, tail))
+        record["ok"] = record["computed"] == tail
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def find_files(patterns):
+    """Expand directories and glob patterns to the files to check.
+
+    Directories are searched recursively for files with a known module in their name, glob
+    patterns (``**`` included) and plain file names are checked whatever their name.
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if TrustyUriUtils.get_trustyuri_tail(name)[:2] in ModuleDirectory.modules:
+                        yield os.path.join(root, name)
+        elif glob.has_magic(pattern):
+            for filename in sorted(glob.iglob(pattern, recursive=True)):
+                if os.path.isfile(filename):
+                    yield filename
+        else:
+            yield pattern
+
+
+def check_files(patterns, workers=None):
+    """Check the files matching the patterns over a pool of workers, yielding `check_file()` records as they come"""
+    return imap_bounded(check_file, ((f,) for f in find_files(patterns)), workers=workers)
+
+
+def check_batch(args):
+    parser = argparse.ArgumentParser(
+        prog="CheckFile", description="Check the hashes of trusty files in directories or matching glob patterns")
+    parser.add_argument("patterns", nargs="+", help="Directories, glob patterns or files to check")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes (all cores by default)")
+    parser.add_argument("-o", "--output", default=None, help="Write the JSON lines summary to this file instead of stdout")
+    opts = parser.parse_args(args)
+
+    out = open(opts.output, "w") if opts.output else sys.stdout
+    start = time.perf_counter()
+    count = failed = size = 0
+    try:
+        for record in check_files(opts.patterns, workers=opts.workers):
+            out.write(json.dumps(record) + "\n")
+            count += 1
+            size += record["bytes"]
+            if not record["ok"]:
+                failed += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    seconds = time.perf_counter() - start
+    print(
+        f"Checked {count} files ({failed} incorrect) in {seconds:.2f}s: "
+        f"{count / seconds if seconds else 0:.1f} files/s, {size / 1e6 / seconds if seconds else 0:.2f} MB/s",
+        file=sys.stderr,
+    )
+    return failed == 0
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.ERROR)
     args = sys.argv
@@ -1,5 +1,7 @@
 class TrustyUriModule:
     def module_id(self):
         return ""
+    def make_hash(self, resource):
+        return None
     def has_correct_hash(self, resource):
         return False
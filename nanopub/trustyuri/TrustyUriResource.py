@@ -1,11 +1,29 @@
+import io
+
+
 class TrustyUriResource:
-    def __init__(self, filename, content, hashstr):
+    def __init__(self, filename, content=None, hashstr=None, opener=None):
+        # Without content, the file is only read when get_content() is called. An opener is a
+        # callable returning a binary file object, used instead of the file (e.g. for a download).
         self.filename = filename
         self.content = content
         self.hashstr = hashstr
+        self.opener = opener
     def get_filename(self):
         return self.filename
     def get_hashstr(self):
         return self.hashstr
     def get_content(self):
+        if self.content is None:
+            with self.open() as f:
+                self.content = f.read()
         return self.content
+    def open(self):
+        """Binary file object over the content, which does not load the file in memory"""
+        if self.content is None:
+            if self.opener is not None:
+                return self.opener()
+            return open(self.filename, 'rb')
+        if isinstance(self.content, str):
+            return io.BytesIO(self.content.encode())
+        return io.BytesIO(self.content)
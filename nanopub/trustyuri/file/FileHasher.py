@@ -8,3 +8,13 @@ def make_hash(content):
         return "FA" + TrustyUriUtils.get_base64(hashlib.sha256(content).digest())
     except Exception:
         return "FA" + TrustyUriUtils.get_base64(hashlib.sha256(content.encode()).digest())
+
+
+def make_hash_stream(f):
+    """Hash a binary file object, reading it in fixed-size chunks rather than all at once"""
+    return "FA" + TrustyUriUtils.get_base64(hashlib.file_digest(f, "sha256").digest())
+
+
+def make_hash_file(filename):
+    with open(filename, 'rb') as f:
+        return make_hash_stream(f)
@@ -5,6 +5,8 @@ from nanopub.trustyuri.TrustyUriModule import TrustyUriModule
 class FileModule(TrustyUriModule):
     def module_id(self):
         return "FA"
+    def make_hash(self, resource):
+        with resource.open() as f:
+            return FileHasher.make_hash_stream(f)
     def has_correct_hash(self, resource):
-        h = FileHasher.make_hash(resource.get_content())
-        return resource.get_hashstr() == h
+        return resource.get_hashstr() == self.make_hash(resource)
@@ -8,14 +8,13 @@ from nanopub.trustyuri.file import FileHasher
 def process(args):
     filename = args[0]
 
-    with open(filename) as f:
-        hashstr = FileHasher.make_hash(f.read())
-        ext = ""
-        base = filename
-        if re.search(r'.\.[A-Za-z0-9\-_]{0,20}$', filename):
-            ext = re.sub(r'^(.*)(\.[A-Za-z0-9\-_]{0,20})$', r'\2', filename)
-            base = re.sub(r'^(.*)(\.[A-Za-z0-9\-_]{0,20})$', r'\1', filename)
-        os.rename(filename, base + "." + hashstr + ext)
+    hashstr = FileHasher.make_hash_file(filename)
+    ext = ""
+    base = filename
+    if re.search(r'.\.[A-Za-z0-9\-_]{0,20}$', filename):
+        ext = re.sub(r'^(.*)(\.[A-Za-z0-9\-_]{0,20})$', r'\2', filename)
+        base = re.sub(r'^(.*)(\.[A-Za-z0-9\-_]{0,20})$', r'\1', filename)
+    os.rename(filename, base + "." + hashstr + ext)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,26 @@
-import re
-
 from rdflib.term import URIRef
 
 
 def addhash(quads, hashstr):
     newquads = []
+    # The same terms come back in many quads: substitute the hash in each of them only once
+    transformed: dict = {}
     for q in quads:
-        c = transform(q[0], hashstr)
-        s = transform(q[1], hashstr)
-        p = transform(q[2], hashstr)
+        c = transform(q[0], hashstr, transformed)
+        s = transform(q[1], hashstr, transformed)
+        p = transform(q[2], hashstr, transformed)
         o = q[3]
         if isinstance(q[3], URIRef):
-            o = transform(q[3], hashstr)
+            o = transform(q[3], hashstr, transformed)
         newquads.append((c, s, p, o))
     return newquads
 
 
-def transform(uri, hashstr):
+def transform(uri, hashstr, transformed=None):
     if uri is None:
         return None
-    return URIRef(re.sub(" ", hashstr, str(uri)))
+    if transformed is None:
+        return URIRef(str(uri).replace(" ", hashstr))
+    if uri not in transformed:
+        transformed[uri] = URIRef(str(uri).replace(" ", hashstr))
+    return transformed[uri]
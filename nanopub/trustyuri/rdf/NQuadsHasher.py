@@ -0,0 +1,244 @@
+"""Compute trusty hashes straight from N-Quads, without building rdflib graphs.
+
+Terms are kept as plain strings: IRIs as ``str``, blank nodes as `BlankNode` (a ``str``
+holding the label) and literals as `NQuadsLiteral` tuples. Preprocessing, ordering and
+serialization follow `RdfPreprocessor`, `StatementComparator` and `RdfHasher`, so the
+codes are the ones `RdfHasher.make_hash` gives for the same quads loaded in a `Dataset`.
+
+rdflib renames blank nodes when parsing, so a nanopub that still has blank nodes only
+gets the same code here if its labels are the ones rdflib would hash. Signed nanopubs
+have none: they are replaced with URIs before signing.
+"""
+import hashlib
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+
+from nanopub.trustyuri import TrustyUriUtils
+from nanopub.trustyuri.rdf import RdfUtils
+from nanopub.trustyuri.rdf.RdfHasher import literal_to_string
+from nanopub.trustyuri.rdf.StatementComparator import StatementComparator, literal_key
+
+
+class BlankNode(str):
+    """Label of a blank node"""
+    __slots__ = ()
+
+
+class NQuadsLiteral(NamedTuple):
+    lexical: str
+    datatype: Optional[str] = None
+    language: Optional[str] = None
+
+
+Quad = Tuple[Optional[str], str, str, Union[str, NQuadsLiteral]]
+
+_IRI = r'[^<>"\\\x00-\x20]*(?:\\(?:u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8})[^<>"\\\x00-\x20]*)*'
+_BNODE = r'[^\s<>"]*[^\s<>".]'
+_LITERAL = r'[^"\\\n\r]*(?:\\.[^"\\\n\r]*)*'
+_LANG = r'[a-zA-Z]+(?:-[a-zA-Z0-9]+)*'
+_WS = r'[ \t]*'
+LINE_RE = re.compile(
+    rf'{_WS}(?:<(?P<s>{_IRI})>|_:(?P<sb>{_BNODE}))'
+    rf'{_WS}<(?P<p>{_IRI})>'
+    rf'{_WS}(?:<(?P<o>{_IRI})>|_:(?P<ob>{_BNODE})|"(?P<ol>{_LITERAL})"'
+    rf'(?:\^\^<(?P<dt>{_IRI})>|@(?P<lang>{_LANG}))?)'
+    rf'(?:{_WS}(?:<(?P<g>{_IRI})>|_:(?P<gb>{_BNODE})))?'
+    rf'{_WS}\.{_WS}(?:#.*)?$'
+)
+EMPTY_LINE_RE = re.compile(rf'{_WS}(?:#.*)?$')
+ESCAPE_RE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+DEFAULT_GRAPH = str(DATASET_DEFAULT_GRAPH_ID)
+
+
+def _unescape_char(m) -> str:
+    if m.group(3) is None:
+        return chr(int(m.group(1) or m.group(2), 16))
+    try:
+        return ECHARS[m.group(3)]
+    except KeyError:
+        raise ValueError(f"Invalid escape sequence \\{m.group(3)}")
+
+
+def unescape(s: str) -> str:
+    if '\\' not in s:
+        return s
+    return ESCAPE_RE.sub(_unescape_char, s)
+
+
+def parse_line(line: str) -> Optional[Quad]:
+    """Parse one line of N-Quads to a quad, in (context, subject, predicate, object) order.
+
+    Returns None for empty and comment lines. Triples without a graph name go in the
+    default graph of an rdflib ``Dataset``, blank node graph names are returned as None,
+    like `RdfUtils.get_quads` does.
+    """
+    m = LINE_RE.match(line)
+    if m is None:
+        if EMPTY_LINE_RE.match(line):
+            return None
+        raise ValueError(f"Invalid N-Quads statement: {line.strip()}")
+    s = unescape(m['s']) if m['sb'] is None else BlankNode(m['sb'])
+    p = unescape(m['p'])
+    if m['ol'] is not None:
+        datatype = m['dt']
+        o: Union[str, NQuadsLiteral] = NQuadsLiteral(
+            unescape(m['ol']), None if datatype is None else unescape(datatype), m['lang'])
+    elif m['ob'] is not None:
+        o = BlankNode(m['ob'])
+    else:
+        o = unescape(m['o'])
+    if m['g'] is not None:
+        c: Optional[str] = unescape(m['g'])
+    elif m['gb'] is not None:
+        c = None
+    else:
+        c = DEFAULT_GRAPH
+    return c, s, p, o
+
+
+def parse(data: Union[str, bytes]) -> List[Quad]:
+    """Parse N-Quads (text or UTF-8 bytes) to a list of distinct quads"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    quads: dict = {}
+    for n, line in enumerate(data.splitlines(), start=1):
+        try:
+            q = parse_line(line)
+        except ValueError as e:
+            raise ValueError(f"Line {n}: {e}") from None
+        if q is None:
+            continue
+        o = q[3]
+        # rdflib compares language tags case-insensitively, and keeps the first one it sees
+        key = q if not isinstance(o, NQuadsLiteral) or o.language is None else \
+            (q[0], q[1], q[2], o._replace(language=o.language.lower()))
+        quads.setdefault(key, q)
+    return list(quads.values())
+
+
+def preprocess(quads: Iterable[Quad], hashstr=None, baseuri=None) -> List[Quad]:
+    """Same as `RdfPreprocessor.preprocess`, for parsed N-Quads"""
+    if baseuri is None:
+        def transform(term):
+            if term is None:
+                return None
+            term = RdfUtils.normalize(term, hashstr)
+            return term.decode('utf-8') if isinstance(term, bytes) else term
+    else:
+        rewriter = RdfUtils.TrustyRewriter(baseuri, hashstr)
+        bnodemap: dict = {}
+
+        def transform(term):
+            if term is None:
+                return None
+            if isinstance(term, BlankNode):
+                return rewriter.rewrite_bnode(term, bnodemap)
+            return rewriter.rewrite_uri(term)
+
+    newquads = []
+    for c, s, p, o in quads:
+        if not isinstance(o, NQuadsLiteral):
+            o = transform(o)
+        newquads.append((transform(c), transform(s), transform(p), o))
+    return newquads
+
+
+def canonicalize_quads(quads: Iterable[Quad], hashstr=None, baseuri=None) -> List[Quad]:
+    """Same as `RdfHasher.canonicalize_quads`, for parsed N-Quads"""
+    quads = preprocess(quads, hashstr=hashstr, baseuri=baseuri)
+    comparator = StatementComparator(hashstr)
+    # The same URIs come back in many quads, normalize each of them once
+    uri_keys: dict = {}
+
+    def uri_key(r):
+        try:
+            return uri_keys[r]
+        except KeyError:
+            key = uri_keys[r] = comparator.uri_key(r)
+            return key
+
+    def sort_key(q):
+        o = q[3]
+        if isinstance(o, NQuadsLiteral):
+            obj = literal_key(o.lexical.encode('utf-8'), o.datatype, o.language)
+        else:
+            obj = (0, uri_key(o))
+        return (0,) if q[0] is None else (1, uri_key(q[0])), uri_key(q[1]), uri_key(q[2]), obj
+
+    return sorted(quads, key=sort_key)
+
+
+def value_to_string(value) -> str:
+    if value is None:
+        return "\n"
+    if isinstance(value, NQuadsLiteral):
+        return literal_to_string(value.lexical, value.datatype, value.language)
+    return f"{value}\n"
+
+
+def iter_canonical_quads(canonical_quads) -> Iterator[bytes]:
+    """Same as `RdfHasher.iter_canonical_quads`, for quads from `canonicalize_quads()`"""
+    previous = None
+    for q in canonical_quads:
+        e = value_to_string(q[0]) + value_to_string(q[1]) + value_to_string(q[2]) + value_to_string(q[3])
+        if e != previous:
+            yield e.encode('utf-8')
+        previous = e
+
+
+def normalize_quads(quads: Iterable[Quad], hashstr=None, baseuri=None) -> str:
+    return b"".join(iter_canonical_quads(canonicalize_quads(quads, hashstr, baseuri))).decode('utf-8')
+
+
+def make_hash(quads: Iterable[Quad], hashstr=None, baseuri=None) -> str:
+    """Same as `RdfHasher.make_hash`, for quads returned by `parse()`"""
+    h = hashlib.sha256()
+    for chunk in iter_canonical_quads(canonicalize_quads(quads, hashstr, baseuri)):
+        h.update(chunk)
+    return "RA" + TrustyUriUtils.get_base64(h.digest())
+
+
+def to_rdflib(term):
+    """The rdflib term of a term returned by `parse()`"""
+    if isinstance(term, BlankNode):
+        return BNode(term)
+    if isinstance(term, NQuadsLiteral):
+        return Literal(term.lexical, lang=term.language, datatype=term.datatype)
+    return URIRef(term)
+
+
+def get_dataset(quads: Iterable[Quad], dataset: Optional[Dataset] = None) -> Dataset:
+    """Same as `RdfUtils.get_dataset`, for quads returned by `parse()`, keeping the blank node labels.
+
+    Blank node graph names are not kept by `parse()`: their quads all go in one new blank node graph.
+    """
+    ds = Dataset() if dataset is None else dataset
+    graphs: dict = {}
+    bnode_graph = BNode()
+
+    def graph(c):
+        if c not in graphs:
+            identifier = bnode_graph if c is None else \
+                DATASET_DEFAULT_GRAPH_ID if c == DEFAULT_GRAPH else URIRef(c)
+            graphs[c] = Graph(store=ds.store, identifier=identifier)
+        return graphs[c]
+
+    # The same IRIs come back in many quads, convert each of them once
+    uris: dict = {}
+
+    def term(t):
+        if type(t) is not str:
+            return to_rdflib(t)
+        try:
+            return uris[t]
+        except KeyError:
+            uri = uris[t] = URIRef(t)
+            return uri
+
+    # Straight to the store: Dataset.addN would make a new Graph for each quad
+    ds.store.addN((term(s), term(p), term(o), graph(c)) for c, s, p, o in quads)
+    return ds
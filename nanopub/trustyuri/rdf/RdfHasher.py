@@ -1,7 +1,8 @@
+import bisect
 import hashlib
 import logging
 import re
-from functools import cmp_to_key
+from typing import Iterator
 
 from rdflib.term import Literal
 
@@ -12,47 +13,93 @@ from nanopub.trustyuri.rdf.StatementComparator import StatementComparator
 logger = logging.getLogger(__name__)
 
 
-def normalize_quads(quads, hashstr=None, baseuri=None):
+def canonicalize_quads(quads, hashstr=None, baseuri=None) -> list:
+    """Preprocess the quads and sort them in canonical order, the order they are hashed in."""
     quads.sort()
     quads = preprocess(quads, hashstr=hashstr, baseuri=baseuri)
-    comp = StatementComparator(hashstr)
-    quads = sorted(quads, key=cmp_to_key(lambda q1, q2: comp.compare(q1, q2)))
-    s = ""
-    previous = ""
-    for q in quads:
-        e = ""
-        e = e + str(value_to_string(q[0]))
-        e = e + str(value_to_string(q[1]))
-        e = e + str(value_to_string(q[2]))
-        e = e + str(value_to_string(q[3]))
-        if not e == previous:
-            s = s + e
+    # Sorting on a precomputed key gives the same order as StatementComparator.compare,
+    # while normalizing each quad once rather than on every comparison
+    return sorted(quads, key=StatementComparator(hashstr).sort_key)
+
+
+def insert_canonical_quad(canonical_quads: list, quad, hashstr=None, baseuri=None) -> None:
+    """Preprocess a quad and insert it into quads already returned by `canonicalize_quads()`.
+
+    This gives the same sequence as canonicalizing all quads again, provided the quad has
+    no blank nodes (their numbering depends on the other quads).
+    """
+    quad = preprocess([quad], hashstr=hashstr, baseuri=baseuri)[0]
+    bisect.insort(canonical_quads, quad, key=StatementComparator(hashstr).sort_key)
+
+
+def iter_canonical_quads(canonical_quads) -> Iterator[bytes]:
+    """Yield the normalized form of canonical quads as UTF-8 bytes, one quad (4 lines) at a time.
+
+    Adjacent duplicate quads are skipped.
+    """
+    previous = None
+    for q in canonical_quads:
+        e = value_to_string(q[0]) + value_to_string(q[1]) + value_to_string(q[2]) + value_to_string(q[3])
+        if e != previous:
+            yield e.encode('utf-8')
         previous = e
+
+
+def iter_normalized_quads(quads, hashstr=None, baseuri=None) -> Iterator[bytes]:
+    """Yield the normalized form of the quads as UTF-8 bytes, one quad (4 lines) at a time.
+
+    Concatenating the chunks gives `normalize_quads()` encoded to UTF-8; adjacent duplicate
+    quads are skipped. Feed the chunks to a hash to avoid building the whole document.
+    """
+    return iter_canonical_quads(canonicalize_quads(quads, hashstr, baseuri))
+
+
+def update_hash(hash_obj, quads, hashstr=None, baseuri=None):
+    """Feed the normalized quads into `hash_obj` (a hashlib or Crypto.Hash object) and return it."""
+    return update_hash_canonical(hash_obj, canonicalize_quads(quads, hashstr, baseuri))
+
+
+def update_hash_canonical(hash_obj, canonical_quads):
+    """Like `update_hash()`, for quads already returned by `canonicalize_quads()`."""
+    for chunk in iter_canonical_quads(canonical_quads):
+        hash_obj.update(chunk)
+    return hash_obj
+
+
+def normalize_quads(quads, hashstr=None, baseuri=None) -> str:
+    s = b"".join(iter_normalized_quads(quads, hashstr, baseuri)).decode('utf-8')
     logger.debug(f"Normalized quads before signing/hashing:\n{s}")
     return s
 
 
 def make_hash(quads, hashstr=None, baseuri=None) -> str:
-    s = normalize_quads(quads, hashstr, baseuri)
+    # Use normalize_quads() instead to see what goes into the hash
+    return make_hash_canonical(canonicalize_quads(quads, hashstr, baseuri))
+
 
-    # Uncomment next line to see what goes into the hash:
-    # print("NORMALIZED QUADS IN MAKE_HASH\n" + s + "NORMALIZED QUADS IN MAKE_HASH\n")
-    return "RA" + TrustyUriUtils.get_base64(hashlib.sha256(s.encode('utf-8')).digest())
+def make_hash_canonical(canonical_quads) -> str:
+    """Like `make_hash()`, for quads already returned by `canonicalize_quads()`."""
+    digest = update_hash_canonical(hashlib.sha256(), canonical_quads).digest()
+    return "RA" + TrustyUriUtils.get_base64(digest)
 
 
 def value_to_string(value) -> str:
     if value is None:
         return "\n"
     elif isinstance(value, Literal):
-        if value.language is not None:
-            # TODO: proper canonicalization of language tags
-            return f"@{value.language.lower()} {escape(value)}\n"
-        if value.datatype is not None:
-            return f"^{value.datatype} {escape(value)}\n"
-        return f"^http://www.w3.org/2001/XMLSchema#string {escape(value)}\n"
+        return literal_to_string(value, value.datatype, value.language)
     else:
         return f"{str(value)}\n"
 
 
+def literal_to_string(lexical, datatype, language) -> str:
+    if language is not None:
+        # TODO: proper canonicalization of language tags
+        return f"@{language.lower()} {escape(lexical)}\n"
+    if datatype is not None:
+        return f"^{datatype} {escape(lexical)}\n"
+    return f"^http://www.w3.org/2001/XMLSchema#string {escape(lexical)}\n"
+
+
 def escape(s) -> str:
     return re.sub(r'\n', r'\\n', re.sub(r'\\', r'\\\\', str(s)))
@@ -6,18 +6,19 @@ from nanopub.trustyuri.rdf import RdfUtils
 def preprocess(quads, hashstr=None, baseuri=None):
     newquads = []
     bnodemap = {}
+    rewriter = RdfUtils.TrustyRewriter(baseuri, hashstr) if baseuri is not None else None
     for q in quads:
-        c = transform(q[0], hashstr, baseuri, bnodemap)
-        s = transform(q[1], hashstr, baseuri, bnodemap)
-        p = transform(q[2], hashstr, baseuri, bnodemap)
+        c = transform(q[0], hashstr, baseuri, bnodemap, rewriter)
+        s = transform(q[1], hashstr, baseuri, bnodemap, rewriter)
+        p = transform(q[2], hashstr, baseuri, bnodemap, rewriter)
         o = q[3]
         if isinstance(q[3], URIRef) or isinstance(q[3], BNode):
-            o = transform(q[3], hashstr, baseuri, bnodemap)
+            o = transform(q[3], hashstr, baseuri, bnodemap, rewriter)
         newquads.append((c, s, p, o))
     return newquads
 
 
-def transform(uri, hashstr, baseuri, bnodemap):
+def transform(uri, hashstr, baseuri, bnodemap, rewriter=None):
     if uri is None:
         return None
 
@@ -26,4 +27,6 @@ def transform(uri, hashstr, baseuri, bnodemap):
             return URIRef(RdfUtils.normalize(uri, hashstr).decode('utf-8'))
         except Exception:
             return URIRef(RdfUtils.normalize(uri, hashstr))
-    return RdfUtils.get_trustyuri(uri, baseuri, hashstr, bnodemap)
+    if rewriter is None:
+        return RdfUtils.get_trustyuri(uri, baseuri, hashstr, bnodemap)
+    return rewriter.rewrite(uri, bnodemap)
@@ -8,79 +8,120 @@ from nanopub.definitions import ARTIFACTCODE_PLACEHOLDER, NP_PREFIX, NP_TEMP_PRE
 from nanopub.trustyuri.TrustyUriUtils import is_trusty_uri, TRUSTY_ARTIFACT_RE
 
 
-def get_trustyuri(resource, base_uri, hashstr, bnodemap):
-    """Most of the work done to normalize URIs happens here"""
-    if resource is None:
+TRUSTY_CODE_RE = re.compile(r'RA[A-Za-z0-9_\-]{40,}')
+UNNAMED_BNODE_RE = re.compile(r'^[a-zA-Z0-9]{33}$')
+
+
+class TrustyRewriter:
+    """Rewrites the terms of a nanopub with the given base URI, as ``get_trustyuri`` does.
+
+    Everything that only depends on the base URI and the hash string is worked out once, and
+    the rewritten URIs are memoized, so build one rewriter per (base URI, hashstr) pair and
+    reuse it for every term of the nanopub.
+    """
+
+    def __init__(self, base_uri, hashstr):
+        self.base_uri = str(base_uri)
+        self.hashstr = hashstr
+        # baseuri passed is the np namespace, np_uri is the nanopub URI without trailing # or /
+        self.np_uri = self.base_uri
+        self.separator = "/"
+        if self.np_uri.endswith('#') or self.np_uri.endswith('/'):
+            self.separator = self.np_uri[-1]
+            self.np_uri = self.np_uri[:-1]
+        # Extract the trusty artifact if present, or remove the trailing / if trusty not present.
+        # Use regex to find the trusty code so non-standard schemes like
+        # "base#id.RAxxxx" (where the code is not the last /-segment) are handled.
+        base_str = self.base_uri.rstrip("/#")
+        m = TRUSTY_CODE_RE.search(base_str)
+        if m:
+            prefix = base_str[:m.start()]
+        elif is_trusty_uri(self.base_uri):
+            prefix = base_str.rsplit("/", 1)[0] + "/"
+        else:
+            prefix = "/".join(self.base_uri.split('/')[:-1]) + '/'
+        if self.base_uri.startswith(NP_TEMP_PREFIX):
+            prefix = NP_PREFIX
+        self.prefix = prefix
+        self.np_trusty_uri = f"{prefix}{hashstr}"
+        base_code = TRUSTY_CODE_RE.search(self.base_uri)
+        self.base_code = base_code.group(0) if base_code else None
+        self._uris: dict = {}
+
+    def rewrite(self, resource, bnodemap):
+        """Most of the work done to normalize URIs happens here"""
+        if resource is None:
+            return None
+        if isinstance(resource, URIRef):
+            return self.rewrite_uri(str(resource))
+        if isinstance(resource, BNode):
+            return self.rewrite_bnode(str(resource), bnodemap)
         return None
-    np_uri = get_str(base_uri).decode('utf-8')
-    separator = "/"
-    # baseuri passed is the np namespace, np_uri is the nanopub URI without trailing # or /
-    if np_uri.endswith('#') or np_uri.endswith('/'):
-        separator = np_uri[-1]
-        np_uri = np_uri[:-1]
-    # Extract the trusty artifact if present, or remove the trailing / if trusty not present.
-    # Use regex to find the trusty code so non-standard schemes like
-    # "base#id.RAxxxx" (where the code is not the last /-segment) are handled.
-    base_str = str(base_uri).rstrip("/#")
-    m = re.search(r'RA[A-Za-z0-9_\-]{40,}', base_str)
-    if m:
-        prefix = base_str[:m.start()]
-    elif is_trusty_uri(base_uri):
-        prefix = base_str.rsplit("/", 1)[0] + "/"
-    else:
-        prefix = "/".join(base_uri.split('/')[:-1]) + '/'
-    if str(base_uri).startswith(NP_TEMP_PREFIX):
-        prefix = NP_PREFIX
-    if isinstance(resource, URIRef):
-        suffix = get_suffix(resource, base_uri)
-        if get_str(resource).decode('utf-8') == np_uri:
-            return str(f"{prefix}{hashstr}")
-        if suffix is None and not get_str(resource).decode('utf-8') == get_str(base_uri).decode('utf-8'):
+
+    def rewrite_uri(self, uri: str) -> str:
+        """Rewrite a URI, given as a plain string."""
+        try:
+            return self._uris[uri]
+        except KeyError:
+            rewritten = self._uris[uri] = self._rewrite_uri(uri)
+            return rewritten
+
+    def rewrite_bnode(self, label: str, bnodemap) -> str:
+        """Rewrite a blank node, given by its label."""
+        # NOTE: bnodes are replaced in nanopub.py by _replace_blank_nodes() most of the time
+        # Check if BNode in the form of N2b80343001e94f48bdee0901be566ebb
+        # Which means it was automatically generated by rdflib: we use a number in this case
+        if UNNAMED_BNODE_RE.match(label):
+            n = get_bnode_number(label, bnodemap)
+            return self.np_trusty_uri + "#_" + str(n)
+        # If the user gave a specific name to the bnode with rdflib
+        return self.np_trusty_uri + "#_" + label
+
+    def _rewrite_uri(self, uri: str) -> str:
+        if uri == self.np_uri:
+            return self.np_trusty_uri
+        if uri == self.base_uri:
+            return self.np_trusty_uri
+        if not uri.startswith(self.base_uri):
             # URI outside the nanopub's own namespace (e.g. a concept minted in a
             # custom namespace). It may carry the artifact-code placeholder, or —
             # when verifying an already-signed nanopub — this nanopub's trusty code.
             # Substitute either with `hashstr` so it is part of the hash (and gets
             # the real code substituted in when applying the trusty artifact).
             # See issue #232.
-            res_str = str(resource).replace(ARTIFACTCODE_PLACEHOLDER, hashstr)
-            base_code = re.search(r'RA[A-Za-z0-9_\-]{40,}', str(base_uri))
-            if base_code:
+            res_str = uri.replace(ARTIFACTCODE_PLACEHOLDER, self.hashstr)
+            if self.base_code:
                 # Only blank THIS nanopub's code; references to other trusty
                 # nanopubs (different codes) are left untouched.
-                res_str = res_str.replace(base_code.group(0), hashstr)
+                res_str = res_str.replace(self.base_code, self.hashstr)
             return res_str
-        if suffix is None or suffix == "":
-            return str(f"{prefix}{hashstr}")
+        suffix = uri[len(self.base_uri):]
         # External trusty URI or external reference — leave untouched
         if TRUSTY_ARTIFACT_RE.match(suffix.split("/", 1)[0].split("#", 1)[0]):
-            return str(resource)
+            return uri
 
         # When base_uri has no trailing separator (e.g. disgenet-style
         # "RAxxxx130_head"), the suffix is directly appended — use no
         # separator.  For standard namespaces ending with "/" or "#" the
         # separator was already captured above from the base_uri itself.
-        base_uri_str = get_str(base_uri).decode('utf-8')
-        if not (base_uri_str.endswith('#') or base_uri_str.endswith('/')):
+        separator = self.separator
+        if not (self.base_uri.endswith('#') or self.base_uri.endswith('/')):
             if suffix[0] in ('#', '/'):
                 separator = suffix[0]
             else:
                 separator = ""
         clean_suffix = suffix.lstrip("/#")
-        return str(f"{prefix}{hashstr}{separator}{clean_suffix}")
-    if isinstance(resource, BNode):
-        # NOTE: bnodes are replaced in nanopub.py by _replace_blank_nodes() most of the time
-        bnode_unnamed = re.match(r'^[a-zA-Z0-9]{33}$', str(resource))
-        # Check if BNode in the form of N2b80343001e94f48bdee0901be566ebb
-        # Which means it was automatically generated by rdflib: we use a number in this case
-        if bnode_unnamed:
-            n = get_bnode_number(resource, bnodemap)
-            np_uri = str(f"{prefix}{hashstr}")
-            return str(np_uri + "#_" + str(n))
-        else:
-            # If the user gave a specific name to the bnode with rdflib
-            return str(f"{prefix}{hashstr}" + "#_" + str(resource))
-    else:
+        return f"{self.np_trusty_uri}{separator}{clean_suffix}"
+
+
+def get_trustyuri(resource, base_uri, hashstr, bnodemap):
+    """Most of the work done to normalize URIs happens here
+
+    Rewriting many terms with the same base URI and hashstr is faster with a ``TrustyRewriter``.
+    """
+    if resource is None:
         return None
+    return TrustyRewriter(base_uri, hashstr).rewrite(resource, bnodemap)
 
 
 def get_suffix(plainuri, baseuri):
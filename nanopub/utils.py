@@ -1,10 +1,14 @@
 import re
-from dataclasses import asdict, dataclass
-from typing import Any, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 
-from rdflib import Dataset, Namespace, URIRef
+from rdflib import RDF, Dataset, Graph, IdentifiedNode, Literal, Namespace, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.store import Store, StoreCreatedEvent, TripleAddedEvent, TripleRemovedEvent
 
 from nanopub.definitions import DUMMY_NAMESPACE, DUMMY_URI
+from nanopub.namespaces import NP, NPX
 
 
 class MalformedNanopubError(ValueError):
@@ -33,8 +37,158 @@ class NanopubMetadata:
     dict = asdict
 
 
+class _StoreEventCounter:
+    """Counts the events announced by a store, whatever the number of trackers following it"""
+
+    def __init__(self) -> None:
+        self.events = 0
+
+    def on_event(self, event: Any) -> None:
+        self.events += 1
+
+
+# One counter subscribed per store: the store of an adopted Dataset can be tracked by many
+# nanopubs in turn, and the dispatcher never lets go of what subscribed to it
+_STORE_EVENT_COUNTERS: "WeakKeyDictionary[Store, _StoreEventCounter]" = WeakKeyDictionary()
+
+
+def _store_event_counter(store: Store) -> _StoreEventCounter:
+    counter = _STORE_EVENT_COUNTERS.get(store)
+    if counter is None:
+        counter = _StoreEventCounter()
+        for event in (TripleAddedEvent, TripleRemovedEvent, StoreCreatedEvent):
+            store.dispatcher.subscribe(event, counter.on_event)
+        _STORE_EVENT_COUNTERS[store] = counter
+    return counter
+
+
+class DatasetChangeTracker:
+    """Tells whether a Dataset has been modified, to invalidate what was derived from it.
+
+    The store announces every added triple (Memory stores do not announce removals), and
+    a removal not compensated by an addition changes the number of quads, so together
+    they change `state` whenever the content of the Dataset changes.
+    """
+
+    def __init__(self, g: Dataset) -> None:
+        self.dataset = g
+        self._counter = _store_event_counter(g.store)
+
+    @property
+    def state(self) -> tuple:
+        """An opaque value that differs whenever the Dataset changed in between."""
+        # The total, as the graphs do not come in a stable order
+        return self._counter.events, sum(len(c) for c in self.dataset.contexts())
+
+
+@dataclass
+class ValidationReport:
+    """The structural facts that make a nanopub valid or not, gathered in one pass over its quads.
+
+    Args:
+        graph_sizes: Number of quads of each graph of the Dataset that is not empty
+        head_size: Number of quads in the Head graph
+        assertion_size: Number of quads in the assertion graph
+        provenance_size: Number of quads in the provenance graph
+        pubinfo_size: Number of quads in the pubinfo graph
+        has_assertion_provenance: The provenance graph has a triple with the assertion graph URI as subject
+        has_pubinfo_about_nanopub: The pubinfo graph has a triple with the nanopub URI as subject
+        ill_typed_literals: The ``(literal, graph)`` pairs whose lexical form is not valid for their datatype
+    """
+
+    graph_sizes: Dict[Optional[IdentifiedNode], int] = field(default_factory=dict)
+    head_size: int = 0
+    assertion_size: int = 0
+    provenance_size: int = 0
+    pubinfo_size: int = 0
+    has_assertion_provenance: bool = False
+    has_pubinfo_about_nanopub: bool = False
+    ill_typed_literals: List[Tuple[Literal, Optional[IdentifiedNode]]] = field(default_factory=list)
+
+
+def scan_nanopub(g: Dataset, np_meta: NanopubMetadata, source_uri: Optional[str] = None) -> ValidationReport:
+    """Gather the facts checked by ``Nanopub.is_valid`` in one pass over the quads of a nanopub"""
+    report = ValidationReport()
+    assertion_str = str(np_meta.assertion)
+    np_uris = {str(source_uri), str(np_meta.namespace), str(np_meta.np_uri)}
+    graph_sizes = report.graph_sizes
+    for s, _, o, c in g.quads((None, None, None, None)):
+        graph_sizes[c] = graph_sizes.get(c, 0) + 1
+        if c == np_meta.provenance and not report.has_assertion_provenance:
+            report.has_assertion_provenance = str(s) == assertion_str
+        if c == np_meta.pubinfo and not report.has_pubinfo_about_nanopub:
+            report.has_pubinfo_about_nanopub = str(s) in np_uris
+        if isinstance(o, Literal) and o.ill_typed:
+            report.ill_typed_literals.append((o, c))
+    report.head_size = graph_sizes.get(np_meta.head, 0)
+    report.assertion_size = graph_sizes.get(np_meta.assertion, 0)
+    report.provenance_size = graph_sizes.get(np_meta.provenance, 0)
+    report.pubinfo_size = graph_sizes.get(np_meta.pubinfo, 0)
+    return report
+
+
 def extract_np_metadata(g: Dataset) -> NanopubMetadata:
     """Extract a nanopub URI, namespace and head/assertion/prov/pubinfo contexts from a Graph"""
+    np_meta = _extract_np_metadata_lookup(g)
+    if np_meta is None:
+        np_meta = _extract_np_metadata_sparql(g)
+    np_meta.trusty, np_meta.namespace = nanopub_namespace(str(np_meta.np_uri), str(np_meta.head))
+    return np_meta
+
+
+def _single_object(g: Dataset, s, p, c) -> Optional[Any]:
+    """The object of the only (s, p, ?, c) quad, None if there are none or several"""
+    objects = [o for _, _, o, _ in g.quads((s, p, None, c))]
+    return objects[0] if len(objects) == 1 else None
+
+
+def _extract_np_metadata_lookup(g: Dataset) -> Optional[NanopubMetadata]:
+    """Extract the metadata of a nanopub with direct index lookups, instead of a SPARQL query.
+
+    Returns None for anything else than a single nanopub with one Head, one signature at
+    most, and named graphs, so that the SPARQL query handles (and reports) odd inputs.
+    """
+    heads = list(g.quads((None, RDF.type, NP.Nanopublication, None)))
+    if len(heads) != 1:
+        return None
+    np_uri, _, _, head = heads[0]
+    if not isinstance(np_uri, URIRef) or not isinstance(head, URIRef) or head == DATASET_DEFAULT_GRAPH_ID:
+        return None
+    graphs: List[Any] = [_single_object(g, np_uri, p, head) for p in (NP.hasAssertion, NP.hasProvenance, NP.hasPublicationInfo)]
+    if any(graph is None for graph in graphs):
+        return None
+    assertion, provenance, pubinfo = graphs
+    # The query only matches a pubinfo that is a named graph of the Dataset
+    if not isinstance(pubinfo, URIRef) or pubinfo == DATASET_DEFAULT_GRAPH_ID:
+        return None
+    pubinfo_graph = Graph(store=g.store, identifier=pubinfo)
+    if (None, None, None, pubinfo_graph) not in g:
+        return None
+
+    signatures: List[tuple] = []
+    for sig_uri, _, _, _ in g.quads((None, NPX.hasSignatureTarget, np_uri, pubinfo_graph)):
+        values = [[o for _, _, o, _ in g.quads((sig_uri, p, None, pubinfo_graph))]
+                  for p in (NPX.hasPublicKey, NPX.hasAlgorithm, NPX.hasSignature)]
+        if all(len(v) == 1 for v in values):
+            signatures.append((sig_uri, *(v[0] for v in values)))
+        elif any(len(v) > 1 for v in values):
+            return None
+    if len(signatures) > 1:
+        return None
+
+    np_meta = NanopubMetadata()
+    np_meta.np_uri = np_uri
+    np_meta.head = head
+    np_meta.assertion = assertion
+    np_meta.provenance = provenance
+    np_meta.pubinfo = pubinfo
+    np_meta.sig_uri, np_meta.public_key, np_meta.algorithm, np_meta.signature = (
+        signatures[0] if signatures else (None, None, None, None))
+    return np_meta
+
+
+def _extract_np_metadata_sparql(g: Dataset) -> NanopubMetadata:
+    """Extract the metadata of a nanopub with a SPARQL query, reporting missing or multiple nanopubs"""
     get_np_query = """prefix np: <http://www.nanopub.org/nschema#>
 prefix npx: <http://purl.org/nanopub/x/>
 
@@ -81,43 +235,44 @@ WHERE {
         np_meta.signature = row.signature
         np_meta.public_key = row.pubkey
         np_meta.algorithm = row.algo
+    return np_meta
 
-        np_uri_str = str(np_meta.np_uri)
-        if np_uri_str.endswith(("#", "/")):
-            default_separator_char = np_uri_str[-1]
-        else:
-            # Determine separator from the character immediately after the trusty
-            # code in the head graph URI (handles non-standard names like _head).
-            # Extract trusty code from np_uri first to avoid greedy regex matching
-            # the local suffix (e.g. "130_head") as part of the trusty code.
-            extract_trusty_pre = re.search(r'^(.*?)([/#])?(RA[A-Za-z0-9_\-]+)([/#])?', np_uri_str)
-            head_str = str(np_meta.head)
-            if extract_trusty_pre:
-                trusty_code_tmp = extract_trusty_pre.group(3)
-                if trusty_code_tmp in head_str:
-                    idx = head_str.index(trusty_code_tmp) + len(trusty_code_tmp)
-                    sep = head_str[idx] if idx < len(head_str) else "/"
-                    default_separator_char = sep if sep in ("#", "/") else ""
-                else:
-                    default_separator_char = head_str.rsplit("Head", 1)[0][-1]
+
+def nanopub_namespace(np_uri_str: str, head_str: str) -> Tuple[Optional[str], Namespace]:
+    """Get the trusty artefact (if any) and the namespace of a nanopub from its URI and head graph URI"""
+    if np_uri_str.endswith(("#", "/")):
+        default_separator_char = np_uri_str[-1]
+    else:
+        # Determine separator from the character immediately after the trusty
+        # code in the head graph URI (handles non-standard names like _head).
+        # Extract trusty code from np_uri first to avoid greedy regex matching
+        # the local suffix (e.g. "130_head") as part of the trusty code.
+        extract_trusty_pre = re.search(r'^(.*?)([/#])?(RA[A-Za-z0-9_\-]+)([/#])?', np_uri_str)
+        if extract_trusty_pre:
+            trusty_code_tmp = extract_trusty_pre.group(3)
+            if trusty_code_tmp in head_str:
+                idx = head_str.index(trusty_code_tmp) + len(trusty_code_tmp)
+                sep = head_str[idx] if idx < len(head_str) else "/"
+                default_separator_char = sep if sep in ("#", "/") else ""
             else:
-                if head_str.startswith(np_uri_str):
-                    suffix = head_str[len(np_uri_str):]
-                    default_separator_char = suffix[0]
-
-        # Check if the nanopub URI has a trusty artifact:
-        # Regex to extract base URI, and trusty URI (if any)
-        extract_trusty = re.search(r'^(.*?)([/#])?(RA[A-Za-z0-9_\-]+)([/#])?', np_uri_str)
-        if extract_trusty:
-            np_meta.trusty = extract_trusty.group(3)
-            np_meta.namespace = Namespace(
-                np_uri_str.split(np_meta.trusty)[0] + np_meta.trusty + default_separator_char)
+                default_separator_char = head_str.rsplit("Head", 1)[0][-1]
         else:
-            # No trusty code present (e.g. temp namespace)
-            np_meta.trusty = None
-            if np_uri_str.endswith(("#", "/")):
-                np_meta.namespace = Namespace(np_uri_str)
-            else:
-                np_meta.namespace = Namespace(np_uri_str + default_separator_char)
+            if head_str.startswith(np_uri_str):
+                suffix = head_str[len(np_uri_str):]
+                default_separator_char = suffix[0]
 
-    return np_meta
+    # Check if the nanopub URI has a trusty artifact:
+    # Regex to extract base URI, and trusty URI (if any)
+    extract_trusty = re.search(r'^(.*?)([/#])?(RA[A-Za-z0-9_\-]+)([/#])?', np_uri_str)
+    if extract_trusty:
+        trusty = extract_trusty.group(3)
+        namespace = Namespace(
+            np_uri_str.split(trusty)[0] + trusty + default_separator_char)
+    else:
+        # No trusty code present (e.g. temp namespace)
+        trusty = None
+        if np_uri_str.endswith(("#", "/")):
+            namespace = Namespace(np_uri_str)
+        else:
+            namespace = Namespace(np_uri_str + default_separator_char)
+    return trusty, namespace
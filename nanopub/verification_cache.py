@@ -0,0 +1,130 @@
+"""A persistent cache of the trusty nanopublications that have already been verified.
+
+A trusty URI is a hash of the content of the nanopub, so once the bytes of a trusty
+nanopub have been fully verified, loading the same bytes again does not need to check
+the signature and trusty URI again.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from nanopub.definitions import DEFAULT_VERIFICATION_CACHE_PATH, DEFAULT_VERIFICATION_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_CACHE_POLICIES = ("off", "read", "write", "read-write")
+
+
+def digest_bytes(data: bytes) -> str:
+    """The digest identifying the bytes a nanopub was loaded from"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class VerificationCache:
+    """The trusty nanopubs already verified, as (trusty artefact code, digest of the bytes) pairs in SQLite.
+
+    Entries are kept in order of last use: the rowid of an entry is renewed when it is
+    used, and when there are more than ``max_entries`` the oldest ones are evicted.
+    The cache is safe to share between threads and processes, and a cache that cannot
+    be read or written only logs a warning, as if the nanopub was not in it.
+    """
+
+    def __init__(
+            self,
+            path: Union[Path, str] = DEFAULT_VERIFICATION_CACHE_PATH,
+            max_entries: int = DEFAULT_VERIFICATION_CACHE_SIZE,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"The verification cache must hold at least 1 entry, got {max_entries}")
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._parent_conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across a fork: worker processes open their own
+        if self._conn is None or self._pid != os.getpid():
+            # (and keep the parent connection referenced, closing it here would release its file locks)
+            self._parent_conn = self._conn
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verified ("
+                "trusty TEXT NOT NULL, digest TEXT NOT NULL, verified_at REAL NOT NULL, "
+                "PRIMARY KEY (trusty, digest))"
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def contains(self, trusty: str, digest: str) -> bool:
+        """Tell whether these bytes of the trusty nanopub have been verified, marking the entry as used"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT rowid, verified_at, (SELECT MAX(rowid) FROM verified) FROM verified "
+                    "WHERE trusty = ? AND digest = ?",
+                    (trusty, digest),
+                ).fetchone()
+                if row is None:
+                    return False
+                rowid, verified_at, last_rowid = row
+                # Only renew the entries that are getting close to eviction, so most hits do not write
+                if last_rowid - rowid > self.max_entries // 2:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO verified VALUES (?, ?, ?)", (trusty, digest, verified_at))
+                return True
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not read the verification cache {self.path}: {e}")
+            return False
+
+    def add(self, trusty: str, digest: str) -> None:
+        """Remember that these bytes of the trusty nanopub are valid"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                cursor = conn.execute(
+                    "INSERT OR REPLACE INTO verified VALUES (?, ?, ?)", (trusty, digest, time.time()))
+                conn.execute("DELETE FROM verified WHERE rowid <= ?", ((cursor.lastrowid or 0) - self.max_entries,))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not write to the verification cache {self.path}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM verified")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM verified").fetchone()[0]
+
+    def __getstate__(self) -> dict:
+        # Only the location and size of the cache are sent to other processes
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state: dict) -> None:
+        VerificationCache.__init__(self, state["path"], state["max_entries"])
+
+
+_caches: Dict[Tuple[Path, int], VerificationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_verification_cache(
+        path: Union[Path, str, None] = None,
+        max_entries: int = DEFAULT_VERIFICATION_CACHE_SIZE,
+) -> VerificationCache:
+    """The verification cache stored at this path (by default under ``~/.nanopub``), shared in the process"""
+    key = (Path(path or DEFAULT_VERIFICATION_CACHE_PATH).expanduser(), max_entries)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = VerificationCache(*key)
+        return _caches[key]
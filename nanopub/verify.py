@@ -0,0 +1,110 @@
+"""Verify many nanopublications at once, using several processes."""
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from rdflib import Dataset
+from rdflib.util import guess_format
+
+from nanopub.nanopub import Nanopub
+from nanopub.nanopub_conf import NanopubConf
+from nanopub.parallel import imap_bounded
+
+VerifyInput = Union[Path, str, bytes, Tuple[str, bytes]]
+
+
+class VerifyResult(NamedTuple):
+    """Result of the verification of one nanopub by ``verify_many``
+
+    Args:
+        id: The path of the nanopub file, the id given with its bytes, or its position in the input
+        ok: True if the nanopub is valid (structure, signature and trusty URI)
+        error: Why the nanopub is not valid, None if it is
+        timings: Seconds spent reading, parsing and verifying the nanopub, and in total
+    """
+    id: Union[str, int]
+    ok: bool
+    error: Optional[str]
+    timings: Dict[str, float]
+
+
+def verify_one(
+        item_id: Union[str, int],
+        data: Union[bytes, str],
+        format: Optional[str] = None,
+        conf: Optional[NanopubConf] = None,
+) -> VerifyResult:
+    """Verify one nanopub, given as RDF bytes or as the path of a file.
+
+    Errors are reported in the result rather than raised.
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        if isinstance(data, str):
+            if format is None:
+                format = guess_format(data)
+            data = Path(data).read_bytes()
+            timings["read"] = time.perf_counter() - start
+        step = time.perf_counter()
+        ds = Dataset()
+        ds.parse(data=data, format=format or "trig")
+        timings["parse"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        np = Nanopub(rdf=ds, conf=conf, adopt=True)
+        _ = np.is_valid
+        timings["verify"] = time.perf_counter() - step
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+    timings["total"] = time.perf_counter() - start
+    return VerifyResult(item_id, ok, error, timings)
+
+
+def _verify_args(items: Iterable[VerifyInput]) -> Iterator[Tuple[Union[str, int], Union[bytes, str]]]:
+    for i, item in enumerate(items):
+        if isinstance(item, bytes):
+            yield i, item
+        elif isinstance(item, tuple):
+            yield item
+        elif isinstance(item, (str, Path)):
+            # The worker reads the file: only its path goes through the pool
+            yield str(item), str(item)
+        else:
+            raise TypeError(
+                f"Nanopubs to verify must be given as file paths, bytes, or (id, bytes) tuples, "
+                f"but got {type(item).__name__}")
+
+
+def verify_many(
+        paths_or_bytes: Iterable[VerifyInput],
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        format: Optional[str] = None,
+        conf: Optional[NanopubConf] = None,
+) -> Iterator[VerifyResult]:
+    """Verify many nanopubs in parallel, yielding a ``VerifyResult`` for each as soon as it is done.
+
+    Nanopubs are checked like ``Nanopub(rdf=...).is_valid`` does, one process per worker
+    (``os.cpu_count()`` by default, ``workers=1`` verifies in the current process).
+
+    Args:
+        paths_or_bytes: Paths of nanopub files, RDF bytes, or ``(id, bytes)`` tuples.
+            Consumed lazily, it can be a generator over millions of nanopubs.
+        workers: Number of worker processes
+        max_in_flight: Most nanopubs sent to the workers and not yet yielded back
+            (4 per worker by default), this keeps memory use flat
+        format: RDF format of the nanopubs, guessed from the file extension for paths,
+            and TriG for bytes if not given
+        conf: Config used to load the nanopubs
+
+    Results come in order of completion, use their ``id`` to match them with the input.
+    """
+    return imap_bounded(
+        partial(verify_one, format=format, conf=conf),
+        _verify_args(paths_or_bytes),
+        workers=workers,
+        max_in_flight=max_in_flight,
+    )
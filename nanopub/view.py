@@ -0,0 +1,212 @@
+"""A compact read-only view of a nanopublication, without rdflib graphs."""
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from rdflib import BNode, Dataset, Graph, Literal
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+
+from nanopub.nanopub import Nanopub
+from nanopub.nanopub_conf import NanopubConf
+from nanopub.namespaces import NP, NPX
+from nanopub.sign_utils import _find_nanopub_in_quads, verify_signature_quads, verify_trusty_quads
+from nanopub.trustyuri.rdf.NQuadsHasher import DEFAULT_GRAPH, BlankNode, NQuadsLiteral, get_dataset, parse
+from nanopub.utils import MalformedNanopubError, nanopub_namespace
+
+Term = Union[str, BlankNode, NQuadsLiteral]
+Triple = Tuple[Term, Term, Term]
+
+_SIGNATURE_FIELDS = {
+    str(NPX.hasPublicKey): "public_key",
+    str(NPX.hasAlgorithm): "algorithm",
+    str(NPX.hasSignature): "signature",
+}
+
+
+def _intern(term):
+    """Share the strings of terms that come back in many nanopubs (predicates, classes, datatypes...)"""
+    if type(term) is str:
+        return sys.intern(term)
+    if isinstance(term, NQuadsLiteral) and term.datatype is not None:
+        return term._replace(datatype=sys.intern(term.datatype))
+    return term
+
+
+def _from_rdflib(term):
+    if isinstance(term, BNode):
+        return BlankNode(term)
+    if isinstance(term, Literal):
+        return NQuadsLiteral(
+            str(term), None if term.datatype is None else str(term.datatype), term.language)
+    return str(term)
+
+
+class NanopubView:
+    """A read-only nanopub, holding its triples as tuples of strings rather than rdflib graphs.
+
+    Meant to keep many nanopubs in memory (e.g. to analyse a large corpus): it is a
+    fraction of the size of a ``Nanopub`` and quicker to build. The terms of the triples
+    are IRIs as ``str``, blank nodes as ``BlankNode`` and literals as ``NQuadsLiteral``,
+    like ``NQuadsHasher.parse`` returns them, and IRIs are interned so that the ones used
+    by many nanopubs are shared. Use ``to_nanopub()`` to get a full ``Nanopub``.
+
+    Attributes:
+        source_uri: The URI of the nanopub
+        head_uri, assertion_uri, provenance_uri, pubinfo_uri: The names of its 4 graphs
+        head, assertion, provenance, pubinfo: The triples of each graph
+        other_quads: The quads of any other graph, in (graph, subject, predicate, object) order
+        trusty: The trusty artefact code of the nanopub, None if it is not trusty
+        namespace: The namespace of the nanopub
+        sig_uri, public_key, algorithm, signature: Its signature, None if it is not signed
+    """
+
+    __slots__ = (
+        "source_uri", "head_uri", "assertion_uri", "provenance_uri", "pubinfo_uri",
+        "head", "assertion", "provenance", "pubinfo", "other_quads",
+        "trusty", "namespace", "sig_uri", "public_key", "algorithm", "signature",
+    )
+    source_uri: str
+    head_uri: str
+    assertion_uri: str
+    provenance_uri: str
+    pubinfo_uri: str
+    head: Tuple[Triple, ...]
+    assertion: Tuple[Triple, ...]
+    provenance: Tuple[Triple, ...]
+    pubinfo: Tuple[Triple, ...]
+    other_quads: Tuple[tuple, ...]
+    trusty: Optional[str]
+    namespace: str
+    sig_uri: Optional[str]
+    public_key: Optional[str]
+    algorithm: Optional[str]
+    signature: Optional[str]
+
+    def __init__(self, quads: list) -> None:
+        """Build the view from quads as returned by ``NQuadsHasher.parse``, prefer ``from_nquads`` or ``from_trig``"""
+        source_uri, head_uri = _find_nanopub_in_quads(quads)
+        links = {}
+        for c, s, p, o in quads:
+            if c == head_uri and s == source_uri and p in (
+                    str(NP.hasAssertion), str(NP.hasProvenance), str(NP.hasPublicationInfo)):
+                links[p] = o
+        graphs: Dict[str, List[Triple]] = {
+            head_uri: [],
+            links[str(NP.hasAssertion)]: [],
+            links[str(NP.hasProvenance)]: [],
+            links[str(NP.hasPublicationInfo)]: [],
+        }
+        if len(graphs) < 4:
+            raise MalformedNanopubError("The head, assertion, provenance and pubinfo graphs must be different graphs")
+        other_quads = []
+        signature = dict.fromkeys(_SIGNATURE_FIELDS.values())
+        sig_uri = None
+        for c, s, p, o in quads:
+            triple = (_intern(s), _intern(p), _intern(o))
+            if c in graphs:
+                graphs[c].append(triple)
+            else:
+                other_quads.append((c if c is None else _intern(c),) + triple)
+            if p == str(NPX.hasSignatureTarget) and o == source_uri and sig_uri is None:
+                sig_uri = s
+        if sig_uri is not None:
+            for _, s, p, o in quads:
+                if s == sig_uri and p in _SIGNATURE_FIELDS:
+                    signature[_SIGNATURE_FIELDS[p]] = o.lexical if isinstance(o, NQuadsLiteral) else o
+        trusty, namespace = nanopub_namespace(source_uri, head_uri)
+
+        init = object.__setattr__
+        init(self, "source_uri", sys.intern(source_uri))
+        for name, graph_uri in zip(("head", "assertion", "provenance", "pubinfo"), graphs):
+            init(self, f"{name}_uri", sys.intern(graph_uri))
+            init(self, name, tuple(graphs[graph_uri]))
+        init(self, "other_quads", tuple(other_quads))
+        init(self, "trusty", trusty)
+        init(self, "namespace", str(namespace))
+        init(self, "sig_uri", sig_uri)
+        for name, value in signature.items():
+            init(self, name, value)
+
+    @classmethod
+    def from_nquads(cls, data: Union[str, bytes]) -> "NanopubView":
+        """Read a nanopub from N-Quads, without going through rdflib"""
+        try:
+            quads = parse(data)
+        except ValueError as e:
+            raise MalformedNanopubError(e)
+        return cls(quads)
+
+    @classmethod
+    def from_trig(cls, data: Union[str, bytes]) -> "NanopubView":
+        """Read a nanopub from TriG, parsed by rdflib"""
+        ds = Dataset()
+        ds.parse(data=data, format="trig")
+        return cls.from_dataset(ds)
+
+    @classmethod
+    def from_dataset(cls, ds: Dataset) -> "NanopubView":
+        """Build the view of a nanopub from its rdflib Dataset"""
+        quads = []
+        for s, p, o, g in ds.quads((None, None, None, None)):
+            g = g.identifier if isinstance(g, Graph) else g
+            if isinstance(g, BNode):
+                c = None
+            elif g == DATASET_DEFAULT_GRAPH_ID:
+                c = DEFAULT_GRAPH
+            else:
+                c = str(g)
+            quads.append((c, _from_rdflib(s), _from_rdflib(p), _from_rdflib(o)))
+        return cls(quads)
+
+    @classmethod
+    def from_file(cls, path: Union[Path, str], format: Optional[str] = None) -> "NanopubView":
+        """Read a nanopub from a TriG or N-Quads file, by default guessing the format from the file extension"""
+        path = Path(path)
+        if format is None:
+            format = "nquads" if path.suffix in (".nq", ".nquads") else "trig"
+        if format == "nquads":
+            return cls.from_nquads(path.read_bytes())
+        return cls.from_trig(path.read_bytes())
+
+    def quads(self) -> Iterator[tuple]:
+        """All the quads of the nanopub, in (graph, subject, predicate, object) order"""
+        for name in ("head", "assertion", "provenance", "pubinfo"):
+            graph_uri = getattr(self, f"{name}_uri")
+            for triple in getattr(self, name):
+                yield (graph_uri,) + triple
+        yield from self.other_quads
+
+    @property
+    def has_valid_trusty(self) -> bool:
+        verify_trusty_quads(list(self.quads()), self.source_uri, self.namespace)
+        return True
+
+    @property
+    def has_valid_signature(self) -> bool:
+        verify_signature_quads(list(self.quads()), self.source_uri, self.namespace)
+        return True
+
+    def to_nanopub(self, conf: Optional[NanopubConf] = None) -> Nanopub:
+        """Build the full ``Nanopub`` from this view"""
+        ds = get_dataset(self.quads())
+        return Nanopub(rdf=ds, conf=conf, adopt=True)
+
+    def __len__(self) -> int:
+        return len(self.head) + len(self.assertion) + len(self.provenance) + len(self.pubinfo) + \
+            len(self.other_quads)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.source_uri} ({len(self)} quads)>"
@@ -0,0 +1,38 @@
+"""Benchmark of the extraction of the metadata of the valid nanopubs of the testsuite.
+
+Compares the SPARQL query that ``extract_np_metadata`` used to run on every nanopub with
+the direct index lookups it now tries first.
+
+    python scripts/benchmark_extract_np_metadata.py
+"""
+import timeit
+
+from nanopub_testsuite_connector import NanopubTestSuite, TestSuiteSubfolder
+from rdflib import Dataset
+
+from nanopub.utils import _extract_np_metadata_lookup, _extract_np_metadata_sparql
+
+NUMBER = 20
+
+
+def load_testsuite() -> list:
+    suite = NanopubTestSuite.get_latest()
+    datasets = []
+    for folder in (TestSuiteSubfolder.PLAIN, TestSuiteSubfolder.SIGNED, TestSuiteSubfolder.TRUSTY):
+        for entry in suite.get_valid(folder):
+            ds = Dataset()
+            ds.parse(entry.path, format="trig")
+            datasets.append(ds)
+    return datasets
+
+
+if __name__ == "__main__":
+    datasets = load_testsuite()
+    for ds in datasets:
+        assert _extract_np_metadata_lookup(ds) == _extract_np_metadata_sparql(ds)
+    results = {}
+    for name, func in (("SPARQL", _extract_np_metadata_sparql), ("lookup", _extract_np_metadata_lookup)):
+        seconds = min(timeit.repeat(lambda: [func(ds) for ds in datasets], number=NUMBER, repeat=3))
+        results[name] = seconds / (NUMBER * len(datasets))
+        print(f"{name:>7}: {results[name] * 1e6:.0f} µs per nanopub")
+    print(f"{len(datasets)} nanopubs, lookup is {results['SPARQL'] / results['lookup']:.0f}x faster")
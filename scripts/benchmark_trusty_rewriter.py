@@ -0,0 +1,43 @@
+"""Micro-benchmark of the per-term cost of rewriting nanopub URIs with a trusty artefact.
+
+Compares ``get_trustyuri``, which works out the prefix and separator of the base URI on
+every call, with one ``TrustyRewriter`` reused for all the terms of a nanopub.
+
+    python scripts/benchmark_trusty_rewriter.py
+"""
+import timeit
+
+from rdflib import URIRef
+
+from nanopub.definitions import DUMMY_NAMESPACE
+from nanopub.trustyuri.rdf.RdfUtils import TrustyRewriter, get_trustyuri
+
+TRUSTY = "RA" + "x" * 43
+BASE_URI = str(DUMMY_NAMESPACE)
+# A nanopub mostly repeats a small set of terms: its own graphs and sub-URIs, and the
+# external URIs used in the assertion
+TERMS = [
+    URIRef(BASE_URI + name) for name in ("", "Head", "assertion", "provenance", "pubinfo", "sig", "_1")
+] + [URIRef(f"https://example.org/term/{i}") for i in range(20)]
+QUADS = 1200
+NUMBER = 5
+
+
+def with_get_trustyuri() -> None:
+    bnodemap: dict = {}
+    for i in range(QUADS * 4):
+        get_trustyuri(TERMS[i % len(TERMS)], BASE_URI, TRUSTY, bnodemap)
+
+
+def with_trusty_rewriter() -> None:
+    rewriter = TrustyRewriter(BASE_URI, TRUSTY)
+    bnodemap: dict = {}
+    for i in range(QUADS * 4):
+        rewriter.rewrite(TERMS[i % len(TERMS)], bnodemap)
+
+
+if __name__ == "__main__":
+    terms = QUADS * 4 * NUMBER
+    for name, func in (("get_trustyuri", with_get_trustyuri), ("TrustyRewriter", with_trusty_rewriter)):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+        print(f"{name:>15}: {seconds / terms * 1e6:.2f} µs per term")
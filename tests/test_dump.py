@@ -0,0 +1,229 @@
+import gzip
+import io
+
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+from rdflib import Dataset
+
+from nanopub import DumpRecord, Nanopub, NanopubDumpWriter, iter_dump, read_dump_index, read_dump_record
+from nanopub.dump import dump_format
+from nanopub.utils import MalformedNanopubError
+from tests.conftest import _suite
+
+SIGNED = [Nanopub(rdf=e.path) for e in _suite.get_valid(TestSuiteSubfolder.SIGNED)]
+
+CONVENTIONAL_ORDER = ["Head", "assertion", "provenance", "pubinfo"]
+
+
+def _quads(ds):
+    return sorted(map(repr, ds.quads((None, None, None, None))))
+
+
+def _dataset(data, format):
+    ds = Dataset()
+    ds.parse(data=data, format=format)
+    return ds
+
+
+class TestNanopubDumpWriter:
+
+    @pytest.mark.parametrize("name", ["dump.trig", "dump.trig.gz", "dump.nq", "dump.nq.gz"])
+    def test_round_trip(self, tmp_path, name):
+        path = tmp_path / name
+        format, compressed = dump_format(path)
+        with NanopubDumpWriter(path, chunk_size=4096) as writer:
+            for np in SIGNED:
+                writer.write(np)
+        assert writer.count == len(SIGNED)
+
+        data = path.read_bytes()
+        assert (data[:2] == b"\x1f\x8b") is compressed
+        if compressed:
+            data = gzip.decompress(data)
+        whole = _dataset(data, format)
+        expected = Dataset()
+        for np in SIGNED:
+            for q in np.rdf.quads((None, None, None, None)):
+                expected.add(q)
+        assert _quads(whole) == _quads(expected)
+
+        index = list(read_dump_index(tmp_path / (name + ".idx")))
+        assert [entry.key for entry in index] == [np.metadata.trusty for np in SIGNED]
+        assert all((entry.member_offset is not None) is compressed for entry in index)
+        # Random reads, in reverse order
+        for np, entry in reversed(list(zip(SIGNED, index))):
+            record = Nanopub(rdf=_dataset(read_dump_record(path, entry), format))
+            assert record.source_uri == np.source_uri
+            assert record.is_valid
+
+    def test_bounded_chunks(self, tmp_path):
+        path = tmp_path / "dump.nq.gz"
+        writer = NanopubDumpWriter(path, chunk_size=1)
+        writer.write(SIGNED[0])
+        # Written out before the writer is closed
+        assert len(path.read_bytes()) > 0
+        assert writer._buffered == 0
+        writer.write(SIGNED[1])
+        writer.close()
+        index = list(read_dump_index(str(path) + ".idx"))
+        assert index[0].member_offset == 0
+        assert index[1].member_offset == index[0].member_length
+        assert index[0].offset == index[1].offset == 0
+        # Concatenated gzip members are still a gzip file
+        assert len(gzip.decompress(path.read_bytes())) == index[0].length + index[1].length
+
+    def test_write_bytes(self, tmp_path):
+        path = tmp_path / "dump.trig"
+        with NanopubDumpWriter(path, index=tmp_path / "index.tsv") as writer:
+            writer.write_bytes(SIGNED[0].serialize(format="trig", encoding="utf-8"), SIGNED[0].source_uri)
+        entry, = read_dump_index(tmp_path / "index.tsv")
+        assert entry.key == SIGNED[0].metadata.trusty
+        assert not (tmp_path / "dump.trig.idx").exists()
+        assert read_dump_record(path, entry) == path.read_bytes()
+
+    def test_stream(self):
+        stream = io.BytesIO()
+        with NanopubDumpWriter(stream, format="nquads") as writer:
+            writer.write(SIGNED[0])
+        assert writer.index_path is None
+        assert not stream.closed
+        assert len(_dataset(stream.getvalue(), "nquads")) == len(SIGNED[0].rdf)
+
+    def test_closed(self, tmp_path):
+        writer = NanopubDumpWriter(tmp_path / "dump.trig", index=False)
+        writer.close()
+        writer.close()
+        with pytest.raises(ValueError):
+            writer.write(SIGNED[0])
+        assert not (tmp_path / "dump.trig.idx").exists()
+
+    def test_invalid(self, tmp_path):
+        with pytest.raises(ValueError):
+            NanopubDumpWriter(tmp_path / "dump.xml", format="xml")
+        with pytest.raises(ValueError):
+            NanopubDumpWriter(io.BytesIO(), index=True)
+        with pytest.raises(ValueError):
+            NanopubDumpWriter(tmp_path / "dump.trig", chunk_size=0)
+
+
+# Two nanopubs sharing the prefixes declared at the top, with statements that are easy to split wrong
+TRICKY_TRIG_DUMP = b'''@prefix np: <http://www.nanopub.org/nschema#> .
+PREFIX ex: <http://example.org/>
+@prefix a1: <http://example.org/np1/> .
+# a comment with { braces and a . dot
+
+a1:assertion {
+    ex:s ex:p "a } brace", 'a { brace', """a long "string" with } and
+a new line""", 1.5, ex:o.x .
+}
+a1:Head { a1:np a np:Nanopublication ; np:hasAssertion a1:assertion ;
+    np:hasProvenance a1:provenance ; np:hasPublicationInfo a1:pubinfo . }
+a1:provenance { a1:assertion ex:p ex:o . }
+GRAPH a1:pubinfo { a1:np ex:p '\'\'a long # string\'\'' . }
+@prefix a2: <http://example.org/np2/> .
+<http://example.org/np2/Head> {
+    <http://example.org/np2/np> a np:Nanopublication .
+    <http://example.org/np2/np> <http://www.nanopub.org/nschema#hasAssertion> a2:assertion .
+    <http://example.org/np2/np> np:hasProvenance # a comment
+        a2:provenance .
+    <http://example.org/np2/np> np:hasPublicationInfo a2:pubinfo .
+}
+a2:assertion { ex:s ex:p ex:o }
+a2:provenance { a2:assertion ex:p ex:o . }
+a2:pubinfo { a2:np ex:p ex:o . }
+'''
+
+
+def _graph_names(data, format="trig"):
+    ds = _dataset(data, format)
+    return {str(g.identifier) for g in ds.graphs() if len(g)}
+
+
+class TestIterDump:
+
+    @pytest.mark.parametrize("name", ["dump.trig", "dump.trig.gz", "dump.nq", "dump.nq.gz"])
+    def test_round_trip(self, tmp_path, name):
+        path = tmp_path / name
+        with NanopubDumpWriter(path, index=False) as writer:
+            for np in SIGNED:
+                writer.write(np)
+        nanopubs = list(iter_dump(path))
+        assert [np.source_uri for np in nanopubs] == [np.source_uri for np in SIGNED]
+        assert all(np.is_valid for np in nanopubs)
+        format, _ = dump_format(path)
+        for data, np in zip(iter_dump(path, raw=True), SIGNED):
+            assert _quads(_dataset(data, format)) == _quads(np.rdf)
+
+    @pytest.mark.parametrize("name", ["dump.trig", "dump.nq.gz"])
+    def test_small_chunks(self, tmp_path, name):
+        path = tmp_path / name
+        with NanopubDumpWriter(path, index=False) as writer:
+            for np in SIGNED:
+                writer.write(np)
+        records = list(iter_dump(path, raw=True))
+        assert len(records) == len(SIGNED)
+        assert list(iter_dump(path, raw=True, chunk_size=7)) == records
+        with gzip.open(path) if name.endswith(".gz") else open(path, "rb") as stream:
+            assert list(iter_dump(stream, format=dump_format(path)[0], raw=True, chunk_size=7)) == records
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+    def test_tricky_trig(self, chunk_size):
+        first, second = iter_dump(io.BytesIO(TRICKY_TRIG_DUMP), raw=True, chunk_size=chunk_size)
+        assert _graph_names(first) == {f"http://example.org/np1/{g}" for g in CONVENTIONAL_ORDER}
+        assert _graph_names(second) == {f"http://example.org/np2/{g}" for g in CONVENTIONAL_ORDER}
+        whole = _dataset(TRICKY_TRIG_DUMP, "trig")
+        assert len(whole) == len(_dataset(first, "trig")) + \
+            len(_dataset(second, "trig"))
+
+    @pytest.mark.parametrize("format", ["trig", "nquads"])
+    def test_from_rdflib(self, tmp_path, format):
+        # rdflib writes the graphs of the nanopubs mixed up, but each graph in one go
+        whole = Dataset()
+        for np in SIGNED:
+            for prefix, namespace in np.rdf.namespaces():
+                whole.bind(prefix, namespace)
+            for q in np.rdf.quads((None, None, None, None)):
+                whole.add(q)
+        path = tmp_path / "dump"
+        whole.serialize(path, format=format)
+        records = list(iter_dump(path, format=format, raw=True))
+        assert sorted(Nanopub(rdf=_dataset(data, format)).source_uri for data in records) == \
+            sorted(np.source_uri for np in SIGNED)
+
+    def test_parallel(self, tmp_path):
+        path = tmp_path / "dump.trig"
+        with NanopubDumpWriter(path, index=False) as writer:
+            for np in SIGNED:
+                writer.write(np)
+        nanopubs = list(iter_dump(path, workers=2, max_in_flight=3))
+        assert [np.source_uri for np in nanopubs] == [np.source_uri for np in SIGNED]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_report_errors(self, workers):
+        # The nanopubs of the tricky dump are not trusty, they cannot be read as nanopubs
+        data = SIGNED[0].to_bytes("trig") + TRICKY_TRIG_DUMP + SIGNED[1].to_bytes("trig")
+        with pytest.raises(Exception):
+            list(iter_dump(io.BytesIO(data), workers=workers))
+        records = list(iter_dump(io.BytesIO(data), workers=workers, report_errors=True))
+        assert all(isinstance(r, DumpRecord) for r in records)
+        assert [r.position for r in records] == [0, 1, 2, 3]
+        assert [r.error is None for r in records] == [True, False, False, True]
+        assert [r.nanopub.source_uri for r in (records[0], records[3])] == [SIGNED[0].source_uri, SIGNED[1].source_uri]
+        assert records[1].nanopub is None
+        assert [r.data for r in records] == list(iter_dump(io.BytesIO(data), raw=True))
+
+    def test_not_a_dump(self, tmp_path):
+        with pytest.raises(MalformedNanopubError):
+            list(iter_dump(io.BytesIO(b"<http://example.org/g> { <http://example.org/s> <http://example.org/p> "),
+                           raw=True))
+        data = SIGNED[0].serialize(format="nquads", encoding="utf-8")
+        # No Head graph: no way to tell where the nanopubs end
+        headless = b"".join(line for line in data.splitlines(keepends=True) if b"nschema#has" not in line)
+        with pytest.raises(MalformedNanopubError):
+            list(iter_dump(io.BytesIO(headless * 100), format="nquads", raw=True, max_record_size=len(data) * 10))
+        with pytest.raises(MalformedNanopubError):
+            list(iter_dump(io.BytesIO(b"not N-Quads\n"), format="nquads", raw=True))
+        (tmp_path / "empty.trig").write_bytes(b"")
+        assert list(iter_dump(tmp_path / "empty.trig")) == []
+        with pytest.raises(ValueError):
+            list(iter_dump(tmp_path / "empty.trig", format="xml"))
@@ -11,12 +11,18 @@ import pytest
 import requests
 from requests.adapters import HTTPAdapter
 
+from nanopub_testsuite_connector import TestSuiteSubfolder
+
+from nanopub import Nanopub, NanopubConf
 from nanopub.definitions import DEFAULT_HTTP_TIMEOUT
 from nanopub.http_utils import (
     DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_MAXSIZE,
     TRANSIENT_STATUS_CODES,
+    get_session,
     retrying_session,
 )
+from tests.conftest import _suite
 
 
 class _ScriptedHandler(BaseHTTPRequestHandler):
@@ -34,9 +40,9 @@ class _ScriptedHandler(BaseHTTPRequestHandler):
         else:
             status = 200
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Type", self.server.content_type)
         self.end_headers()
-        self.wfile.write(b'{"values": []}')
+        self.wfile.write(self.server.body)
 
     do_GET = _respond
     do_POST = _respond
@@ -51,6 +57,8 @@ def scripted_server():
     server = HTTPServer(("127.0.0.1", 0), _ScriptedHandler)
     server.script = []
     server.requests = []
+    server.content_type = "application/json"
+    server.body = b'{"values": []}'
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     yield server
@@ -153,3 +161,39 @@ def test_caller_timeout_wins(scripted_server, session, monkeypatch):
     session.get(_url(scripted_server), timeout=17)
 
     assert sent["timeout"] == 17
+
+
+def test_pool_size():
+    session = retrying_session(pool_maxsize=32)
+    assert session.get_adapter("https://example.org")._pool_maxsize == 32
+    assert retrying_session().get_adapter("https://example.org")._pool_maxsize == DEFAULT_POOL_MAXSIZE
+
+
+def test_get_session_is_shared_per_settings():
+    assert get_session() is get_session()
+    assert get_session(timeout=[1, 2]) is get_session(timeout=(1, 2))
+    assert get_session(pool_maxsize=32) is not get_session()
+    assert get_session(max_retries=5) is not get_session()
+
+
+def test_get_session_is_not_shared_with_forked_processes(monkeypatch):
+    session = get_session()
+    monkeypatch.setattr("nanopub.http_utils.os.getpid", lambda: -1)
+    assert get_session() is not session
+
+
+def test_nanopub_fetch_retries(scripted_server):
+    """Fetching a nanopub goes through the retrying session configured by its conf."""
+    path = _suite.get_valid(TestSuiteSubfolder.SIGNED)[0].path
+    scripted_server.content_type = "application/trig"
+    scripted_server.body = path.read_bytes()
+    scripted_server.script = [503]
+
+    np = Nanopub(source_uri=_url(scripted_server, "/np"), conf=NanopubConf(http_max_retries=1))
+
+    assert np.is_valid
+    assert scripted_server.requests == [("GET", "/np.trig")] * 2
+
+    scripted_server.script = [503, 503]
+    with pytest.raises(requests.HTTPError):
+        Nanopub(source_uri=_url(scripted_server, "/np"), conf=NanopubConf(http_max_retries=1))
@@ -1,6 +1,8 @@
 import inspect
+from copy import deepcopy
 import json
 import logging
+import pickle
 from typing import Optional
 from unittest.mock import MagicMock, patch
 
@@ -15,7 +17,9 @@ from nanopub import (
 )
 from nanopub.definitions import NP_PREFIX
 from nanopub.profile import ProfileError
-from nanopub.utils import MalformedNanopubError
+from nanopub.serialize import serialize_nanopub
+from nanopub.sign_utils import canonicalize_graph, verify_signature
+from nanopub.utils import MalformedNanopubError, extract_np_metadata, scan_nanopub
 from tests.conftest import (
     default_conf,
     profile_test,
@@ -201,7 +205,8 @@ class TestCreationFromSourceUri:
 
     def test_http_error_raises(self):
         """raise_for_status propagating should surface as an exception."""
-        with patch("nanopub.nanopub.requests.get", return_value=_make_fail_response()):
+        with patch("nanopub.nanopub.get_session") as mock_session:
+            mock_session.return_value.get.return_value = _make_fail_response()
             with pytest.raises(Exception, match="404"):
                 Nanopub(source_uri="https://purl.org/np/nonExistingNp", conf=NanopubConf())
 
@@ -210,24 +215,37 @@ class TestCreationFromSourceUri:
         fail = _make_fail_response()
         fail.raise_for_status = MagicMock()  # don't raise on first call, just ok=False
 
-        with patch(
-                "nanopub.nanopub.requests.get", side_effect=[fail, _make_ok_response(
-                    testsuite.get_by_nanopub_uri("http://example.org/nanopub-validator-example/").path.read_text()
-                )]
-        ) as mock_get:
+        with patch("nanopub.nanopub.get_session") as mock_session:
+            mock_get = mock_session.return_value.get
+            mock_get.side_effect = [fail, _make_ok_response(
+                testsuite.get_by_nanopub_uri("http://example.org/nanopub-validator-example/").path.read_text()
+            )]
             np = Nanopub(
                 source_uri="https://purl.org/np/whateverNp",
                 conf=NanopubConf(use_test_server=True),
             )
 
         assert mock_get.call_count == 2
+        # Both requests go through the same pooled session
+        mock_session.assert_called_once()
         assert len(np.rdf) > 0
 
+    def test_fetch_uses_the_session_of_the_conf(self, testsuite):
+        conf = NanopubConf(http_timeout=(1, 2), http_max_retries=5, http_pool_size=20)
+        with patch("nanopub.nanopub.get_session") as mock_session:
+            mock_session.return_value.get.return_value = _make_ok_response(
+                testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path.read_text()
+            )
+            Nanopub(source_uri="https://purl.org/np/whateverNp", conf=conf)
+        mock_session.assert_called_once_with(max_retries=5, timeout=(1, 2), pool_maxsize=20)
+        mock_session.return_value.get.assert_called_once_with("https://purl.org/np/whateverNp.trig")
+
     def test_metadata_matches_fetched_graph(self, testsuite):
         """Metadata extracted from the fetched graph should reference the nanopub URI."""
-        with patch("nanopub.nanopub.requests.get", return_value=_make_ok_response(
+        with patch("nanopub.nanopub.get_session") as mock_session:
+            mock_session.return_value.get.return_value = _make_ok_response(
                 testsuite.get_by_nanopub_uri("http://example.org/nanopub-validator-example/").path.read_text()
-        )):
+            )
             np = Nanopub(source_uri="https://purl.org/np/whateverNp", conf=NanopubConf())
 
         # This returns the np_uri read in the nanopub, which in this case is http://example.org/nanopub-validator-example/ as per the fixture
@@ -267,6 +285,33 @@ class TestCreationFromDataset:
         np = Nanopub(rdf=ds, conf=NanopubConf())
         assert "http://example.org/nanopub-validator-example/" in str(np.metadata.np_uri)
 
+    def test_dataset_is_copied(self, testsuite):
+        """By default the caller's Dataset is copied, and left as it is."""
+        ds = _make_dataset_from_trig(testsuite)
+        np = Nanopub(rdf=ds, conf=NanopubConf())
+        assert np.rdf is not ds
+        np.assertion.add((URIRef("http://test"), DC.title, Literal("added")))
+        assert (URIRef("http://test"), DC.title, Literal("added")) not in ds.graph(np.assertion.identifier)
+
+    def test_adopted_dataset_is_used_in_place(self, testsuite):
+        """With adopt=True the nanopub takes over the caller's Dataset instead of copying it."""
+        ds = _make_dataset_from_trig(testsuite)
+        with patch("nanopub.nanopub.deepcopy", wraps=deepcopy) as mock_deepcopy:
+            np = Nanopub(rdf=ds, conf=NanopubConf(), adopt=True)
+        assert all(call.args[0] is not ds for call in mock_deepcopy.call_args_list)
+        assert np.rdf is ds
+        assert len(np.assertion) > 0
+
+    def test_adopted_dataset_is_signed_in_place(self, testsuite):
+        copied = Nanopub(rdf=_make_dataset_from_trig(testsuite), conf=default_conf)
+        ds = _make_dataset_from_trig(testsuite)
+        adopted = Nanopub(rdf=ds, conf=default_conf, adopt=True)
+        copied.sign()
+        adopted.sign()
+        assert adopted.source_uri == copied.source_uri
+        assert adopted.rdf is ds
+        assert extract_np_metadata(ds).trusty == adopted.metadata.trusty
+
 
 class TestCreationFromFile:
 
@@ -698,6 +743,31 @@ class TestReplaceBlankNodes:
         g2 = np._replace_blank_nodes(g)
         assert len(list(g2.quads((None, None, None, None)))) == 1
 
+    def test_replace_blank_nodes_numbering(self):
+        # Unnamed blank nodes are numbered in the order met, subject before object, named ones keep their name
+        first, second = BNode("N" + "a" * 32), BNode("N" + "b" * 32)
+        p = URIRef("http://test/p")
+        g = Dataset()
+        g.add((first, p, second, URIRef("http://test/g")))
+        g.add((BNode("step"), p, Literal("value")))
+        np = Nanopub(conf=NanopubConf())
+        np._replace_blank_nodes(g)
+        ns = np.metadata.namespace
+        assert {q[:3] for q in g.quads((None, None, None, None))} == {
+            (ns["_1"], p, ns["_2"]),
+            (ns["_step"], p, Literal("value")),
+        }
+        assert np._bnode_count == 2
+
+    def test_replace_blank_nodes_without_blank_nodes(self):
+        g = Dataset()
+        g.add((URIRef("http://test/s"), URIRef("http://test/p"), Literal("value")))
+        np = Nanopub(conf=NanopubConf())
+        with patch.object(Dataset, "remove") as mock_remove, patch.object(Dataset, "addN") as mock_add:
+            assert np._replace_blank_nodes(g) is g
+        mock_remove.assert_not_called()
+        mock_add.assert_not_called()
+
 
 class TestHandlePublicationAttributedTo:
 
@@ -892,3 +962,252 @@ class TestIllTypedLiterals:
                 np.publish()
         mock_publish.assert_not_called()
         assert not np.published
+
+
+class TestCanonicalFormCache:
+    """The signature and trusty checks share one canonical form of the RDF, which is
+    recomputed only once the RDF has been modified."""
+
+    def test_is_valid_canonicalizes_once(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        with patch("nanopub.nanopub.canonicalize_graph", wraps=canonicalize_graph) as mock_canonicalize:
+            assert np.is_valid
+            assert np.has_valid_signature
+            assert np.has_valid_trusty
+        assert mock_canonicalize.call_count == 1
+
+    def test_cache_is_invalidated_when_rdf_is_modified(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        assert np.has_valid_trusty
+        extra = (URIRef("http://test"), URIRef("http://example.org/p"), Literal("added after signing"))
+        np.assertion.add(extra)
+        with pytest.raises(MalformedNanopubError):
+            np.has_valid_trusty
+        np.assertion.remove(extra)
+        assert np.has_valid_trusty
+
+    def test_cache_is_invalidated_when_a_triple_is_removed(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        assert np.has_valid_trusty
+        np.assertion.remove((None, None, None))
+        with pytest.raises(MalformedNanopubError):
+            np.has_valid_trusty
+
+
+class TestSerializationCache:
+    """A nanopub is serialized once per format, and again only once its RDF has been modified."""
+
+    def test_signed_nanopub_is_serialized_once(self, tmp_path):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        with patch("nanopub.nanopub.serialize_nanopub", wraps=serialize_nanopub) as mock_serialize, \
+                patch("nanopub.nanopub.publish_graph") as mock_publish:
+            trig = np.serialize(format="trig")
+            assert str(np).endswith(trig)
+            np.store(tmp_path / "np.trig")
+            np.publish()
+            assert np.to_bytes() is np.serialize(format="trig", encoding="utf-8")
+        mock_serialize.assert_not_called()
+        assert mock_publish.call_args.kwargs["data"] is np.to_bytes()
+        assert (tmp_path / "np.trig").read_text() == trig
+        assert trig == serialize_nanopub(np.rdf, format="trig", metadata=np.metadata)
+
+    def test_cache_per_format(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        nquads = np.to_bytes("nquads")
+        assert nquads is np.to_bytes("nquads")
+        assert nquads == serialize_nanopub(np.rdf, format="nquads", encoding="utf-8")
+        assert np.serialize(format="nquads", encoding="utf-16") == nquads.decode("utf-8").encode("utf-16")
+        with pytest.raises(ValueError):
+            np.to_bytes("xml")
+
+    def test_cache_is_invalidated_when_rdf_is_modified(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        trig = np.to_bytes()
+        np.assertion.add((URIRef("http://test"), URIRef("http://example.org/p"), Literal("added")))
+        assert b"added" in np.to_bytes() and b"added" not in trig
+        np.sign()
+        assert np.to_bytes() == serialize_nanopub(np.rdf, format="trig", metadata=np.metadata, encoding="utf-8")
+
+    def test_not_pickled(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        assert "_serialized" not in np.__getstate__()
+        assert pickle.loads(pickle.dumps(np)).to_bytes() == np.to_bytes()
+
+
+class TestLazyCreation:
+    """A lazy nanopub is only loaded when its RDF or metadata are used, and only verified on demand."""
+
+    def _trusty_file(self, tmp_path, testsuite):
+        trig_file = tmp_path / "trusty.trig"
+        trig_file.write_text(testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path.read_text())
+        return trig_file
+
+    def _trusty_uri(self, testsuite):
+        ds = Dataset()
+        ds.parse(testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path, format="trig")
+        return str(extract_np_metadata(ds).np_uri)
+
+    def test_file_is_parsed_on_first_use(self, tmp_path, testsuite):
+        np = Nanopub(rdf=self._trusty_file(tmp_path, testsuite), conf=NanopubConf(), lazy=True)
+        assert "_rdf" not in np.__dict__
+        assert np.source_uri == self._trusty_uri(testsuite)
+        assert np.signed_with_public_key
+        assert len(np.assertion) > 0
+
+    def test_verified_on_demand_only(self, tmp_path, testsuite):
+        with patch("nanopub.nanopub.verify_signature") as mock_verify:
+            np = Nanopub(rdf=self._trusty_file(tmp_path, testsuite), conf=NanopubConf(), lazy=True)
+            assert np.source_uri == self._trusty_uri(testsuite)
+            assert np.signed_with_public_key
+            mock_verify.assert_not_called()
+            assert np.is_valid
+            mock_verify.assert_called_once()
+
+    def test_same_as_eager(self, tmp_path, testsuite):
+        trig_file = self._trusty_file(tmp_path, testsuite)
+        lazy = Nanopub(rdf=trig_file, conf=NanopubConf(), lazy=True)
+        eager = Nanopub(rdf=trig_file, conf=NanopubConf())
+        assert lazy.metadata == eager.metadata
+        assert sorted(lazy.serialize(format="nquads").splitlines()) == \
+            sorted(eager.serialize(format="nquads").splitlines())
+
+    def test_dataset(self, testsuite):
+        np = Nanopub(rdf=_make_dataset_from_trig(testsuite), conf=NanopubConf(), lazy=True)
+        assert "_rdf" not in np.__dict__
+        assert len(np.head) > 0
+        assert np.source_uri is None
+
+    def test_source_uri_is_fetched_on_first_use(self, testsuite):
+        with patch("nanopub.nanopub.get_session") as mock_session:
+            mock_get = mock_session.return_value.get
+            mock_get.return_value = _make_ok_response(testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path.read_text())
+            np = Nanopub(source_uri=self._trusty_uri(testsuite), conf=NanopubConf(), lazy=True)
+            assert np.source_uri == self._trusty_uri(testsuite)
+            mock_get.assert_not_called()
+            assert len(np.rdf) > 0
+        mock_get.assert_called_once()
+
+    def test_errors_are_raised_on_first_use(self, tmp_path):
+        np = Nanopub(rdf=tmp_path / "does_not_exist.trig", conf=NanopubConf(), lazy=True)
+        for _ in range(2):
+            with pytest.raises(FileNotFoundError):
+                np.rdf
+
+    def test_invalid_rdf_argument_raises_right_away(self):
+        with pytest.raises(TypeError, match="Dataset or a pathlib.Path"):
+            Nanopub(rdf="some_nanopub.trig", conf=NanopubConf(), lazy=True)
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            Nanopub(conf=NanopubConf(), lazy=True).not_an_attribute
+
+
+class TestValidationReport:
+    """is_valid works from a report gathered in one pass over the quads, kept until the RDF changes."""
+
+    def test_report(self):
+        np = _minimal_valid_nanopub()
+        np.assertion.add((URIRef("http://test"), DC.date, Literal("not a date", datatype=XSD.date)))
+        report = np.validation_report
+        graphs = (np.head, np.assertion, np.provenance, np.pubinfo)
+        assert (report.head_size, report.assertion_size, report.provenance_size, report.pubinfo_size) == \
+            tuple(len(g) for g in graphs)
+        assert report.assertion_size == 2
+        assert report.graph_sizes == {g.identifier: len(g) for g in graphs}
+        assert report.has_assertion_provenance and report.has_pubinfo_about_nanopub
+        assert [o for o, _ in report.ill_typed_literals] == [Literal("not a date", datatype=XSD.date)]
+
+    def test_is_valid_scans_once(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        with patch("nanopub.nanopub.scan_nanopub", wraps=scan_nanopub) as mock_scan, \
+                patch("nanopub.nanopub.verify_signature", wraps=verify_signature) as mock_verify:
+            assert np.is_valid
+            assert np.is_valid
+            assert np.ill_typed_literals == []
+        assert mock_scan.call_count == 1
+        assert mock_verify.call_count == 1
+
+    def test_report_is_updated_when_rdf_is_modified(self):
+        np = _minimal_valid_nanopub()
+        assert np.is_valid
+        np.provenance.remove((None, None, None))
+        assert np.validation_report.provenance_size == 0
+        with pytest.raises(MalformedNanopubError, match="provenance graph is empty"):
+            np.is_valid
+        np.provenance.add((np.assertion.identifier, PROV.wasAttributedTo, URIRef("http://someone")))
+        assert np.is_valid
+
+    def test_failed_check_is_not_cached(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        np.sign()
+        with patch("nanopub.nanopub.verify_signature", side_effect=MalformedNanopubError("bad signature")):
+            with pytest.raises(MalformedNanopubError):
+                np.is_valid
+        assert np.is_valid
+
+
+class TestPickle:
+    """A nanopub is pickled as N-Quads and rebuilt as it was, without its private key unless asked."""
+
+    def _sorted_nquads(self, np):
+        return sorted(np.rdf.serialize(format="nquads").splitlines())
+
+    def test_trusty_nanopub(self, testsuite):
+        np = Nanopub(rdf=testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path, conf=NanopubConf())
+        with patch("nanopub.nanopub.verify_signature") as mock_verify:
+            unpickled = pickle.loads(pickle.dumps(np))
+            mock_verify.assert_not_called()
+        assert unpickled.source_uri == np.source_uri
+        assert unpickled.metadata == np.metadata
+        assert self._sorted_nquads(unpickled) == self._sorted_nquads(np)
+        assert len(unpickled.assertion) == len(np.assertion)
+        assert unpickled.is_valid
+
+    def test_blank_nodes_and_namespaces(self):
+        np = _minimal_valid_nanopub()
+        node = BNode("my-node")
+        np.assertion.add((URIRef("http://test"), DC.relation, node))
+        np.assertion.add((node, DC.title, Literal("titre", lang="fr")))
+        np.rdf.bind("ex", Namespace("http://example.org/ns#"))
+        unpickled = pickle.loads(pickle.dumps(np))
+        assert self._sorted_nquads(unpickled) == self._sorted_nquads(np)
+        assert (URIRef("http://test"), DC.relation, node) in unpickled.assertion
+        assert dict(unpickled.rdf.namespaces())["ex"] == URIRef("http://example.org/ns#")
+
+    def test_private_key_is_left_out(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        unpickled = pickle.loads(pickle.dumps(np))
+        assert unpickled.conf.profile.private_key is None
+        assert unpickled.profile.private_key is None
+        assert unpickled.conf.profile.public_key == profile_test.public_key
+        assert np.conf.profile.private_key == profile_test.private_key
+        assert not unpickled.conf.pickle_private_key
+
+    def test_unpickled_can_be_signed_when_asked(self):
+        np = _minimal_valid_nanopub(conf=NanopubConf(profile=profile_test, pickle_private_key=True))
+        unpickled = pickle.loads(pickle.dumps(np))
+        unpickled.sign()
+        np.sign()
+        assert unpickled.source_uri == np.source_uri
+        assert unpickled.is_valid
+
+    def test_lazy_nanopub(self, testsuite):
+        np = Nanopub(rdf=testsuite.get_valid(TestSuiteSubfolder.SIGNED)[0].path, conf=NanopubConf(), lazy=True)
+        unpickled = pickle.loads(pickle.dumps(np))
+        assert unpickled.source_uri == np.source_uri
+        assert unpickled.is_valid
+
+    def test_deepcopy_keeps_private_key(self):
+        np = _minimal_valid_nanopub(conf=default_conf)
+        copied = deepcopy(np)
+        assert copied.conf.profile.private_key == profile_test.private_key
+        copied.sign()
+        assert copied.is_valid
+        assert np.source_uri is None
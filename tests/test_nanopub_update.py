@@ -61,10 +61,10 @@ class TestCreation:
 
     def test_nanopub_update_init(self, monkeypatch):
         monkeypatch.setattr(
-            "nanopub.nanopub.requests.get",
-            lambda url: type(
+            "nanopub.nanopub.get_session",
+            lambda **kwargs: type("Session", (), {"get": lambda self, url: type(
                 "Resp", (), {"ok": True, "text": "", "raise_for_status": lambda: None}
-            )(),
+            )()})(),
         )
 
         uri_to_update = "http://example.org/np1"
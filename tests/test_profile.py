@@ -1,3 +1,4 @@
+from copy import deepcopy
 from pathlib import Path
 
 import pytest
@@ -6,6 +7,8 @@ from nanopub.profile import (
     Profile,
     ProfileError,
     format_key,
+    get_signer,
+    get_verifier,
     load_profile,
     normalize_private_key,
     normalize_public_key,
@@ -272,3 +275,32 @@ def test_format_key_is_deprecated():
     with pytest.warns(DeprecationWarning, match="format_key"):
         result = format_key(pem)
     assert result == _signing_key.public_key.read_text()
+
+
+class TestParsedKeys:
+
+    def test_signer_is_parsed_once(self):
+        profile = load_profile(profile_test_path)
+        assert profile.signer is profile.signer
+
+    def test_signer_follows_private_key(self):
+        profile = load_profile(profile_test_path)
+        signer = profile.signer
+        profile.generate_keys()
+        assert profile.signer is not signer
+        assert profile.signer is get_signer(profile.private_key)
+
+    def test_profile_with_signer_can_be_copied(self):
+        profile = load_profile(profile_test_path)
+        signer = profile.signer
+        copied = deepcopy(profile)
+        # The copy gets the same parsed key back from the cache
+        assert copied.signer is signer
+
+    def test_verifier_cache_counts_hits(self):
+        public_key = _signing_key.public_key.read_text()
+        get_verifier.cache_clear()
+        verifier = get_verifier(public_key)
+        assert get_verifier(public_key) is verifier
+        info = get_verifier.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
@@ -0,0 +1,183 @@
+import hashlib
+import random
+from functools import cmp_to_key
+
+import pytest
+from Crypto.Hash import SHA256
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.namespace import XSD
+
+from nanopub.trustyuri.rdf import NQuadsHasher, RdfHasher, RdfUtils
+from nanopub.trustyuri.rdf.StatementComparator import StatementComparator
+from nanopub.trustyuri.TrustyUriUtils import get_base64
+
+NP_TEMP_NS = "http://purl.org/nanopub/temp/np/"
+
+URIS = [
+    URIRef("http://example.org/"),
+    URIRef("http://example.org/a"),
+    URIRef("http://example.org/RAcode/a"),
+    URIRef("http://example.org/Z"),
+    URIRef("http://example.org/é"),
+    URIRef("http://example.org/🚀"),
+]
+LITERALS = [
+    Literal(""),
+    Literal("x"),
+    Literal("x", lang="en"),
+    Literal("x", lang="EN"),
+    Literal("x", datatype=XSD.string),
+    Literal("x", datatype=XSD.token),
+    Literal("é"),
+    Literal("http://example.org/a"),
+]
+
+
+class TestStatementComparatorSortKey:
+
+    @pytest.mark.parametrize("hashstr", [None, " ", "RAcode"])
+    def test_sort_key_orders_like_compare(self, hashstr):
+        comparator = StatementComparator(hashstr)
+        rnd = random.Random(42)
+        for _ in range(50):
+            quads = [
+                (rnd.choice([None] + URIS), rnd.choice(URIS), rnd.choice(URIS), rnd.choice(URIS + LITERALS))
+                for _ in range(40)
+            ]
+            expected = sorted(quads, key=cmp_to_key(comparator.compare))
+            assert sorted(quads, key=comparator.sort_key) == expected
+
+    def test_default_graph_sorts_first(self):
+        comparator = StatementComparator()
+        s, p, o = URIS[1], URIS[2], URIS[3]
+        quads = [(URIS[0], s, p, o), (None, s, p, o)]
+        assert sorted(quads, key=comparator.sort_key)[0][0] is None
+
+    def test_uris_sort_before_literals(self):
+        comparator = StatementComparator()
+        quads = [(None, URIS[1], URIS[1], Literal("a")), (None, URIS[1], URIS[1], URIRef("zzz:z"))]
+        assert sorted(quads, key=comparator.sort_key)[0][3] == URIRef("zzz:z")
+
+    def test_hashstr_is_blanked_in_uri_key(self):
+        comparator = StatementComparator("RAcode")
+        assert comparator.uri_key(URIRef("http://example.org/RAcode/a")) == b"http://example.org/ /a"
+
+
+def _quads():
+    g = URIRef("http://purl.org/nanopub/temp/np/assertion")
+    s = URIRef("http://example.org/s")
+    p = URIRef("http://example.org/p")
+    return [
+        (g, s, p, Literal("multi\nline \\ value")),
+        (g, s, p, URIRef("http://purl.org/nanopub/temp/np/thing")),
+        (g, s, p, Literal("x", lang="en")),
+        (g, s, p, Literal("x", datatype=XSD.string)),
+        (g, s, p, Literal("x")),
+    ]
+
+
+# Normalization and hash of _quads(), as computed by the original (non streaming) implementation
+EXPECTED_NORMALIZED = (
+    "https://w3id.org/np/ /assertion\nhttp://example.org/s\nhttp://example.org/p\n"
+    "https://w3id.org/np/ /thing\n"
+    "https://w3id.org/np/ /assertion\nhttp://example.org/s\nhttp://example.org/p\n"
+    "^http://www.w3.org/2001/XMLSchema#string multi\\nline \\\\ value\n"
+    "https://w3id.org/np/ /assertion\nhttp://example.org/s\nhttp://example.org/p\n"
+    "@en x\n"
+    "https://w3id.org/np/ /assertion\nhttp://example.org/s\nhttp://example.org/p\n"
+    "^http://www.w3.org/2001/XMLSchema#string x\n"
+)
+EXPECTED_HASH = "RAXILNIPszVAkAqk-d0Nap8RhvoMutwjsKXCk4-NRSP9U"
+
+
+class TestStreamingNormalization:
+
+    def test_chunks_concatenate_to_normalized_quads(self):
+        chunks = list(RdfHasher.iter_normalized_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS))
+        assert all(isinstance(c, bytes) for c in chunks)
+        assert b"".join(chunks) == EXPECTED_NORMALIZED.encode("utf-8")
+        assert RdfHasher.normalize_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS) == EXPECTED_NORMALIZED
+
+    def test_adjacent_duplicates_are_skipped(self):
+        # A plain literal and an xsd:string literal normalize to the same quad
+        chunks = list(RdfHasher.iter_normalized_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS))
+        assert len(chunks) == len(_quads()) - 1
+        assert len(set(chunks)) == len(chunks)
+
+    def test_update_hash_matches_make_hash(self):
+        h = RdfHasher.update_hash(hashlib.sha256(), _quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+        assert "RA" + get_base64(h.digest()) == EXPECTED_HASH
+        assert RdfHasher.make_hash(_quads(), hashstr=" ", baseuri=NP_TEMP_NS) == EXPECTED_HASH
+
+    def test_update_hash_accepts_crypto_hash(self):
+        h = RdfHasher.update_hash(SHA256.new(), _quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+        normalized = RdfHasher.normalize_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+        assert h.digest() == hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+class TestCanonicalQuads:
+
+    def test_insert_matches_canonicalizing_everything(self):
+        quads = _quads()
+        extra = (quads[0][0], URIRef("http://purl.org/nanopub/temp/np/sig"), quads[0][2], Literal("signature"))
+        canonical = RdfHasher.canonicalize_quads(list(quads), hashstr=" ", baseuri=NP_TEMP_NS)
+        RdfHasher.insert_canonical_quad(canonical, extra, hashstr=" ", baseuri=NP_TEMP_NS)
+        assert canonical == RdfHasher.canonicalize_quads(quads + [extra], hashstr=" ", baseuri=NP_TEMP_NS)
+
+    def test_make_hash_canonical_matches_make_hash(self):
+        canonical = RdfHasher.canonicalize_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+        assert RdfHasher.make_hash_canonical(canonical) == RdfHasher.make_hash(_quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+
+
+def _dataset(quads) -> Dataset:
+    ds = Dataset()
+    for c, s, p, o in quads:
+        ds.add((s, p, o, Graph(store=ds.store, identifier=c)))
+    return ds
+
+
+class TestNQuadsHasher:
+
+    def test_parse_terms(self):
+        quads = NQuadsHasher.parse(
+            '<http://ex.org/s> <http://ex.org/p> "a\\tb\\n\\"c\\u00e9"@en-GB <http://ex.org/g> .\n'
+            '# comment\n'
+            '\n'
+            '_:b1 <http://ex.org/p> "1"^^<http://www.w3.org/2001/XMLSchema#integer> _:g .\n'
+            '<http://ex.org/s> <http://ex.org/p> <http://ex.org/\\u00e9> .\n'
+        )
+        assert quads == [
+            ("http://ex.org/g", "http://ex.org/s", "http://ex.org/p", NQuadsHasher.NQuadsLiteral('a\tb\n"cé', None, "en-GB")),
+            (None, "b1", "http://ex.org/p", NQuadsHasher.NQuadsLiteral("1", str(XSD.integer), None)),
+            (NQuadsHasher.DEFAULT_GRAPH, "http://ex.org/s", "http://ex.org/p", "http://ex.org/é"),
+        ]
+        assert isinstance(quads[1][1], NQuadsHasher.BlankNode)
+
+    def test_parse_drops_duplicates(self):
+        line = '<http://ex.org/s> <http://ex.org/p> "x"@en <http://ex.org/g> .\n'
+        assert len(NQuadsHasher.parse(line * 3 + line.replace("@en", "@EN"))) == 1
+
+    def test_invalid_line_raises(self):
+        with pytest.raises(ValueError, match="Line 2"):
+            NQuadsHasher.parse('<http://ex.org/s> <http://ex.org/p> "x" .\n<http://ex.org/s> "x" .\n')
+
+    @pytest.mark.parametrize("hashstr,baseuri", [(None, None), (" ", None), (" ", NP_TEMP_NS), ("thing", NP_TEMP_NS)])
+    def test_make_hash_matches_rdf_hasher(self, hashstr, baseuri):
+        ds = _dataset(_quads() + [(None, URIRef("http://example.org/s"), URIRef("http://example.org/p"), Literal("é"))])
+        data = ds.serialize(format="nquads")
+        parsed = Dataset()
+        parsed.parse(data=data, format="nquads")
+        expected = RdfHasher.make_hash(RdfUtils.get_quads(parsed), hashstr=hashstr, baseuri=baseuri)
+        assert NQuadsHasher.make_hash(NQuadsHasher.parse(data), hashstr=hashstr, baseuri=baseuri) == expected
+        assert NQuadsHasher.make_hash(NQuadsHasher.parse(data.encode("utf-8")), hashstr=hashstr, baseuri=baseuri) == expected
+
+    def test_get_dataset(self):
+        ds = _dataset(_quads() + [(URIRef("http://example.org/g"), BNode("b1"), URIRef("http://example.org/p"), BNode("b2"))])
+        data = ds.serialize(format="nquads")
+        rebuilt = NQuadsHasher.get_dataset(NQuadsHasher.parse(data))
+        assert sorted(rebuilt.serialize(format="nquads").splitlines()) == sorted(data.splitlines())
+
+    def test_normalize_quads_matches_rdf_hasher(self):
+        data = _dataset(_quads()).serialize(format="nquads")
+        expected = RdfHasher.normalize_quads(_quads(), hashstr=" ", baseuri=NP_TEMP_NS)
+        assert NQuadsHasher.normalize_quads(NQuadsHasher.parse(data), hashstr=" ", baseuri=NP_TEMP_NS) == expected
@@ -1,8 +1,8 @@
 import pytest
-from rdflib import URIRef
+from rdflib import BNode, URIRef
 
 from nanopub.definitions import NP_TEMP_PREFIX, NP_PREFIX
-from nanopub.trustyuri.rdf.RdfUtils import get_format, get_str, normalize, get_suffix, get_trustyuri
+from nanopub.trustyuri.rdf.RdfUtils import TrustyRewriter, get_format, get_str, normalize, get_suffix, get_trustyuri
 
 
 class TestGetFormat:
@@ -197,3 +197,41 @@ class TestGetTrustyUri:
         temp_base = NP_TEMP_PREFIX + "example"
         result = get_trustyuri(URIRef(temp_base), NP_TEMP_PREFIX, self.ARTIFACT_CODE, {})
         assert result == f"{NP_PREFIX}{self.ARTIFACT_CODE}/example"
+
+
+class TestTrustyRewriter:
+    BASE_URI = "http://purl.org/nanopub/temp/np/"
+    ARTIFACT_CODE = "RAKzc-oGQp8ZuIijVa34ERWeD3rPzUtqNaLovtT5OgkzU"
+
+    @pytest.mark.parametrize("resource", [
+        URIRef(BASE_URI),
+        URIRef(BASE_URI.rstrip("/")),
+        URIRef(BASE_URI + "assertion"),
+        URIRef(BASE_URI + "sub/thing"),
+        URIRef("http://example.org/~~~ARTIFACTCODE~~~/concept"),
+        URIRef("http://example.org/unrelated"),
+        BNode("named"),
+        BNode("N2c21867a547345d9b8a203a7c1cd7e0c"),
+        "not a term",
+    ])
+    def test_rewrites_like_get_trustyuri(self, resource):
+        rewriter = TrustyRewriter(self.BASE_URI, self.ARTIFACT_CODE)
+        assert rewriter.rewrite(resource, {}) == get_trustyuri(resource, self.BASE_URI, self.ARTIFACT_CODE, {})
+
+    def test_precomputes_prefix(self):
+        rewriter = TrustyRewriter(self.BASE_URI, self.ARTIFACT_CODE)
+        assert rewriter.prefix == NP_PREFIX
+        assert rewriter.separator == "/"
+
+    def test_rewritten_uris_are_memoized(self):
+        rewriter = TrustyRewriter(self.BASE_URI, self.ARTIFACT_CODE)
+        first = rewriter.rewrite(URIRef(self.BASE_URI + "assertion"), {})
+        assert rewriter.rewrite(URIRef(self.BASE_URI + "assertion"), {}) is first
+
+    def test_unnamed_bnodes_are_numbered_with_the_given_map(self):
+        rewriter = TrustyRewriter(self.BASE_URI, self.ARTIFACT_CODE)
+        bnodemap: dict = {}
+        first = rewriter.rewrite(BNode("N2c21867a547345d9b8a203a7c1cd7e0c"), bnodemap)
+        second = rewriter.rewrite(BNode("N00000000000000000000000000000000"), bnodemap)
+        assert first == f"{NP_PREFIX}{self.ARTIFACT_CODE}#_1"
+        assert second == f"{NP_PREFIX}{self.ARTIFACT_CODE}#_2"
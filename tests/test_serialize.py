@@ -1,10 +1,21 @@
+import io
 import re
 
-from rdflib import RDF, RDFS, Dataset, Graph, URIRef
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+from rdflib import RDF, RDFS, XSD, BNode, Dataset, Graph, Literal, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
 
 from nanopub import Nanopub, NanopubConf, Profile
-from nanopub.serialize import NANOPUB_TRIG_FORMAT
-from tests.conftest import default_conf
+from nanopub.namespaces import NPX
+from nanopub.serialize import (
+    NANOPUB_TRIG_FORMAT,
+    NANOPUB_WRITER_FORMATS,
+    serialize_nanopub,
+    write_nanopub_nquads,
+    write_nanopub_trig,
+)
+from tests.conftest import _suite, default_conf
 
 ORCID_ID = "https://orcid.org/0000-0000-0000-0001"
 
@@ -150,3 +161,101 @@ class TestSerializeApi:
     def test_other_formats_still_work(self):
         out = _make_nanopub().serialize(format="nquads")
         assert "https://example.org/thing" in out
+
+
+def _tricky_dataset() -> Dataset:
+    """Terms that need escaping, blank nodes shared between graphs and rdf:type as an object."""
+    ds = _make_custom_named_dataset()
+    assertion = ds.graph(URIRef("http://example.org/np#assertion"))
+    provenance = ds.graph(URIRef("http://example.org/np#provenance"))
+    thing = URIRef("http://example.org/thing")
+    node = BNode("not a valid label")
+    assertion.add((thing, RDFS.label, Literal('quote " backslash \\ newline \n return \r tab \t é 😀')))
+    assertion.add((thing, RDFS.label, Literal("chose", lang="fr-BE")))
+    assertion.add((thing, RDFS.label, Literal("x", datatype=XSD.string)))
+    assertion.add((thing, RDFS.label, Literal("x")))
+    assertion.add((thing, RDFS.comment, Literal("01", datatype=XSD.integer)))
+    assertion.add((thing, RDFS.seeAlso, URIRef("http://example.org/with space/a.b-")))
+    assertion.add((thing, RDFS.isDefinedBy, node))
+    assertion.add((RDFS.subPropertyOf, RDFS.subPropertyOf, RDF.type))
+    provenance.add((node, RDFS.label, Literal("shared")))
+    ds.add((thing, RDFS.label, Literal("in the default graph")))
+    return ds
+
+
+def _quads(ds: Dataset) -> set:
+    return set(ds.quads((None, None, None, None)))
+
+
+def _quads_without_bnodes(ds: Dataset) -> set:
+    """The quads with any blank node replaced, since labels do not survive parsing"""
+    return {
+        tuple(Literal("_:") if isinstance(t, BNode) else t for t in q[:3]) + (_graph_name(q[3]),)
+        for q in _quads(ds)
+    }
+
+
+def _graph_name(context):
+    # rdflib 6 parses the default graph of TriG and N-Quads into a graph named by a blank node
+    return None if context is None or context == DATASET_DEFAULT_GRAPH_ID or isinstance(context, BNode) else context
+
+
+class TestNanopubWriter:
+    """The dedicated TriG and N-Quads writer gives back the same RDF."""
+
+    @pytest.mark.parametrize("format", NANOPUB_WRITER_FORMATS)
+    def test_round_trip(self, format):
+        ds = _tricky_dataset()
+        parsed = Dataset()
+        parsed.parse(data=serialize_nanopub(ds, format=format), format=format)
+        assert _quads_without_bnodes(parsed) == _quads_without_bnodes(ds)
+        assert len(_quads(parsed)) == len(_quads(ds))
+        # The blank node shared by two graphs is still one node
+        assert len({q[2] for q in _quads(parsed) if isinstance(q[2], BNode)} |
+                   {q[0] for q in _quads(parsed) if isinstance(q[0], BNode)}) == 1
+
+    @pytest.mark.parametrize("path", [e.path for e in _suite.get_valid(TestSuiteSubfolder.SIGNED)], ids=lambda p: p.name)
+    @pytest.mark.parametrize("format", NANOPUB_WRITER_FORMATS)
+    def test_round_trip_signed(self, path, format):
+        np = Nanopub(rdf=path)
+        parsed = Dataset()
+        parsed.parse(data=np.serialize(format=format), format=format)
+        assert _quads(parsed) == _quads(np.rdf)
+
+    def test_graph_order_and_prefixes(self):
+        out = serialize_nanopub(_tricky_dataset(), format="trig")
+        assert _graph_order(out) == CONVENTIONAL_ORDER
+        prefixes = re.findall(r"^@prefix\s+(\S+):", out, flags=re.M)
+        # Only the prefixes in use are declared
+        assert set(prefixes) == {"dcterms", "ex", "np", "prov", "rdf", "rdfs", "xsd"}
+        assert "rdfs:subPropertyOf rdfs:subPropertyOf rdf:type" in out
+        assert "<http://example.org/with\\u0020space/a.b->" in out
+
+    def test_nanopub_prefixes_without_bindings(self):
+        ds = Dataset()
+        ds.add((NPX.s, NPX.p, NPX.o, URIRef("http://example.org/g")))
+        assert "npx" not in dict(ds.namespaces())
+        assert serialize_nanopub(ds, format="trig").startswith("@prefix npx: <http://purl.org/nanopub/x/> .\n")
+
+    def test_destinations(self, tmp_path):
+        np = _make_nanopub()
+        out = np.serialize(format="nquads")
+        assert isinstance(out, str)
+        assert np.serialize(format="nquads", encoding="utf-8") == out.encode("utf-8")
+        stream = io.BytesIO()
+        serialize_nanopub(np.rdf, stream, format="trig", metadata=np.metadata)
+        assert stream.getvalue().decode("utf-8") == np.serialize()
+        np.store(tmp_path / "np.trig")
+        assert (tmp_path / "np.trig").read_text(encoding="utf-8") == np.serialize()
+
+    def test_write_to_stream(self):
+        stream = io.BytesIO()
+        write_nanopub_nquads(_tricky_dataset(), stream)
+        assert len(stream.getvalue().decode("utf-8").splitlines()) == len(_quads(_tricky_dataset()))
+        stream = io.BytesIO()
+        write_nanopub_trig(_tricky_dataset(), stream)
+        assert stream.getvalue().startswith(b"@prefix ")
+
+    def test_other_formats_are_refused(self):
+        with pytest.raises(ValueError, match="trig or nquads"):
+            serialize_nanopub(_tricky_dataset(), format="turtle")
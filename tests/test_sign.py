@@ -0,0 +1,101 @@
+import dataclasses
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+
+from nanopub import Nanopub, NanopubConf, SignResult, sign_many
+from nanopub.sign import sign_one
+from tests.conftest import default_conf, profile_test
+
+
+def _nanopub(i, concept=False):
+    assertion = Graph()
+    subject = BNode("thing") if concept else URIRef(f"http://example.org/thing{i}")
+    assertion.add((subject, URIRef("http://example.org/value"), Literal(i)))
+    return Nanopub(conf=default_conf, assertion=assertion)
+
+
+def _signed(i, concept=False):
+    np = _nanopub(i, concept)
+    np.sign()
+    return np
+
+
+class TestSignMany:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_same_as_sign(self, workers):
+        nanopubs = [_nanopub(i) for i in range(6)] + [_nanopub(6, concept=True)]
+        results = list(sign_many(nanopubs, workers=workers))
+        assert [r.position for r in results] == list(range(len(nanopubs)))
+        for i, (np, result) in enumerate(zip(nanopubs, results)):
+            assert result.error is None
+            assert result.source_uri == _signed(i, concept=i == 6).source_uri
+            assert result.data.decode().startswith("@prefix")
+            assert result.nanopub is None
+            # The nanopubs given are not signed in place
+            assert np.source_uri is None
+
+    def test_unordered_results(self):
+        nanopubs = [_nanopub(i) for i in range(8)]
+        results = list(sign_many(nanopubs, workers=2, ordered=False))
+        assert sorted(r.position for r in results) == list(range(8))
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_rebuild(self, workers):
+        conf = dataclasses.replace(default_conf, add_prov_generated_time=True, http_timeout=3)
+        nanopubs = [_nanopub(0), Nanopub(conf=conf, assertion=_nanopub(1).assertion)]
+        results = list(sign_many(nanopubs, workers=workers, rebuild=True))
+        for np, result in zip(nanopubs, results):
+            assert isinstance(result.nanopub, Nanopub)
+            assert result.nanopub.source_uri == result.source_uri
+            assert result.nanopub.is_valid
+            # Each nanopub keeps its own config
+            assert result.nanopub.conf.http_timeout == np.conf.http_timeout
+            assert result.nanopub.conf.profile.orcid_id == np.conf.profile.orcid_id
+
+    def test_nquads_input_and_format(self):
+        data = _nanopub(0).rdf.serialize(format="nquads", encoding="utf-8")
+        result, = sign_many([data], profile=profile_test, workers=1, format="nquads")
+        assert result.error is None
+        assert f"<{result.source_uri}>" in result.data.decode()
+
+    def test_errors_are_reported_per_item(self):
+        results = list(sign_many([_nanopub(0), _signed(1), b"not RDF", _nanopub(2)], workers=2))
+        assert [r.error is None for r in results] == [True, False, False, True]
+        assert results[1].error.startswith("MalformedNanopubError")
+        assert results[1].source_uri is None and results[1].data is None
+
+    def test_missing_profile(self):
+        result = sign_one(0, _nanopub(0).rdf.serialize(format="nquads", encoding="utf-8"), NanopubConf())
+        assert result == SignResult(0, None, None, result.error)
+        assert result.error.startswith("ProfileError")
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_unsupported_input_type(self, workers):
+        results = list(sign_many([_nanopub(0), "np.trig", _nanopub(1)], workers=workers))
+        assert [r.position for r in results] == [0, 1, 2]
+        assert [r.error is None for r in results] == [True, False, True]
+        assert results[1].error.startswith("TypeError") and "str" in results[1].error
+
+
+class TestNquadsForSigning:
+
+    def test_blank_nodes_named_as_sign(self):
+        np = _nanopub(0, concept=True)
+        np.assertion.add((BNode("thing"), URIRef("http://example.org/part"), BNode()))
+        before = len(np.rdf)
+        data = np.to_nquads_for_signing()
+        # The nanopub is left as it was
+        assert any(isinstance(q[0], BNode) for q in np.rdf.quads((None, None, None, None)))
+        assert len(np.rdf) == before and np._bnode_count == 0
+        assert b"_:" not in data
+        signed = _nanopub(0, concept=True)
+        signed.assertion.add((BNode("thing"), URIRef("http://example.org/part"), BNode()))
+        signed.sign()
+        assert sign_one(0, data, default_conf).source_uri == signed.source_uri
+        assert np.to_nquads_for_signing() == data
+
+    def test_without_blank_nodes(self):
+        np = _nanopub(0)
+        assert np.to_nquads_for_signing() == np.to_bytes("nquads")
@@ -1,15 +1,24 @@
 import re
 from copy import deepcopy
 
-from rdflib import Dataset, URIRef, Literal, Namespace, Graph
+import pytest
+
+from rdflib import BNode, Dataset, URIRef, Literal, Namespace, Graph
 from rdflib.namespace import FOAF
 
 from nanopub import Nanopub
 from nanopub.definitions import DUMMY_NAMESPACE, NP_PREFIX, NP_TEMP_PREFIX
 from nanopub.namespaces import NPX
 from nanopub.profile import Profile
-from nanopub.sign_utils import add_signature
+from nanopub.sign_utils import (
+    add_signature,
+    replace_trusty_in_graph,
+    verify_signature,
+    verify_trusty,
+    verify_trusty_nquads,
+)
 from nanopub.trustyuri.rdf import RdfUtils
+from nanopub.utils import MalformedNanopubError
 from tests.conftest import default_conf, profile_test
 
 
@@ -29,6 +38,61 @@ class TestVerifyTrusty:
         assert quads[0][0] == graph_uri  # context should not collapse to None
 
 
+class TestVerifySignature:
+
+    @staticmethod
+    def _signed() -> Nanopub:
+        np = Nanopub(conf=default_conf)
+        np.assertion.add((URIRef("https://example.org/s"), FOAF.name, Literal("signed")))
+        np.sign()
+        return np
+
+    def test_signed_nanopub_is_valid(self):
+        np = self._signed()
+        assert verify_signature(np.rdf, np.source_uri, np.metadata.namespace)
+
+    def test_tampered_signature_raises(self):
+        np = self._signed()
+        s, p, o, c = next(np.rdf.quads((None, NPX.hasSignature, None, None)))
+        np.rdf.remove((s, p, o, c))
+        np.rdf.add((s, p, Literal(("B" if str(o)[0] == "A" else "A") + str(o)[1:]), c))
+        with pytest.raises(MalformedNanopubError):
+            verify_signature(np.rdf, np.source_uri, np.metadata.namespace)
+
+    def test_signed_content_must_match(self):
+        np = self._signed()
+        # Changing the assertion keeps the signature value, which no longer matches the content
+        np.assertion.add((URIRef("https://example.org/s"), FOAF.name, Literal("forged")))
+        with pytest.raises(MalformedNanopubError):
+            verify_signature(np.rdf, np.source_uri, np.metadata.namespace)
+
+
+class TestVerifyTrustyNQuads:
+
+    @staticmethod
+    def _signed_nquads() -> str:
+        np = Nanopub(conf=default_conf)
+        np.assertion.add((URIRef("https://example.org/s"), FOAF.name, Literal("multi\nline \"name\"", lang="en")))
+        np.assertion.add((np.namespace["thing"], FOAF.knows, URIRef("https://example.org/s")))
+        np.sign()
+        return np.rdf.serialize(format="nquads")
+
+    def test_signed_nanopub_is_valid(self):
+        assert verify_trusty_nquads(self._signed_nquads())
+
+    def test_accepts_bytes(self):
+        assert verify_trusty_nquads(self._signed_nquads().encode("utf-8"))
+
+    def test_modified_nanopub_raises(self):
+        tampered = self._signed_nquads().replace("multi\\nline", "multi line")
+        with pytest.raises(MalformedNanopubError, match="not valid"):
+            verify_trusty_nquads(tampered)
+
+    def test_no_nanopub_raises(self):
+        with pytest.raises(MalformedNanopubError, match="No nanopublication"):
+            verify_trusty_nquads('<https://example.org/s> <https://example.org/p> "x" <https://example.org/g> .\n')
+
+
 class TestAddSignature:
 
     def test_add_signature(self):
@@ -72,6 +136,54 @@ class TestAddSignature:
                 if isinstance(term, URIRef):
                     assert not str(term).startswith(NP_TEMP_PREFIX)
 
+    def test_trusty_artefact_matches_full_renormalization(self):
+        input_g = Dataset()
+        pubinfo_g = Graph(store=input_g.store, identifier=DUMMY_NAMESPACE["pubinfo"])
+        input_g.add((DUMMY_NAMESPACE[""], FOAF.name, Literal("np"), pubinfo_g))
+        input_g.add((URIRef("https://example.org/s"), FOAF.knows, DUMMY_NAMESPACE["thing"], pubinfo_g))
+
+        output_g = add_signature(input_g, profile_test, DUMMY_NAMESPACE, pubinfo_g)
+
+        np_uri = next(s for s, _, _, _ in output_g.quads((None, FOAF.name, Literal("np"), None)))
+        # The trusty code derived from the incrementally updated canonical quads must
+        # be the one a verifier computes from scratch on the signed graph
+        assert verify_trusty(output_g, str(np_uri), Namespace(str(np_uri) + "/"))
+
+
+class TestReplaceTrustyInGraph:
+
+    TRUSTY = "RA" + "a" * 43
+
+    def test_rewrites_every_quad(self):
+        g = Dataset()
+        assertion = DUMMY_NAMESPACE["assertion"]
+        g.add((DUMMY_NAMESPACE["thing"], FOAF.knows, URIRef("https://example.org/other"), assertion))
+        g.add((DUMMY_NAMESPACE["thing"], FOAF.name, Literal("thing"), assertion))
+        g.add((URIRef("https://example.org/other"), FOAF.knows, DUMMY_NAMESPACE["thing"], assertion))
+
+        out = replace_trusty_in_graph(self.TRUSTY, str(DUMMY_NAMESPACE), g)
+
+        assert out is g
+        np_uri = NP_PREFIX + self.TRUSTY
+        assert set((s, p, o, c) for s, p, o, c in out.quads((None, None, None, None))) == {
+            (URIRef(f"{np_uri}/thing"), FOAF.knows, URIRef("https://example.org/other"), URIRef(f"{np_uri}/assertion")),
+            (URIRef(f"{np_uri}/thing"), FOAF.name, Literal("thing"), URIRef(f"{np_uri}/assertion")),
+            (URIRef("https://example.org/other"), FOAF.knows, URIRef(f"{np_uri}/thing"), URIRef(f"{np_uri}/assertion")),
+        }
+
+    def test_blank_nodes_are_numbered_consistently(self):
+        g = Dataset()
+        assertion = DUMMY_NAMESPACE["assertion"]
+        bnode = BNode()
+        g.add((bnode, FOAF.name, Literal("anonymous"), assertion))
+        g.add((DUMMY_NAMESPACE["thing"], FOAF.knows, bnode, assertion))
+
+        out = replace_trusty_in_graph(self.TRUSTY, str(DUMMY_NAMESPACE), g)
+
+        subjects = {s for s, _, _, _ in out.quads((None, FOAF.name, None, None))}
+        objects = {o for _, _, o, _ in out.quads((None, FOAF.knows, None, None))}
+        assert subjects == objects == {URIRef(f"{NP_PREFIX}{self.TRUSTY}#_1")}
+
 
 class TestSelfSignedIntroduction:
     """A signer that is a sub-IRI of the nanopub it signs (self-signed agent introduction).
@@ -5,6 +5,8 @@ from nanopub_testsuite_connector import TestSuiteSubfolder
 from rdflib import Dataset
 
 from nanopub import Nanopub
+from nanopub.sign_utils import verify_trusty_nquads
+from nanopub.trustyuri.rdf import NQuadsHasher, RdfHasher, RdfUtils
 from nanopub.utils import MalformedNanopubError
 from tests.conftest import testsuite_conf, _suite
 
@@ -54,6 +56,21 @@ def test_testsuite_valid_trusty(entry):
     assert np.is_valid
 
 
+@pytest.mark.parametrize(
+    "entry",
+    _suite.get_valid(TestSuiteSubfolder.SIGNED) + _suite.get_valid(TestSuiteSubfolder.TRUSTY),
+    ids=lambda e: e.name,
+)
+def test_testsuite_nquads_hasher(entry):
+    """The N-Quads hasher must give the codes RdfHasher computes from the rdflib Dataset"""
+    np = Nanopub(conf=testsuite_conf, rdf=entry.path)
+    nquads = np.rdf.serialize(format="nquads")
+    namespace = str(np.metadata.namespace)
+    assert NQuadsHasher.make_hash(NQuadsHasher.parse(nquads), " ", namespace) == \
+        RdfHasher.make_hash(RdfUtils.get_quads(np.rdf), " ", namespace)
+    assert verify_trusty_nquads(nquads)
+
+
 @pytest.mark.parametrize(
     "tc",
     _suite.get_transform_cases("rsa-key1"),
@@ -0,0 +1,173 @@
+import hashlib
+import io
+import json
+import os
+import re
+
+import pytest
+from rdflib import Dataset, Literal, URIRef
+
+from nanopub.trustyuri import CheckFile, RunBatch, TrustyUriUtils
+from nanopub.trustyuri.file import FileHasher, ProcessFile
+from nanopub.trustyuri.file.FileModule import FileModule
+from nanopub.trustyuri.rdf import RdfHasher, RdfUtils
+from nanopub.trustyuri.TrustyUriResource import TrustyUriResource
+from nanopub.trustyuri.TrustyUriUtils import get_base64
+
+# CRLF line endings and bytes that are not valid UTF-8 must be hashed as they are
+CONTENT = b"line 1\r\nline 2\n\xff\xfe binary \x00" * 1000
+EXPECTED = "FA" + get_base64(hashlib.sha256(CONTENT).digest())
+
+
+class TestFileHasher:
+
+    def test_stream_matches_make_hash(self):
+        assert FileHasher.make_hash_stream(io.BytesIO(CONTENT)) == FileHasher.make_hash(CONTENT) == EXPECTED
+
+    def test_hash_file(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(CONTENT)
+        assert FileHasher.make_hash_file(path) == EXPECTED
+
+    def test_make_hash_of_text(self):
+        assert FileHasher.make_hash("é") == FileHasher.make_hash("é".encode("utf-8"))
+
+
+class TestTrustyUriResource:
+
+    def test_content_is_read_lazily(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(CONTENT)
+        resource = TrustyUriResource(str(path), None, EXPECTED)
+        assert resource.content is None
+        with resource.open() as f:
+            assert f.read() == CONTENT
+        assert resource.content is None
+        assert resource.get_content() == CONTENT
+
+    @pytest.mark.parametrize("content", [b"bytes", "text"])
+    def test_open_given_content(self, content):
+        with TrustyUriResource("unused", content, None).open() as f:
+            assert f.read() == (content if isinstance(content, bytes) else content.encode())
+
+    def test_opener(self):
+        opened = []
+        resource = TrustyUriResource("unused", None, EXPECTED, opener=lambda: opened.append(1) or io.BytesIO(CONTENT))
+        assert FileModule().has_correct_hash(resource)
+        assert resource.content is None
+        assert resource.get_content() == CONTENT
+        assert len(opened) == 2
+
+
+class TestFileModule:
+
+    def test_process_then_check(self, tmp_path, capsys):
+        path = tmp_path / "data.csv"
+        path.write_bytes(CONTENT)
+        ProcessFile.process([str(path)])
+        processed = tmp_path / f"data.{EXPECTED}.csv"
+        assert os.listdir(tmp_path) == [processed.name]
+        assert processed.read_bytes() == CONTENT
+
+        CheckFile.check([str(processed)])
+        assert capsys.readouterr().out == f"Correct hash: {EXPECTED}\n"
+
+        processed.write_bytes(CONTENT + b"\n")
+        CheckFile.check([str(processed)])
+        assert capsys.readouterr().out == "*** INCORRECT HASH ***\n"
+
+    def test_check_url(self, tmp_path, capsys, monkeypatch):
+        # Larger than the chunks it is hashed in
+        content = CONTENT * 20
+        expected = FileHasher.make_hash(content)
+        reads = []
+
+        class Response(io.RawIOBase):
+            def __init__(self, url):
+                self.body = io.BytesIO(content)
+
+            def readable(self):
+                return True
+
+            def readinto(self, b):
+                reads.append(len(b))
+                return self.body.readinto(b)
+
+        monkeypatch.setattr(CheckFile, "urlopen", Response)
+        CheckFile.check([f"https://example.org/data.{expected}.bin"])
+        assert capsys.readouterr().out == f"Correct hash: {expected}\n"
+        # Hashed in chunks as it is downloaded, rather than read at once
+        assert len(reads) > 1 and max(reads) < len(content)
+
+    def test_has_correct_hash(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(CONTENT)
+        assert FileModule().has_correct_hash(TrustyUriResource(str(path), None, EXPECTED))
+        assert not FileModule().has_correct_hash(TrustyUriResource(str(path), None, "FA" + "A" * 43))
+
+
+def _trusty_files(directory):
+    """A correct and an incorrect FA file, a correct RA file, and a file that is not trusty"""
+    directory.mkdir()
+    sub = directory / "sub"
+    sub.mkdir()
+    for name, content in [("good.bin", CONTENT), ("bad.bin", b"original")]:
+        (sub / name).write_bytes(content)
+        ProcessFile.process([str(sub / name)])
+    bad = next(sub.glob("bad.*.bin"))
+    bad.write_bytes(b"tampered")
+
+    ds = Dataset()
+    ds.add((URIRef("http://example.org/s"), URIRef("http://example.org/p"), Literal("é"), URIRef("http://example.org/g")))
+    ra = RdfHasher.make_hash(RdfUtils.get_quads(ds))
+    (directory / f"data.{ra}.nq").write_text(ds.serialize(format="nquads"), encoding="utf-8")
+    (directory / "README").write_text("not trusty")
+    return {
+        str(sub / f"good.{EXPECTED}.bin"): ("FA", True),
+        str(bad): ("FA", False),
+        str(directory / f"data.{ra}.nq"): ("RA", True),
+    }
+
+
+class TestCheckBatch:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_check_directory(self, tmp_path, workers):
+        expected = _trusty_files(tmp_path / "archive")
+        records = list(CheckFile.check_files([str(tmp_path / "archive")], workers=workers))
+        assert {r["file"]: (r["module"], r["ok"]) for r in records} == expected
+        for r in records:
+            assert r["expected"] == TrustyUriUtils.get_trustyuri_tail(r["file"])
+            assert (r["computed"] == r["expected"]) == r["ok"]
+            assert r["error"] is None
+            assert r["seconds"] >= 0
+
+    def test_glob_pattern(self, tmp_path):
+        expected = _trusty_files(tmp_path / "archive")
+        records = list(CheckFile.check_files([str(tmp_path / "archive" / "**" / "*.bin")], workers=1))
+        assert sorted(r["file"] for r in records) == sorted(f for f in expected if f.endswith(".bin"))
+
+    def test_unknown_module_is_reported(self, tmp_path):
+        path = tmp_path / "README"
+        path.write_text("not trusty")
+        record = CheckFile.check_file(str(path))
+        assert not record["ok"]
+        assert record["error"].startswith("ValueError")
+
+    def test_json_lines_summary(self, tmp_path, capsys):
+        expected = _trusty_files(tmp_path / "archive")
+        output = tmp_path / "summary.jsonl"
+        CheckFile.check(["-j", "2", "-o", str(output), str(tmp_path / "archive")])
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert {r["file"]: r["ok"] for r in records} == {f: ok for f, (_, ok) in expected.items()}
+        assert set(records[0]) >= {"file", "module", "expected", "computed", "ok", "seconds"}
+        assert re.fullmatch(r"Checked 3 files \(1 incorrect\) in .*s: .* files/s, .* MB/s\n", capsys.readouterr().err)
+
+    def test_run_batch_command(self, tmp_path, capsys):
+        _trusty_files(tmp_path / "archive")
+        commands = tmp_path / "commands.txt"
+        commands.write_text(f"# check the archive\nCheckFiles {tmp_path / 'archive'}\n")
+        RunBatch.run(str(commands))
+        out = capsys.readouterr().out
+        assert out.startswith(f"COMMAND: CheckFiles {tmp_path / 'archive'}\n")
+        assert len([line for line in out.splitlines() if line.startswith("{")]) == 3
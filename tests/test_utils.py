@@ -0,0 +1,125 @@
+from dataclasses import astuple
+
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+from rdflib import RDF, BNode, Dataset, Literal, URIRef
+from rdflib.store import TripleAddedEvent
+
+from nanopub import Nanopub
+from nanopub.namespaces import NP, NPX
+from nanopub.utils import (
+    DatasetChangeTracker,
+    MalformedNanopubError,
+    _extract_np_metadata_lookup,
+    _extract_np_metadata_sparql,
+    extract_np_metadata,
+)
+from tests.conftest import _suite
+
+EX = "http://example.org/np1/"
+NP_URI = URIRef(EX[:-1])
+FILES = [e.path for folder in (TestSuiteSubfolder.PLAIN, TestSuiteSubfolder.SIGNED) for e in _suite.get_valid(folder)]
+
+
+def _nanopub(signatures: int = 1) -> Dataset:
+    ds = Dataset()
+    head = ds.graph(URIRef(EX + "Head"))
+    head.add((NP_URI, RDF.type, NP.Nanopublication))
+    head.add((NP_URI, NP.hasAssertion, URIRef(EX + "assertion")))
+    head.add((NP_URI, NP.hasProvenance, URIRef(EX + "provenance")))
+    head.add((NP_URI, NP.hasPublicationInfo, URIRef(EX + "pubinfo")))
+    ds.graph(URIRef(EX + "assertion")).add((URIRef(EX + "s"), URIRef(EX + "p"), Literal("o")))
+    pubinfo = ds.graph(URIRef(EX + "pubinfo"))
+    pubinfo.add((NP_URI, URIRef(EX + "p"), Literal("o")))
+    for i in range(signatures):
+        sig = URIRef(EX + f"sig{i}")
+        pubinfo.add((sig, NPX.hasSignatureTarget, NP_URI))
+        pubinfo.add((sig, NPX.hasPublicKey, Literal("key")))
+        pubinfo.add((sig, NPX.hasAlgorithm, Literal("RSA")))
+        pubinfo.add((sig, NPX.hasSignature, Literal(f"signature{i}")))
+    return ds
+
+
+def _metadata_or_error(ds):
+    try:
+        return astuple(extract_np_metadata(ds))
+    except MalformedNanopubError as e:
+        return str(e)
+
+
+class TestExtractNpMetadata:
+
+    @pytest.mark.parametrize("path", FILES, ids=lambda p: p.name)
+    def test_lookup_same_as_sparql_on_testsuite(self, path):
+        ds = Dataset()
+        ds.parse(path, format="trig")
+        assert astuple(_extract_np_metadata_lookup(ds)) == astuple(_extract_np_metadata_sparql(ds))
+
+    def test_signature_is_extracted(self):
+        meta = extract_np_metadata(_nanopub())
+        assert (meta.np_uri, meta.sig_uri, meta.signature) == (NP_URI, URIRef(EX + "sig0"), Literal("signature0"))
+        assert (meta.public_key, meta.algorithm) == (Literal("key"), Literal("RSA"))
+        assert str(meta.namespace) == EX
+
+    def test_incomplete_signature_is_ignored(self):
+        ds = _nanopub()
+        ds.remove((URIRef(EX + "sig0"), NPX.hasAlgorithm, None, None))
+        meta = _extract_np_metadata_lookup(ds)
+        assert meta.signature is None and meta.sig_uri is None
+        assert astuple(meta) == astuple(_extract_np_metadata_sparql(ds))
+
+    @pytest.mark.parametrize("change", [
+        "no_nanopub", "two_nanopubs", "two_assertions", "two_signatures", "head_in_default_graph",
+        "missing_pubinfo", "blank_head",
+    ])
+    def test_odd_inputs_fall_back_to_sparql(self, change, monkeypatch):
+        ds = _nanopub(signatures=2 if change == "two_signatures" else 1)
+        head = URIRef(EX + "Head")
+        if change == "no_nanopub":
+            ds.remove((None, RDF.type, None, None))
+        elif change == "two_nanopubs":
+            ds.add((URIRef(EX + "other"), RDF.type, NP.Nanopublication, head))
+        elif change == "two_assertions":
+            ds.add((NP_URI, NP.hasAssertion, URIRef(EX + "assertion2"), head))
+        elif change == "head_in_default_graph":
+            for s, p, o, _ in list(ds.quads((None, None, None, head))):
+                ds.remove((s, p, o, head))
+                ds.add((s, p, o))
+        elif change == "missing_pubinfo":
+            ds.remove((None, None, None, URIRef(EX + "pubinfo")))
+        elif change == "blank_head":
+            for s, p, o, _ in list(ds.quads((None, None, None, head))):
+                ds.remove((s, p, o, head))
+                ds.add((s, p, o, BNode()))
+        assert _extract_np_metadata_lookup(ds) is None
+        fast = _metadata_or_error(ds)
+        monkeypatch.setattr("nanopub.utils._extract_np_metadata_lookup", lambda g: None)
+        assert fast == _metadata_or_error(ds)
+
+
+class TestDatasetChangeTracker:
+
+    def test_state_changes_with_the_dataset(self):
+        ds = _nanopub()
+        tracker = DatasetChangeTracker(ds)
+        state = tracker.state
+        assert tracker.state == state
+        ds.add((URIRef(EX + "s"), URIRef(EX + "p"), Literal("other"), URIRef(EX + "assertion")))
+        assert tracker.state != state
+        state = tracker.state
+        ds.remove((URIRef(EX + "s"), URIRef(EX + "p"), Literal("other"), URIRef(EX + "assertion")))
+        assert tracker.state != state
+
+    def test_one_subscription_per_store(self):
+        ds = _nanopub()
+        trackers = [DatasetChangeTracker(ds)]
+        handlers = list(ds.store.dispatcher.get_map()[TripleAddedEvent])
+        trackers += [DatasetChangeTracker(ds) for _ in range(4)]
+        assert ds.store.dispatcher.get_map()[TripleAddedEvent] == handlers
+        state = trackers[0].state
+        ds.add((URIRef(EX + "s"), URIRef(EX + "p"), Literal("other"), URIRef(EX + "assertion")))
+        assert all(t.state != state for t in trackers)
+        # Adopting the same Dataset again and again does not pile up callbacks
+        for _ in range(5):
+            Nanopub(rdf=ds, adopt=True)._rdf_state()
+        assert len(ds.store.dispatcher.get_map()[TripleAddedEvent]) == len(handlers)
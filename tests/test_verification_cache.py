@@ -0,0 +1,106 @@
+import pickle
+from pathlib import Path
+
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+
+from nanopub import Nanopub, NanopubConf
+from nanopub.utils import MalformedNanopubError
+from nanopub.verification_cache import VerificationCache, digest_bytes, get_verification_cache
+from tests.conftest import _suite
+
+SIGNED = Path(_suite.get_valid(TestSuiteSubfolder.SIGNED)[0].path)
+
+
+class TestVerificationCache:
+
+    def test_add_and_contains(self, tmp_path):
+        cache = VerificationCache(tmp_path / "cache.sqlite")
+        assert not cache.contains("RAabc", "1234")
+        cache.add("RAabc", "1234")
+        assert cache.contains("RAabc", "1234")
+        assert not cache.contains("RAabc", "5678")
+        assert len(cache) == 1
+        # Stored on disk, for the next processes
+        assert VerificationCache(tmp_path / "cache.sqlite").contains("RAabc", "1234")
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_least_recently_used_are_evicted(self, tmp_path):
+        cache = VerificationCache(tmp_path / "cache.sqlite", max_entries=4)
+        for i in range(4):
+            cache.add(f"RA{i}", "d")
+        # Using the oldest entry keeps it in the cache
+        assert cache.contains("RA0", "d")
+        for i in range(4, 7):
+            cache.add(f"RA{i}", "d")
+        assert len(cache) <= 4
+        assert [cache.contains(f"RA{i}", "d") for i in range(7)] == [True, False, False, False, True, True, True]
+
+    def test_unusable_cache_is_a_miss(self, tmp_path, caplog):
+        (tmp_path / "file").write_text("not a directory")
+        cache = VerificationCache(tmp_path / "file" / "cache.sqlite")
+        cache.add("RAabc", "1234")
+        assert not cache.contains("RAabc", "1234")
+        assert "verification cache" in caplog.text
+
+    def test_pickle(self, tmp_path):
+        cache = VerificationCache(tmp_path / "cache.sqlite", max_entries=10)
+        cache.add("RAabc", "1234")
+        copy = pickle.loads(pickle.dumps(cache))
+        assert (copy.path, copy.max_entries) == (cache.path, 10)
+        assert copy.contains("RAabc", "1234")
+
+    def test_shared_in_the_process(self, tmp_path):
+        assert get_verification_cache(tmp_path / "a") is get_verification_cache(str(tmp_path / "a"))
+        assert get_verification_cache(tmp_path / "a") is not get_verification_cache(tmp_path / "b")
+
+
+class TestNanopubVerificationCache:
+
+    def _conf(self, tmp_path, policy):
+        return NanopubConf(verification_cache=policy, verification_cache_path=str(tmp_path / "cache.sqlite"))
+
+    def _fail_verification(self, monkeypatch):
+        def fail(*args):
+            raise AssertionError("The nanopub should not be verified")
+        monkeypatch.setattr("nanopub.nanopub.verify_signature", fail)
+        monkeypatch.setattr("nanopub.nanopub.verify_trusty", fail)
+
+    def test_skips_verification_of_cached_nanopub(self, tmp_path, monkeypatch):
+        np = Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "read-write"))
+        cache = get_verification_cache(tmp_path / "cache.sqlite")
+        assert cache.contains(np.metadata.trusty, digest_bytes(SIGNED.read_bytes()))
+
+        self._fail_verification(monkeypatch)
+        again = Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "read-write"))
+        assert again.source_uri == np.source_uri
+
+    def test_off_by_default(self, tmp_path, monkeypatch):
+        Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "read-write"))
+        self._fail_verification(monkeypatch)
+        with pytest.raises(AssertionError):
+            Nanopub(rdf=SIGNED)
+
+    def test_write_policy_always_verifies(self, tmp_path, monkeypatch):
+        Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "write"))
+        self._fail_verification(monkeypatch)
+        with pytest.raises(AssertionError):
+            Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "write"))
+
+    def test_read_policy_does_not_add(self, tmp_path):
+        Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "read"))
+        assert len(get_verification_cache(tmp_path / "cache.sqlite")) == 0
+
+    def test_other_bytes_are_verified(self, tmp_path):
+        Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "read-write"))
+        data = SIGNED.read_text()
+        signature = data.split('npx:hasSignature "')[1][:20]
+        tampered = tmp_path / SIGNED.name
+        tampered.write_text(data.replace(signature, signature[::-1]))
+        with pytest.raises(MalformedNanopubError):
+            Nanopub(rdf=tampered, conf=self._conf(tmp_path, "read-write"))
+
+    def test_unknown_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            Nanopub(rdf=SIGNED, conf=self._conf(tmp_path, "sometimes"))
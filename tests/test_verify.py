@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+
+from nanopub import verify_many
+from nanopub.parallel import imap_bounded
+from nanopub.verify import verify_one
+from tests.conftest import _suite
+
+SIGNED = [Path(e.path) for e in _suite.get_valid(TestSuiteSubfolder.SIGNED)]
+INVALID = [Path(e.path) for e in _suite.get_invalid(TestSuiteSubfolder.PLAIN)]
+
+
+def _square(x):
+    return x * x
+
+
+class TestImapBounded:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_ordered_results(self, workers):
+        assert list(imap_bounded(_square, ((i,) for i in range(20)), workers=workers, ordered=True)) == \
+            [i * i for i in range(20)]
+
+    def test_unordered_results(self):
+        assert sorted(imap_bounded(_square, ((i,) for i in range(20)), workers=2)) == [i * i for i in range(20)]
+
+    def test_input_is_consumed_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield (i,)
+
+        results = imap_bounded(_square, items(), workers=2, max_in_flight=3)
+        next(results)
+        assert len(consumed) <= 4
+        results.close()
+
+
+class TestVerifyMany:
+
+    def test_valid_signed_files(self):
+        results = list(verify_many(SIGNED, workers=2))
+        assert sorted(r.id for r in results) == sorted(str(p) for p in SIGNED)
+        for r in results:
+            assert r.ok, r.error
+            assert r.error is None
+            assert set(r.timings) == {"read", "parse", "verify", "total"}
+
+    def test_bytes_and_ids(self):
+        data = SIGNED[0].read_bytes()
+        results = sorted(verify_many([data, ("mine", data)], workers=1), key=lambda r: str(r.id))
+        assert [(r.id, r.ok) for r in results] == [(0, True), ("mine", True)]
+        assert "read" not in results[0].timings
+
+    def test_invalid_nanopubs_are_reported(self):
+        results = list(verify_many(INVALID + [b"not RDF"], workers=2))
+        assert len(results) == len(INVALID) + 1
+        for r in results:
+            assert not r.ok
+            assert r.error
+
+    def test_missing_file_is_reported(self, tmp_path):
+        result = verify_one(str(tmp_path / "missing.trig"), str(tmp_path / "missing.trig"))
+        assert not result.ok
+        assert result.error.startswith("FileNotFoundError")
+
+    def test_unsupported_input_type(self):
+        with pytest.raises(TypeError):
+            list(verify_many([42], workers=1))
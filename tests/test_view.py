@@ -0,0 +1,104 @@
+import pickle
+from pathlib import Path
+
+import pytest
+from nanopub_testsuite_connector import TestSuiteSubfolder
+from rdflib import Dataset
+
+from nanopub import Nanopub, NanopubView
+from nanopub.utils import MalformedNanopubError, extract_np_metadata
+from tests.conftest import _suite
+
+SIGNED = [Path(e.path) for e in _suite.get_valid(TestSuiteSubfolder.SIGNED)]
+PLAIN = [Path(e.path) for e in _suite.get_valid(TestSuiteSubfolder.PLAIN)]
+
+
+def _sorted_quads(view):
+    return sorted(map(repr, view.quads()))
+
+
+def _nquads(path):
+    ds = Dataset()
+    ds.parse(path, format="trig")
+    return ds.serialize(format="nquads")
+
+
+class TestNanopubView:
+
+    @pytest.mark.parametrize("path", SIGNED + PLAIN, ids=lambda p: f"{p.parent.name}/{p.name}")
+    def test_same_as_nanopub(self, path):
+        view = NanopubView.from_file(path)
+        ds = Dataset()
+        ds.parse(path, format="trig")
+        meta = extract_np_metadata(ds)
+        assert view.source_uri == str(meta.np_uri)
+        assert view.head_uri == str(meta.head)
+        assert view.assertion_uri == str(meta.assertion)
+        assert view.provenance_uri == str(meta.provenance)
+        assert view.pubinfo_uri == str(meta.pubinfo)
+        assert view.trusty == meta.trusty
+        assert view.namespace == str(meta.namespace)
+        assert view.public_key == (None if meta.public_key is None else str(meta.public_key))
+        assert view.signature == (None if meta.signature is None else str(meta.signature))
+        assert len(view) == len(ds)
+        assert len(view.assertion) == len(ds.graph(meta.assertion))
+
+    @pytest.mark.parametrize("path", SIGNED, ids=lambda p: p.name)
+    def test_signed(self, path):
+        view = NanopubView.from_file(path)
+        assert view.algorithm == "RSA"
+        assert view.has_valid_trusty
+        assert view.has_valid_signature
+
+    @pytest.mark.parametrize("path", SIGNED, ids=lambda p: p.name)
+    def test_to_nanopub(self, path):
+        np = NanopubView.from_file(path).to_nanopub()
+        assert np.source_uri == Nanopub(rdf=path).source_uri
+        assert np.is_valid
+
+    def test_unsigned(self):
+        view = NanopubView.from_file(PLAIN[0])
+        assert view.sig_uri is view.public_key is view.signature is None
+        with pytest.raises(MalformedNanopubError):
+            view.has_valid_signature
+        assert view.to_nanopub().source_uri == Nanopub(rdf=PLAIN[0]).source_uri
+
+    def test_from_nquads(self):
+        view = NanopubView.from_file(SIGNED[1])
+        nquads = _nquads(SIGNED[1]).encode("utf-8")
+        from_nquads = NanopubView.from_nquads(nquads)
+        assert _sorted_quads(from_nquads) == _sorted_quads(view)
+        assert from_nquads.has_valid_trusty
+        assert from_nquads.has_valid_signature
+
+    def test_tampered(self):
+        nquads = _nquads(SIGNED[1])
+        assertion_uri = NanopubView.from_nquads(nquads).assertion_uri
+        view = NanopubView.from_nquads(
+            nquads + f'<http://example.org/s> <http://example.org/p> "tampered" <{assertion_uri}> .\n')
+        with pytest.raises(MalformedNanopubError):
+            view.has_valid_trusty
+        with pytest.raises(MalformedNanopubError):
+            view.has_valid_signature
+
+    def test_read_only(self):
+        view = NanopubView.from_file(SIGNED[0])
+        assert not hasattr(view, "__dict__")
+        with pytest.raises(AttributeError):
+            view.source_uri = "http://example.org/np"
+        with pytest.raises(AttributeError):
+            del view.assertion
+        assert isinstance(view.assertion, tuple)
+
+    def test_pickle(self):
+        view = NanopubView.from_file(SIGNED[0])
+        unpickled = pickle.loads(pickle.dumps(view))
+        assert list(unpickled.quads()) == list(view.quads())
+        assert unpickled.signature == view.signature
+        assert unpickled.has_valid_signature
+
+    def test_not_a_nanopub(self):
+        with pytest.raises(MalformedNanopubError):
+            NanopubView.from_nquads(b"<http://example.org/s> <http://example.org/p> <http://example.org/o> .\n")
+        with pytest.raises(MalformedNanopubError):
+            NanopubView.from_nquads(b"not N-Quads\n")